@@ -1,14 +1,33 @@
 
 
-import io
-import re
-from typing import Dict, List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
 
-import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+from triaxial_ags.ags_index import row_counts
+from triaxial_ags.cache import ParseCache, content_key
+from triaxial_ags.envelopes import fit_envelopes
+from triaxial_ags.excel import (
+    WorkbookCache, build_all_groups_excel, build_group_excel, build_triaxial_excel, frames_digest
+)
+from triaxial_ags.export_jobs import EXPORT_WORKERS, FAILED, RUNNING, ExportJobs
+from triaxial_ags.filter_index import FilterIndex
+from triaxial_ags.instrument import Profiler, stage as instrument_stage
+from triaxial_ags.joins import DEFAULT_DEPTH_TOLERANCE
+from triaxial_ags.parquet_export import build_groups_parquet_zip, parquet_available
+from triaxial_ags.parsing import parse_files
+from triaxial_ags.pipeline import StagePipeline
+from triaxial_ags.project_store import ProjectStore
+from triaxial_ags.plotting import DEFAULT_BINS, RENDER_MODES, build_st_figure, choose_render_mode
+from triaxial_ags.table_view import DEFAULT_WINDOW_ROWS, MAX_WINDOW_ROWS, filter_options, view_order, view_window
+from triaxial_ags.tables import CombinedGroupStore
+from triaxial_ags.triaxial import (
+    TRIAXIAL_GROUPS, TriaxialJoin, attach_s_t, compute_s_t, filter_s_t, generate_triaxial_table
+)
+
 # --------------------------------------------------------------------------------------
 # Page title
 # --------------------------------------------------------------------------------------
@@ -23,457 +42,307 @@ uploaded_files = st.file_uploader(
 )
 
 # --------------------------------------------------------------------------------------
-# Helpers funcs
+# Parse cache (shared by all sessions; survives reruns)
 # --------------------------------------------------------------------------------------
-def analyze_ags_content(file_bytes: bytes) -> Dict[str, str]:
-    
-    results = {"AGS3": "No", "AGS4": "No", 'Contains "LOCA"': "No", "Contains **HOLE": "No"}
-    try:
-        content = file_bytes.decode("latin-1", errors="ignore")
-        lines = content.splitlines()
-        for line in lines:
-            s = line.strip()
-            if s.startswith('"GROUP"') or s.startswith("GROUP"):
-                results["AGS4"] = "Yes"
-                if '"GROUP","LOCA"' in s or "GROUP,LOCA" in s:
-                    results['Contains "LOCA"'] = "Yes"
-                break
-            if s.startswith('"**') or s.startswith("**"):
-                results["AGS3"] = "Yes"
-                if "**HOLE" in s:
-                    results["Contains **HOLE"] = "Yes"
-                break
-    except Exception:
-        pass
-    return results
-
-
-def _split_quoted_csv(line: str) -> List[str]:
-    s = line.strip()
-    # Normalize quotes
-    if s.startswith('"') and s.endswith('"') and '","' in s:
-        parts = [p.replace('""', '"') for p in s.split('","')]
-        parts[0] = parts[0].lstrip('"')
-        parts[-1] = parts[-1].rstrip('"')
-        return parts
-    # Fallback split
-    return [p.strip().strip('"') for p in re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', s)]
-
-
-def parse_ags_file(file_bytes: bytes) -> Dict[str, pd.DataFrame]:
-    text = file_bytes.decode("latin-1", errors="ignore")
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-
-    group_data: Dict[str, List[Dict[str, str]]] = {}
-    group_headings: Dict[str, List[str]] = {}
-    current_group = None
-    headings: List[str] = []
-
-    def ensure_group(gname: str):
-        if gname not in group_data:
-            group_data[gname] = []
-
-    for raw in lines:
-        # Replace HTML-escaped continuation
-        if raw.startswith('"&lt;CONT&gt;"') or raw.startswith("&lt;CONT&gt;"):
-            token = "<CONT>"
-        else:
-            token = None
-
-        parts = _split_quoted_csv(raw)
-
-        # AGS4 path: leading descriptor like GROUP, HEADING, UNIT, TYPE, DATA or <CONT>
-        if parts and (parts[0].upper() in {"GROUP", "HEADING", "UNIT", "TYPE", "DATA"} or token == "<CONT>"):
-            desc = parts[0].upper() if token is None else "<CONT>"
-            if desc == "GROUP":
-                current_group = parts[1]
-                ensure_group(current_group)
-                headings = []
-            elif desc == "HEADING":
-                # second..N are headings
-                headings = parts[1:]
-                group_headings[current_group] = headings
-            elif desc == "DATA":
-                if current_group and headings:
-                    row = dict(zip(headings, parts[1:len(headings)+1]))
-                    group_data[current_group].append(row)
-            elif desc == "<CONT>":
-                # Append continuation values to previous data row
-                if current_group and headings and group_data[current_group]:
-                    for idx, val in enumerate(parts[1:]):
-                        if idx < len(headings) and val:
-                            field = headings[idx]
-                            prev = group_data[current_group][-1].get(field, "")
-                            prev = prev if prev else ""
-                            if str(val) not in [p.strip() for p in prev.split(" | ") if p]:
-                                group_data[current_group][-1][field] = (prev + " | " if prev else "") + val
-            else:
-                # UNIT/TYPE ignored for parsing (metadata)
-                pass
-            continue
-
-        # AGS3 path: **GROUP, *HEADING, DATA, <CONT>
-        if parts and (parts[0].startswith("**") or parts[0].startswith("*") or parts[0] == "<CONT>"):
-            first = parts[0]
-            if first.startswith("**"):
-                current_group = first[2:]
-                ensure_group(current_group)
-                headings = []
-            elif first.startswith("*"):
-                # headings are the parts; strip leading *
-                headings = [p.lstrip("*") for p in parts]
-                group_headings[current_group] = headings
-            elif first == "<CONT>":
-                if current_group and headings and group_data[current_group]:
-                    for idx, val in enumerate(parts[1:]):
-                        if idx < len(headings) and val:
-                            field = headings[idx]
-                            prev = group_data[current_group][-1].get(field, "")
-                            prev = prev if prev else ""
-                            if str(val) not in [p.strip() for p in prev.split(" | ") if p]:
-                                group_data[current_group][-1][field] = (prev + " | " if prev else "") + val
-            continue
-
-        # if no descriptors
-        if current_group and headings:
-            if len(parts) >= len(headings):
-                row = dict(zip(headings, parts[:len(headings)]))
-                group_data[current_group].append(row)
-
-    # Convert each group to a DataFrame
-    group_dfs = {g: pd.DataFrame(rows) for g, rows in group_data.items()}
-
-    # Normalization: common AGS spelling differences and keys
-    for g, df in group_dfs.items():
-        if df.empty:
-            continue
-        # normalize column names
-        renamed = {}
-        for c in df.columns:
-            cc = c
-            if cc.upper() == "SPEC_DPTH" or cc.upper() == "SPEC_DEPTH":
-                cc = "SPEC_DEPTH"
-            if cc.upper() == "LOCA_ID" or cc.upper() == "HOLE_ID":
-                cc = "HOLE_ID"
-            renamed[c] = cc
-        df = df.rename(columns=renamed)
-        group_dfs[g] = df
-
-    return group_dfs
-
-
-def drop_singleton_rows(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Remove rows that have <=1 non-empty/non-null values across all columns.
-    This prevents rows with only HOLE_ID populated from slipping in.
-    """
-    if df.empty:
-        return df
-    # Treat empty strings and whitespace as NaN
-    clean = df.replace(r"^\s*$", np.nan, regex=True)
-    nn = clean.notna().sum(axis=1)
-    return df.loc[nn > 1].reset_index(drop=True)
-
-
-def deduplicate_cell(cell):
-    if pd.isna(cell):
-        return cell
-    parts = [p.strip() for p in str(cell).split(" | ")]
-    unique_parts = []
-    for p in parts:
-        if p and p not in unique_parts:
-            unique_parts.append(p)
-    return " | ".join(unique_parts)
-
-
-def expand_rows(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    If any cell contains " | " concatenated values, expand into multiple rows.
-    """
-    expanded_rows = []
-    for _, row in df.iterrows():
-        split_values = {col: (str(row[col]).split(" | ") if pd.notna(row[col]) else [""]) for col in df.columns}
-        max_len = max(len(v) for v in split_values.values()) if split_values else 1
-        for i in range(max_len):
-            new_row = {col: (split_values[col][i] if i < len(split_values[col]) else "") for col in df.columns}
-            expanded_rows.append(new_row)
-    return pd.DataFrame(expanded_rows)
+@st.cache_resource
+def get_parse_cache() -> ParseCache:
+    # Set AGS_PARSE_CACHE_DIR to "" to keep the cache in memory only
+    cache_dir = os.environ.get("AGS_PARSE_CACHE_DIR", ".ags_cache")
+    max_mb = int(os.environ.get("AGS_PARSE_CACHE_MB", "1024"))
+    return ParseCache(max_bytes=max_mb * 1024 * 1024, cache_dir=cache_dir or None)
 
 
 # --------------------------------------------------------------------------------------
-# Merge multi-file groups & show diagnostics
+# On-demand Excel downloads (built in the background when asked for, reused until the data changes)
 # --------------------------------------------------------------------------------------
-def combine_groups(all_group_dfs: List[Tuple[str, Dict[str, pd.DataFrame]]]) -> Dict[str, pd.DataFrame]:
-    """
-    Combine groups across files. Adds SOURCE_FILE column.
-    Returns {group_name: combined_df}
-    """
-    combined: Dict[str, List[pd.DataFrame]] = {}
-    for fname, gdict in all_group_dfs:
-        for gname, df in gdict.items():
-            if df is None or df.empty:
-                continue
-            temp = df.copy()
-            temp["SOURCE_FILE"] = fname
-            combined.setdefault(gname, []).append(temp)
-    return {g: drop_singleton_rows(pd.concat(dfs, ignore_index=True)) for g, dfs in combined.items()}
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
+# How often a running export's progress bar is refreshed (only that fragment reruns)
+EXPORT_POLL_SECONDS = 0.5
 
-# --------------------------------------------------------------------------------------
-# Triaxial summary & s–t calculations
-# --------------------------------------------------------------------------------------
-def coalesce_columns(df: pd.DataFrame, candidates: List[str], new_name: str):
-    """
-    Create/rename a single column 'new_name' from the first existing candidate.
-    """
-    for c in candidates:
-        if c in df.columns:
-            df[new_name] = df[c]
-            return
-    # ensure column exists
-    if new_name not in df.columns:
-        df[new_name] = np.nan
 
+@st.cache_resource
+def get_export_pool() -> ThreadPoolExecutor:
+    # One pool for the export jobs of every session
+    return ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
 
-def to_numeric_safe(df: pd.DataFrame, cols: List[str]):
-    for c in cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-##problems here, correct the divide func
 
-def generate_triaxial_table(groups: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-    """
-    Build a single triaxial summary table from available AGS groups:
-    - SAMP / CLSS (optional)
-    - TRIG (total stress general) or TREG (effective stress general)
-    - TRIX (AGS3 results) or TRET (AGS4 results)
-    """
-    # Get groups by priority
-    samp = groups.get("SAMP", pd.DataFrame()).copy()
-    clss = groups.get("CLSS", pd.DataFrame()).copy()
-    trig = groups.get("TRIG", pd.DataFrame()).copy()  # total stress general
-    treg = groups.get("TREG", pd.DataFrame()).copy()  # effective stress general
-    trix = groups.get("TRIX", pd.DataFrame()).copy()  # AGS3 results
-    tret = groups.get("TRET", pd.DataFrame()).copy()  # AGS4 results
-
-    # Normalize key columns for joins
-    for df in [samp, clss, trig, treg, trix, tret]:
-        if df.empty:
-            continue
-        if "HOLE_ID" not in df.columns:
-            df["HOLE_ID"] = np.nan
-        # Normalize SPEC_DEPTH spelling
-        rename_map = {c: "SPEC_DEPTH" for c in df.columns if c.upper() in {"SPEC_DPTH", "SPEC_DEPTH"}}
-        df.rename(columns=rename_map, inplace=True)
-    
-        # Ensure HOLE_ID is string
-        if "HOLE_ID" in df.columns:
-            df["HOLE_ID"] = df["HOLE_ID"].astype(str)
-            
-    # Before merge
-     value_cols = ["CELL", "DEVF", "PWPF"]
-     merged = merged.drop(columns=value_cols, errors="ignore")
-
-    # Merge keys
-    merge_keys = ["HOLE_ID"]
-    if not samp.empty and "SPEC_DEPTH" in samp.columns:
-        merge_keys.append("SPEC_DEPTH")
-
-    merged = samp.copy() if not samp.empty else pd.DataFrame(columns=merge_keys).copy()
-
-    # add CLSS (outer)
-    if not clss.empty:
-        merged = pd.merge(merged, clss, on=merge_keys, how="outer", suffixes=("", "_CLSS"))
-
-    # add TRIG/TREG type info
-    ty_cols = []
-    if not trig.empty:
-        keep = [c for c in ["HOLE_ID", "SPEC_DEPTH", "TRIG_TYPE"] if c in trig.columns]
-        trig_f = trig[keep].copy()
-        merged = pd.merge(merged, trig_f, on=[c for c in keep if c in merge_keys], how="outer")
-        ty_cols.append("TRIG_TYPE")
-    if not treg.empty:
-        keep = [c for c in ["HOLE_ID", "SPEC_DEPTH", "TREG_TYPE"] if c in treg.columns]
-        treg_f = treg[keep].copy()
-        merged = pd.merge(merged, treg_f, on=[c for c in keep if c in merge_keys], how="outer")
-        ty_cols.append("TREG_TYPE")
-
-    # add TRIX/TRET result data (outer)
-    tri_res = pd.DataFrame()
-    if not trix.empty:
-        tri_res = trix.copy()
-    if not tret.empty:
-        tri_res = tri_res.append(tret.copy(), ignore_index=True) if not tri_res.empty else tret.copy()
-
-    # Coalesce expected result columns -> unified names
-    if not tri_res.empty:
-        coalesce_columns(tri_res, ["SPEC_DEPTH", "SPEC_DPTH"], "SPEC_DEPTH")
-        coalesce_columns(tri_res, ["HOLE_ID", "LOCA_ID"], "HOLE_ID")
-        coalesce_columns(tri_res, ["TRIX_CELL", "TRET_CELL"], "CELL")     # σ3 total cell pressure during shear
-        coalesce_columns(tri_res, ["TRIX_DEVF", "TRET_DEVF"], "DEVF")     # deviator at failure (q)
-        coalesce_columns(tri_res, ["TRIX_PWPF", "TRET_PWPF"], "PWPF")     # porewater u at failure
-        tri_keep = [c for c in ["HOLE_ID", "SPEC_DEPTH", "CELL", "DEVF", "PWPF", "SOURCE_FILE"] if c in tri_res.columns]
-        tri_res = tri_res[tri_keep].copy()
-        merged = pd.merge(merged, tri_res, on=[c for c in ["HOLE_ID", "SPEC_DEPTH"] if c in merged.columns], how="outer")
-
-    # Final column subset (add useful identifiers if present)
-    cols_pref = [
-        "HOLE_ID", "SAMP_ID", "SAMP_REF", "SAMP_TOP",
-        "SPEC_REF", "SPEC_DEPTH", "SAMP_DESC", "SPEC_DESC", "GEOL_STAT",
-        "TRIG_TYPE", "TREG_TYPE",  # test types
-        "CELL", "DEVF", "PWPF", "SOURCE_FILE"
-    ]
-    final_cols = [c for c in cols_pref if c in merged.columns]
-    final_df = merged[final_cols].copy() if final_cols else merged.copy()
-
-    # Deduplicate cell text and expand rows if any " | "
-    final_df = final_df.applymap(deduplicate_cell)
-    expanded_df = expand_rows(final_df)
-
-    # Drop rows that are effectively empty (<=1 non-null)
-    expanded_df = drop_singleton_rows(expanded_df)
-
-    # Numeric cast for core fields
-    to_numeric_safe(expanded_df, ["SPEC_DEPTH", "CELL", "DEVF", "PWPF"])
-
-    return expanded_df
-
-
-def compute_s_t(tri_df: pd.DataFrame, mode: str = "Effective") -> pd.DataFrame:
-   
-    df = tri_df.copy()
-    # Coalesce a single 'TEST_TYPE' helper
-    
-    test_type_cols = []
-    if "TREG_TYPE" in df.columns: test_type_cols.append("TREG_TYPE")
-    if "TRIG_TYPE" in df.columns: test_type_cols.append("TRIG_TYPE")
-        
-    if test_type_cols:
-        df["TEST_TYPE"] = df[test_type_cols].apply(
-            lambda x: ' | '.join(x.dropna().astype(str).unique()), 
-            axis=1
-        )
-    else:
-        df["TEST_TYPE"] = "Unknown"    
+if "workbook_cache" not in st.session_state:
+    st.session_state["workbook_cache"] = WorkbookCache()
+if "export_jobs" not in st.session_state:
+    st.session_state["export_jobs"] = ExportJobs(get_export_pool())
+export_jobs = st.session_state["export_jobs"]
 
-    to_numeric_safe(df, ["CELL", "DEVF", "PWPF"])
-    df["t"] = df["DEVF"] / 2.0
-    df["s_total"] = df["CELL"] + df["t"]
-    df["s_effective"] = (df["CELL"] - df["PWPF"]) + (df["DEVF"] / 2) if "PWPF" in df.columns else np.nan
 
-    if mode.lower().startswith("eff"):
-        df["s"] = df["s_effective"]
-    else:
-        df["s"] = df["s_total"]
-  
-    if mode.lower().startswith("eff") and "PWPF" in df.columns:
-        missing_pwp = df["PWPF"].isna().sum()
-        if missing_pwp > 0:
-            st.warning(f"Warning: {missing_pwp} test(s) missing pore pressure data - effective stress calculations may be incomplete")
-            
-    # Keep key columns for plotting
-    keep = ["HOLE_ID", "SPEC_DEPTH", "TEST_TYPE", "CELL", "PWPF", "DEVF", "s_total", "s_effective", "s", "t", "SOURCE_FILE"]
-    keep = [c for c in keep if c in df.columns]
-    return df[keep].copy()
-
-
-def build_all_groups_excel(groups: Dict[str, pd.DataFrame]) -> bytes:
-    """
-    Create an Excel workbook where each group is one sheet.
-    """
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as xw:
-        for gname, gdf in sorted(groups.items()):
-            if gdf is None or gdf.empty:
-                continue
-            # Excel sheet name limit and avoid duplicates
-            sheet_name = gname[:31]
-            # Clean rows (no singleton)
-            out = drop_singleton_rows(gdf)
-            out.to_excel(xw, index=False, sheet_name=sheet_name)
-    return buffer.getvalue()
-
-def add_st_charts_to_excel(writer: pd.ExcelWriter, st_df: pd.DataFrame, sheet_name: str = "s_t_Values"):
+@st.fragment(run_every=EXPORT_POLL_SECONDS)
+def export_progress(key: str, label: str):
+    """Progress of a running export; reruns the app once it has finished."""
+    job = export_jobs.get(key)
+    if job is None:
+        return
+    if job.status != RUNNING:
+        st.rerun()
+    st.progress(
+        job.fraction,
+        text=f"Preparing {label}: {job.rows:,} of {job.total_rows:,} rows, "
+             f"{job.groups} of {job.total_groups} table(s) written ({job.elapsed:.0f} s)",
+    )
+
+
+def on_demand_download(
+    label: str, key: str, frames, build, file_name: str, help: Optional[str] = None, mime: str = XLSX_MIME,
+    version: Optional[Hashable] = None, prepare: Optional[Callable[[], bool]] = None,
+):
     """
-    Adds two charts to the workbook:
-      - s'–t (effective): x = s_effective, y = t
-      - s–t (total)    : x = s_total,     y = t
-    Places them on a new sheet 'Charts'.
+    Show a 'Prepare' button first; once pressed, the file is built by a background
+    job, build(progress), while the app stays usable, and offered as a download on
+    every rerun once it is done. Reruns with the same version (a token of the input
+    frames; a digest of them when not given) reuse that job instead of building
+    again, and the session's workbook cache skips builds of identical frames.
+    prepare is called when the button is pressed; if it returns True (it requested
+    more input, e.g. groups still to be parsed), the app reruns before building.
     """
-    chart.set_position({'x_offset': 25, 'y_offset': 10})  # Dynamic positioning
-    if st_df is None or st_df.empty:
+    flag = f"xl_requested_{key}"
+    if not st.session_state.get(flag):
+        if not st.button(f"Prepare: {label}", key=f"prep_{key}", help=help):
+            return
+        st.session_state[flag] = True
+        if prepare is not None and prepare():
+            st.rerun()
+    if version is None:
+        version = frames_digest(frames)
+    # Reruns look the job up; only a first request (or new inputs) submits one
+    job = export_jobs.get(key, version)
+    if job is None:
+        workbook_cache = st.session_state["workbook_cache"]
+        frames_in = [df for df in frames.values() if df is not None and not df.empty]
+        job = export_jobs.submit(
+            key, version, lambda progress: workbook_cache.get(key, frames, lambda: build(progress)),
+            total_rows=sum(len(df) for df in frames_in), total_groups=len(frames_in),
+        )
+    if job.status == FAILED:
+        st.error(f"Preparing {label} failed: {job.error}")
+        if st.button("Retry", key=f"retry_{key}"):
+            export_jobs.discard(key)
+            st.rerun()
         return
+    if job.status == RUNNING:
+        export_progress(key, label)
+    else:
+        st.download_button(label, data=job.result, file_name=file_name, mime=mime, key=f"dl_{key}", help=help)
 
-    workbook  = writer.book
-    ws_vals   = writer.sheets.get(sheet_name)
-    if ws_vals is None:
-        return
 
-    # Row/col counts in the written sheet
-    nrows = len(st_df)
-    if nrows == 0:
-        return
+# --------------------------------------------------------------------------------------
+# Stage pipeline (per session): each stage is recomputed only when its inputs change
+# --------------------------------------------------------------------------------------
+if "pipeline" not in st.session_state:
+    st.session_state["pipeline"] = StagePipeline()
+pipeline = st.session_state["pipeline"]
 
-    # Column indices
-    idx = {c: i for i, c in enumerate(st_df.columns)}
-    if "t" not in idx or ("s_effective" not in idx and "s_total" not in idx):
-        return  # nothing to plot
 
-    # Data starts at row=1 (row 0 is header)
-    r0, r1 = 1, nrows
+# --------------------------------------------------------------------------------------
+# Project store (optional SQLite file of parsed groups; reopened without any upload)
+# --------------------------------------------------------------------------------------
+@st.cache_resource
+def get_project_store(path: str) -> ProjectStore:
+    return ProjectStore(path)
+
+
+with st.sidebar:
+    project_path = st.text_input(
+        "Project store (SQLite file)", value=os.environ.get("AGS_PROJECT_DB", ""),
+        help="Optional. Parsed uploads are saved to this file; without uploads, the triaxial summary "
+             "is built from it by indexed queries, without re-reading any AGS file."
+    ).strip()
+project_store = get_project_store(project_path) if project_path else None
+
+
+def show_project(store: ProjectStore):
+    """Triaxial summary and s–t plot straight from the project store, for a filtered subset."""
+    files = store.files()
+    st.subheader(f"📁 Project: {os.path.basename(store.path)}")
+    st.caption(f"{len(files)} file(s) and {len(store.groups())} group(s) stored; no AGS file is read.")
+    test_groups = [g for g in ("TRIX", "TRET") if g in store.groups()]
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        holes = sorted({h for g in test_groups for h in store.distinct(g, "HOLE_ID")})
+        pick_holes = st.multiselect("HOLE_ID (all if empty)", holes)
+    with c2:
+        pick_srcs = st.multiselect("SOURCE_FILE (all if empty)", sorted(files))
+    with c3:
+        ranges = [r for r in (store.value_range(g, "SPEC_DEPTH") for g in test_groups) if r]
+        depth = None
+        if ranges:
+            low, high = min(r[0] for r in ranges), max(r[1] for r in ranges)
+            if low < high:
+                depth = st.slider("SPEC_DEPTH (m)", low, high, (low, high))
+                depth = None if depth == (low, high) else depth
+    mode = "Effective" if st.radio("Stress path:", ["Effective (s'–t)", "Total (s–t)"], horizontal=True,
+                                   key="project_mode").startswith("Effective") else "Total"
+
+    filters = dict(holes=pick_holes or None, sources=pick_srcs or None, depth=depth)
+    groups = pipeline.run(
+        "project_load", lambda: store.load_groups(TRIAXIAL_GROUPS, **filters),
+        store.path, tuple(files.items()), tuple(pick_holes), tuple(pick_srcs), depth,
+    )
+    tri_df = pipeline.run("triaxial", lambda: generate_triaxial_table(groups), pipeline.token("project_load"))
+    if tri_df.empty:
+        st.info("No triaxial data (TRIX/TRET + TRIG/TREG) in the selected part of the project.")
+        return
 
-    # Create Charts worksheet
-    ws_charts = workbook.add_worksheet("Charts")
+    def build_s_t():
+        st_df = compute_s_t(tri_df, mode=mode)
+        return st_df, attach_s_t(tri_df, st_df)
+
+    st_df, tri_df_with_st = pipeline.run("s_t", build_s_t, pipeline.token("triaxial"), mode)
+    st.write(f"**Triaxial summary (with s & t)** — {len(tri_df_with_st)} rows")
+    paged_table("project_triaxial", tri_df_with_st, pipeline.token("s_t"))
+    on_demand_download(
+        "📥 Download Triaxial Summary + s–t (Excel, with charts)",
+        "project_triaxial",
+        {"Triaxial_Summary": tri_df_with_st, "s_t_Values": st_df},
+        lambda progress: build_triaxial_excel(tri_df_with_st, st_df, progress=progress),
+        file_name="triaxial_summary_s_t.xlsx",
+        version=pipeline.token("s_t"),
+    )
+    envelopes = pipeline.run("envelopes", lambda: fit_envelopes(st_df), pipeline.token("s_t"))
+    fig = pipeline.run(
+        "plot", lambda: build_st_figure(st_df, mode, "TEST_TYPE", envelopes=envelopes), pipeline.token("envelopes")
+    )
+    st.plotly_chart(fig, use_container_width=True, theme="streamlit")
 
-    def add_scatter(title: str, xcol: str, ycol: str, anchor: str):
-        if xcol not in idx or ycol not in idx:
-            return
-        cx, cy = idx[xcol], idx[ycol]
-
-        chart = workbook.add_chart({'type': 'scatter', 'subtype': 'straight_with_markers'})
-        chart.set_title({'name': title})
-        chart.set_x_axis({'name': 's (kPa)'})
-        chart.set_y_axis({'name': "t = q/2 (kPa)"})
-        chart.set_legend({'none': True})
-
-        # A1 notation ranges for x/y
-        sheet = sheet_name
-        # Excel is col letters; build ranges using XlsxWriter utility
-        # We'll use row/col notation instead (zero-based, inclusive)
-        chart.add_series({
-            'name':       title,
-            'categories': [sheet, r0, cx, r1, cx],  # x-values
-            'values':     [sheet, r0, cy, r1, cy],  # y-values
-            'marker':     {'type': 'circle', 'size': 4},
-        })
-        chart.set_size({'width': 640, 'height': 420})
-        ws_charts.insert_chart(anchor, chart)
-
-    # s'–t (effective)
-    add_scatter("s′–t (Effective stress)", "s_effective", "t", "B2")
-    # s–t (total)
-    add_scatter("s–t (Total stress)",      "s_total",     "t", "B25")
 
+# --------------------------------------------------------------------------------------
+# Paged table viewer (filters, sorting and the row window are applied server-side)
+# --------------------------------------------------------------------------------------
+def paged_table(name: str, df: pd.DataFrame, version: Hashable):
+    """
+    Filter/sort controls and a row-range slider for a large table. The matching row
+    order is computed on the DataFrame (memoized per table until the data or the
+    controls change); only the selected window of rows is sent to the browser.
+    """
+    with st.expander("Filter & sort", expanded=False):
+        filters = []
+        for col in st.multiselect("Filter columns", list(df.columns), key=f"fcols_{name}"):
+            opts = filter_options(df[col])
+            # A widget left at "everything" does not filter, so rows blank in that column stay
+            if opts["kind"] == "in":
+                picked = st.multiselect(col, opts["values"], default=opts["values"], key=f"f_{name}_{col}")
+                if len(picked) < len(opts["values"]):
+                    filters.append((col, "in", tuple(picked)))
+            elif opts["kind"] == "between" and opts["min"] < opts["max"]:
+                low, high = st.slider(col, opts["min"], opts["max"], (opts["min"], opts["max"]), key=f"f_{name}_{col}")
+                if (low, high) != (opts["min"], opts["max"]):
+                    filters.append((col, "between", (low, high)))
+            elif opts["kind"] == "contains":
+                filters.append((col, "contains", st.text_input(f"{col} contains", key=f"f_{name}_{col}")))
+        c1, c2 = st.columns(2)
+        with c1:
+            sort_by = st.selectbox("Sort by", ["(file order)"] + list(df.columns), key=f"sort_{name}")
+        with c2:
+            descending = st.checkbox("Descending", key=f"desc_{name}")
+    sort_by = None if sort_by == "(file order)" else sort_by
+    filters = tuple(filters)
+    order = pipeline.run(
+        "table_view", lambda: view_order(df, filters, sort_by, not descending),
+        version, filters, sort_by, descending, slot=name,
+    )
+
+    n = len(order)
+    first, last = 1, n
+    if n > DEFAULT_WINDOW_ROWS:
+        # Keyed on the match count, so the window resets when the filters change it
+        first, last = st.slider(
+            "Rows", 1, n, (1, DEFAULT_WINDOW_ROWS), key=f"rows_{name}_{n}",
+            help=f"At most {MAX_WINDOW_ROWS} rows are shown at once.",
+        )
+        last = min(last, first + MAX_WINDOW_ROWS - 1)
+    window = view_window(df, order, first - 1, last - first + 1)
+    st.caption(f"Rows {first if n else 0}–{last} of {n} matching ({len(df)} in total)")
+    st.dataframe(window, use_container_width=True, height=350)
 
 
 # --------------------------------------------------------------------------------------
 # Main app logic
 # --------------------------------------------------------------------------------------
 if uploaded_files:
+    with st.sidebar:
+        parse_workers = st.number_input(
+            "Parser worker processes", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1,
+            help="Large batches are parsed in parallel; small batches always run in a single process."
+        )
+        track_memory = st.checkbox(
+            "Track peak memory per stage", value=False,
+            help="Adds peak allocated memory to the Performance panel; slows processing down."
+        )
+        lazy_groups = st.checkbox(
+            "Parse other groups on demand", value=False,
+            help="Only the groups the triaxial summary needs (" + ", ".join(TRIAXIAL_GROUPS) + ") are parsed "
+                 "up front; other groups are parsed when their tab is loaded or they are exported."
+        )
+        save_to_project = project_store is not None and st.checkbox(
+            "Save uploads to the project store", value=True, disabled=lazy_groups,
+            help="Adds every uploaded file (all groups) to the project; unchanged files are skipped. "
+                 "Not available while other groups are parsed on demand."
+        ) and not lazy_groups
+
+    # Time (and optionally trace) every stage of this rerun for the Performance panel
+    profiler = Profiler(memory=track_memory).start()
+
     # Parse all uploaded files
-    all_group_dfs: List[Tuple[str, Dict[str, pd.DataFrame]]] = []
-    diagnostics = []
-
-    for f in uploaded_files:
-        file_bytes = f.getvalue()
-        flags = analyze_ags_content(file_bytes)
-        diagnostics.append((f.name, flags))
-        gdict = parse_ags_file(file_bytes)
-        # Attach source file tag
-        for g in gdict.values():
-            if g is not None:
-                g["SOURCE_FILE"] = f.name
-        all_group_dfs.append((f.name, gdict))
+    parse_cache = get_parse_cache()
+    uploads = [(f.name, f.getvalue()) for f in uploaded_files]
+    file_keys = [content_key(b) for _, b in uploads]
+    upload_set = tuple((fname, key) for (fname, _), key in zip(uploads, file_keys))
+    eager_groups = TRIAXIAL_GROUPS if lazy_groups else None
+    all_group_dfs, diagnostics = pipeline.run(
+        "parse",
+        lambda: parse_files(
+            uploads, workers=int(parse_workers), cache=parse_cache, keys=file_keys, groups=eager_groups
+        ),
+        upload_set, eager_groups,
+    )
+
+    if save_to_project:
+        stored = pipeline.run(
+            "project_store", lambda: project_store.add_files(all_group_dfs, file_keys), upload_set, project_path
+        )
+        if stored:
+            st.sidebar.caption(f"Saved {len(stored)} file(s) to the project store.")
+
+    # On-demand groups: each batch (one tab, or everything left for an export) is
+    # parsed in one pass over the files, skipping the rows of all other groups
+    group_batches = st.session_state.setdefault("group_batches", [])
+    if lazy_groups:
+        # Group names and row counts from each file's byte-offset index (built once, persisted)
+        def index_rows() -> Dict[str, int]:
+            totals: Dict[str, int] = {}
+            for (_, b), key in zip(uploads, file_keys):
+                for g, n in row_counts(parse_cache.group_index(key, b)).items():
+                    totals[g] = totals.get(g, 0) + n
+            return totals
+
+        indexed_rows = pipeline.run("list_groups", index_rows, upload_set)
+        group_names = sorted(indexed_rows)
+        for batch in group_batches:
+            extra, _ = pipeline.run(
+                "parse_groups",
+                lambda batch=batch: parse_files(
+                    uploads, workers=int(parse_workers), cache=parse_cache, keys=file_keys, groups=batch
+                ),
+                upload_set, slot=batch,
+            )
+            all_group_dfs = [(fname, {**gdict, **more}) for (fname, gdict), (_, more) in zip(all_group_dfs, extra)]
+
+    def parsed_group_names() -> set:
+        return set(eager_groups or ()) | {g for b in group_batches for g in b}
+
+    def request_groups(names) -> bool:
+        """Queue groups that are not parsed yet; True if any were."""
+        missing = frozenset(names) - set(combined_groups) - parsed_group_names()
+        if missing:
+            group_batches.append(missing)
+        return bool(missing)
 
     # Show quick diagnostics
     with st.expander("File diagnostics (AGS type & key groups)", expanded=False):
@@ -481,23 +350,64 @@ if uploaded_files:
             [{"File": n, **flags} for (n, flags) in diagnostics]
         )
         st.dataframe(diag_df, use_container_width=True)
+        cstats = parse_cache.stats()
+        st.caption(
+            f"Parse cache: {cstats['memory_hits']} memory hits, {cstats['disk_hits']} disk hits, "
+            f"{cstats['misses']} misses · {cstats['entries']} files held ({cstats['memory_bytes'] / 1e6:.1f} MB)"
+        )
+    # Filled in at the end of the run, once every stage has been recorded
+    perf_panel = st.expander("Performance (this run, per stage)", expanded=False)
+
+    # Combine groups across files (only groups touched by added/removed files are rebuilt)
+    if "group_store" not in st.session_state:
+        st.session_state["group_store"] = CombinedGroupStore()
+    group_store = st.session_state["group_store"]
 
-    # Combine groups across files
-    combined_groups = combine_groups(all_group_dfs)
+    def combine():
+        group_store.sync([(fname, key, gdict) for (fname, gdict), key in zip(all_group_dfs, file_keys)])
+        return group_store.groups
+
+    combined_groups = pipeline.run(
+        "combine", combine, pipeline.token("parse"), tuple(group_batches) if lazy_groups else ()
+    )
+    if not lazy_groups:
+        group_names = sorted(combined_groups)
 
     # Sidebar: downloads and plotting options
     with st.sidebar:
         st.header("Downloads & Plot Options")
 
         if combined_groups:
-            all_xl = build_all_groups_excel(combined_groups)
-            st.download_button(
+            all_groups_version = group_store.group_version(group_names)
+            load_all = (lambda: request_groups(group_names)) if lazy_groups else None
+            # Frames and versions are pinned here; the job counts filled cells of exactly these frames
+            all_fill_counts = group_store.fill_counts(combined_groups)
+            on_demand_download(
                 "📥 Download ALL groups (one Excel workbook)",
-                data=all_xl,
+                "all_groups",
+                combined_groups,
+                lambda progress: build_all_groups_excel(
+                    combined_groups, progress=progress,
+                    fill_counts=all_fill_counts(),
+                ),
                 file_name="ags_groups_combined.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                help="Each AGS group is a separate sheet; all uploaded files are merged."
+                help="Each AGS group is a separate sheet; all uploaded files are merged. "
+                     "Large groups are written in constant memory and split across numbered sheets.",
+                version=all_groups_version,
+                prepare=load_all,
             )
+            if parquet_available():
+                on_demand_download(
+                    "📦 Download ALL groups (Parquet, zip)",
+                    "all_groups_parquet",
+                    combined_groups,
+                    lambda progress: build_groups_parquet_zip(combined_groups, progress=progress),
+                    file_name="ags_groups_combined_parquet.zip",
+                    help="One Parquet file per AGS group, for fast columnar analytics.",
+                    mime="application/zip",
+                    version=all_groups_version,
+                    prepare=load_all,
+                )
 
         st.markdown("---")
         st.subheader("s–t plot settings")
@@ -506,117 +416,178 @@ if uploaded_files:
         facet_col = st.selectbox("Facet by (optional):", ["None", "TEST_TYPE", "SOURCE_FILE"], index=0)
         facet_col = None if facet_col == "None" else facet_col
         show_labels = st.checkbox("Show HOLE_ID labels", value=False)
+        show_envelopes = st.checkbox(
+            "Fit strength envelopes", value=True,
+            help="Fits t = a + s·tanα per HOLE_ID / TEST_TYPE / SOURCE_FILE and draws the lines; "
+                 "c′ and φ′ follow from sin φ′ = tanα and c′ = a / cos φ′."
+        )
+        render = st.selectbox(
+            "Plot rendering:", RENDER_MODES, index=0,
+            format_func={"auto": "Auto (by point count)", "svg": "Points (SVG)", "webgl": "Points (WebGL)",
+                         "density": "Density bins"}.get,
+            help="Auto uses WebGL for large sets and server-side density bins for very large sets."
+        )
+        density_bins_n = st.slider("Density bins per axis", 20, 400, DEFAULT_BINS, step=10)
+        depth_tolerance = st.number_input(
+            "Depth match tolerance (m)", min_value=0.0, max_value=1.0, value=DEFAULT_DEPTH_TOLERANCE,
+            step=0.001, format="%.3f",
+            help="Specimen and sample depths within this distance (same HOLE_ID) are joined as the same specimen."
+        )
 
     # Show group tables (with per-group Excel download)
     st.subheader("📋 AGS Groups (merged across all uploaded files)")
 
-    tabs = st.tabs(sorted(combined_groups.keys()))
-    for tab, gname in zip(tabs, sorted(combined_groups.keys())):
+    tabs = st.tabs(group_names)
+    for tab, gname in zip(tabs, group_names):
         with tab:
+            if gname not in combined_groups:
+                if gname in parsed_group_names():
+                    st.caption(f"{gname} has no data rows.")
+                    continue
+                st.caption(f"**{gname}** — {indexed_rows.get(gname, 0)} rows indexed, not parsed yet")
+                if st.button(f"Load {gname}", key=f"load_{gname}", help="Parse this group from the uploaded files."):
+                    request_groups([gname])
+                    st.rerun()
+                continue
             gdf = combined_groups[gname]
             st.write(f"**{gname}** — {len(gdf)} rows")
-            st.dataframe(gdf, use_container_width=True, height=350)
+            paged_table(gname, gdf, group_store.group_version([gname]))
 
             # Per-group download (Excel)
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                drop_singleton_rows(gdf).to_excel(writer, index=False, sheet_name=gname[:31])
-            st.download_button(
-                label=f"Download {gname} (Excel)",
-                data=buffer.getvalue(),
+            on_demand_download(
+                f"Download {gname} (Excel)",
+                f"group_{gname}",
+                {gname: gdf},
+                lambda progress, gname=gname, gdf=gdf, counts=group_store.fill_counts([gname]): build_group_excel(
+                    gname, gdf, progress=progress, fill_counts=counts()[gname]
+                ),
                 file_name=f"{gname}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key=f"dl_{gname}",
+                version=group_store.group_version([gname]),
             )
 
- 
-   # --- Triaxial summary & plots
+    # --- Triaxial summary & plots
     st.markdown("---")
     st.header(" Triaxial Summary & s–t Plots")
-    tri_df = generate_triaxial_table(combined_groups)
-    
+
+    def build_triaxial():
+        tri_join = TriaxialJoin(combined_groups, depth_tolerance=depth_tolerance)
+        return tri_join, generate_triaxial_table(combined_groups, join=tri_join)
+
+    # Only the groups the triaxial table reads decide whether it is rebuilt
+    tri_join, tri_df = pipeline.run(
+        "triaxial", build_triaxial, group_store.group_version(TRIAXIAL_GROUPS), depth_tolerance
+    )
+
+    with st.expander("Join quality (triaxial summary)", expanded=False):
+        st.caption(f"Joined rows before multi-value expansion: {tri_join.estimated_rows}")
+        st.dataframe(tri_join.report, use_container_width=True)
+
     if tri_df.empty:
         st.info("No triaxial data (TRIX/TRET + TRIG/TREG) detected in the uploaded files.")
     else:
-        # (A) s–t computations (do this BEFORE displaying the summary)
+        # (A) s–t computations, merged into the Triaxial summary grid
         mode = "Effective" if stress_mode.startswith("Effective") else "Total"
-        st_df = compute_s_t(tri_df, mode=mode)
-    
-        # (B) Merge s,t into the Triaxial summary grid (avoid accidental many-to-many merges)
-        merge_keys = [c for c in ["HOLE_ID", "SPEC_DEPTH", "CELL", "PWPF", "DEVF"] if c in tri_df.columns]
-        cols_from_st = [c for c in ["HOLE_ID","SPEC_DEPTH","CELL","PWPF","DEVF","s_total","s_effective","s","t","TEST_TYPE","SOURCE_FILE"] if c in st_df.columns]
-        tri_df_with_st = pd.merge(tri_df, st_df[cols_from_st], on=merge_keys, how="left")
-    
+
+        def build_s_t():
+            st_df = compute_s_t(tri_df, mode=mode)
+            return st_df, attach_s_t(tri_df, st_df)
+
+        st_df, tri_df_with_st = pipeline.run("s_t", build_s_t, pipeline.token("triaxial"), mode)
+        if mode == "Effective" and "PWPF" in st_df.columns:
+            missing_pwp = st_df["PWPF"].isna().sum()
+            if missing_pwp > 0:
+                st.warning(f"Warning: {missing_pwp} test(s) missing pore pressure data - effective stress calculations may be incomplete")
+
         st.write(f"**Triaxial summary (with s & t)** — {len(tri_df_with_st)} rows")
         st.dataframe(tri_df_with_st, use_container_width=True, height=350)
 
-
-        # s–t computations & plot
         st.markdown("#### s–t computed values")
-        mode = "Effective" if stress_mode.startswith("Effective") else "Total"
-        st_df = compute_s_t(tri_df, mode=mode)
-        
-        
-        
-                # Download triaxial table (with s–t) + Excel Charts
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-            # 1) Save the with-s,t summary (more useful than raw-only)
-            tri_df_with_st.to_excel(writer, index=False, sheet_name="Triaxial_Summary")
-        
-            # 2) Save the computed s–t values (contains s_total, s_effective, s, t)
-            st_df.to_excel(writer, index=False, sheet_name="s_t_Values")
-        
-            # 3) Add Excel charts (s′–t and s–t) on a 'Charts' sheet
-            add_st_charts_to_excel(writer, st_df, sheet_name="s_t_Values")
-        
-        st.download_button(
+
+        # Download triaxial table (with s–t) + Excel Charts
+        on_demand_download(
             "📥 Download Triaxial Summary + s–t (Excel, with charts)",
-            data=buffer.getvalue(),
+            "triaxial",
+            {"Triaxial_Summary": tri_df_with_st, "s_t_Values": st_df},
+            lambda progress: build_triaxial_excel(tri_df_with_st, st_df, progress=progress),
             file_name="triaxial_summary_s_t.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            version=pipeline.token("s_t"),
         )
 
 
-        # Filters
+        # Filters: options and row bitmaps come from an index built once per s–t table
+        filter_index = pipeline.run("filter_index", lambda: FilterIndex(st_df), pipeline.token("s_t"))
         c1, c2, c3 = st.columns(3)
         with c1:
-            holes = sorted([h for h in st_df["HOLE_ID"].dropna().unique()])
+            holes = filter_index.values.get("HOLE_ID", [])
             pick_holes = st.multiselect("Filter HOLE_ID", holes, default=holes[: min(10, len(holes))])
         with c2:
-            types = sorted([t for t in st_df["TEST_TYPE"].dropna().unique()])
+            types = filter_index.values.get("TEST_TYPE", [])
             pick_types = st.multiselect("Filter TEST_TYPE", types, default=types)
         with c3:
-            srcs = sorted([s for s in st_df["SOURCE_FILE"].dropna().unique()]) if "SOURCE_FILE" in st_df.columns else []
+            srcs = filter_index.values.get("SOURCE_FILE", [])
             pick_srcs = st.multiselect("Filter by SOURCE_FILE", srcs, default=srcs)
 
-        fdf = st_df.copy()
-        if pick_holes:
-            fdf = fdf[fdf["HOLE_ID"].isin(pick_holes)]
-        if pick_types:
-            fdf = fdf[fdf["TEST_TYPE"].isin(pick_types)]
-        if pick_srcs and "SOURCE_FILE" in fdf.columns:
-            fdf = fdf[fdf["SOURCE_FILE"].isin(pick_srcs)]
-
-        # Plot
-        hover_cols = [c for c in ["HOLE_ID", "TEST_TYPE", "SPEC_DEPTH", "CELL", "PWPF", "DEVF", "s_total", "s_effective", "SOURCE_FILE"] if c in fdf.columns]
-        fig = px.scatter(
-            fdf,
-            x="s",
-            y="t",
-            color=fdf[color_by] if color_by in fdf.columns else None,
-            facet_col=facet_col if facet_col in fdf.columns else None,
-            symbol="TEST_TYPE" if "TEST_TYPE" in fdf.columns else None,
-            hover_data=hover_cols,
-            title=f"s–t Plot ({mode} stress)",
-            labels={"s": "s (kPa)", "t": "t = q/2 (kPa)"},
-            template="simple_white"
+        fdf = pipeline.run(
+            "filter",
+            lambda: filter_s_t(st_df, holes=pick_holes, test_types=pick_types, sources=pick_srcs, index=filter_index),
+            pipeline.token("filter_index"), tuple(pick_holes), tuple(pick_types), tuple(pick_srcs),
         )
-        if show_labels and "HOLE_ID" in fdf.columns:
-            fig.update_traces(text=fdf["HOLE_ID"], textposition="top center", mode="markers+text")
 
-        fig.update_layout(legend_title_text=color_by if color_by in fdf.columns else "Legend")
-        st.plotly_chart(fig, use_container_width=True, theme="streamlit")
+        # Plot (large sets: WebGL, then density bins with drill-down into an s–t region)
+        x_range = y_range = None
+        plotted = fdf.dropna(subset=["s", "t"])
+        if choose_render_mode(len(plotted), render) == "density" and len(plotted) > 1:
+            st.caption(f"{len(plotted):,} tests are shown as density bins; narrow the region to see individual points.")
+            r1, r2 = st.columns(2)
+            s_lo, s_hi = float(plotted["s"].min()), float(plotted["s"].max())
+            t_lo, t_hi = float(plotted["t"].min()), float(plotted["t"].max())
+            with r1:
+                x_range = st.slider("s region (kPa)", s_lo, max(s_hi, s_lo + 1.0), (s_lo, max(s_hi, s_lo + 1.0)))
+            with r2:
+                y_range = st.slider("t region (kPa)", t_lo, max(t_hi, t_lo + 1.0), (t_lo, max(t_hi, t_lo + 1.0)))
+            if x_range == (s_lo, max(s_hi, s_lo + 1.0)) and y_range == (t_lo, max(t_hi, t_lo + 1.0)):
+                x_range = y_range = None
+        # Strength envelopes of the filtered tests, fitted for all groups at once
+        envelopes = None
+        if show_envelopes:
+            envelopes = pipeline.run("envelopes", lambda: fit_envelopes(fdf), pipeline.token("filter"))
+        fig = pipeline.run(
+            "plot",
+            lambda: build_st_figure(
+                fdf, mode, color_by, facet_col, show_labels,
+                render="auto" if x_range is not None else render, bins=int(density_bins_n),
+                x_range=x_range, y_range=y_range, envelopes=envelopes,
+            ),
+            pipeline.token("filter"), mode, color_by, facet_col, show_labels, render, density_bins_n, x_range, y_range,
+            pipeline.token("envelopes") if show_envelopes else None,
+        )
+        with instrument_stage("plot_render", rows_in=len(fdf)):
+            st.plotly_chart(fig, use_container_width=True, theme="streamlit")
+        if envelopes is not None:
+            with st.expander(f"Strength envelopes ({int(envelopes['tan_alpha'].notna().sum())} fitted)", expanded=False):
+                st.caption(
+                    f"t = a + s·tanα per HOLE_ID / TEST_TYPE / SOURCE_FILE ({mode} stress); "
+                    "φ′ = asin(tanα), c′ = a / cos φ′ (kPa). Groups with fewer than two distinct s values are not fitted."
+                )
+                st.dataframe(envelopes, use_container_width=True, hide_index=True)
+
+    profiler.stop()
+    with perf_panel:
+        perf = pd.DataFrame(profiler.summary())
+        if perf.empty:
+            st.caption("Nothing was recomputed in this run; every stage came from the pipeline cache.")
+        else:
+            # Nested stages are indented under the stage that called them
+            perf["stage"] = [("  " * d) + name for d, name in zip(perf.pop("depth"), perf["stage"])]
+            st.dataframe(perf.drop(columns="parent"), use_container_width=True, hide_index=True)
+        st.caption("Pipeline stages (cache hits / misses since the session started)")
+        st.dataframe(pd.DataFrame(pipeline.stats()), use_container_width=True, hide_index=True)
+        if export_jobs.summary():
+            st.caption("Export jobs (built in the background; the latest job of each download)")
+            st.dataframe(pd.DataFrame(export_jobs.summary()), use_container_width=True, hide_index=True)
+
+elif project_store is not None and project_store.files():
+    show_project(project_store)
 
 else:
     st.info("Upload one or more AGS files to begin. You can select additional files anytime; the app merges all groups and updates tables, downloads, and plots.")
@@ -0,0 +1,191 @@
+"""
+Deterministic synthetic AGS3/AGS4 files for benchmarks.
+
+    from ags_synth import make_ags_file
+    data = make_ags_file(holes=50, specimens=4, stages=3, extra_groups=5, extra_rows=2000,
+                         cont_density=0.1, quoted_comma_density=0.2, version=3, seed=1)
+
+Each file has PROJ, LOCA/HOLE and SAMP, the triaxial groups (AGS4: TREG + TRET,
+AGS3: TRIG + TRIX), and optionally filler groups (XG01, XG02, ...) to reach a
+given size. The same arguments always give the same bytes.
+
+Run directly to write files:
+    python benchmarks/ags_synth.py out_dir --files 10 --holes 200 --version 3
+"""
+import argparse
+import os
+import random
+from typing import List, Sequence
+
+LONG_TEXT = [
+    "Firm grey silty CLAY", "Soft brown sandy CLAY with rare gravel", "Stiff fissured CLAY",
+    "Very stiff dark grey CLAY", "Firm orange brown mottled grey CLAY",
+]
+COMMA_TEXT = [
+    'Firm, grey, silty CLAY', 'Soft brown CLAY, with "pockets" of sand', 'Stiff CLAY, fissured, closely spaced',
+]
+TEST_TYPES = ["CU", "CD", "UU"]
+
+
+class _Writer:
+    """AGS3 / AGS4 line writer; AGS3 long text can spill onto <CONT> lines."""
+
+    def __init__(self, version: int, rng: random.Random, cont_density: float, quoted_comma_density: float):
+        self.version = version
+        self.rng = rng
+        self.cont_density = cont_density
+        self.quoted_comma_density = quoted_comma_density
+        self.lines: List[str] = []
+
+    @staticmethod
+    def _row(fields: Sequence[str]) -> str:
+        return ",".join('"' + f.replace('"', '""') + '"' for f in fields)
+
+    def text(self) -> str:
+        if self.rng.random() < self.quoted_comma_density:
+            return self.rng.choice(COMMA_TEXT)
+        return self.rng.choice(LONG_TEXT)
+
+    def group(self, name: str, headings: Sequence[str], units: Sequence[str], types: Sequence[str]):
+        if self.lines:
+            self.lines.append("")
+        if self.version == 4:
+            self.lines.append(self._row(["GROUP", name]))
+            self.lines.append(self._row(["HEADING", *headings]))
+            self.lines.append(self._row(["UNIT", *units]))
+            self.lines.append(self._row(["TYPE", *types]))
+        else:
+            self.lines.append(self._row([f"**{name}"]))
+            self.lines.append(self._row([f"*{h}" for h in headings]))
+            self.lines.append(self._row(["<UNITS>", *units[1:]]))
+
+    def data(self, values: Sequence[str], text_col: int = -1):
+        values = list(values)
+        if self.version == 4:
+            self.lines.append(self._row(["DATA", *values]))
+            return
+        if text_col >= 0 and self.rng.random() < self.cont_density:
+            # Split the text cell: the tail continues on a <CONT> line
+            head, _, tail = values[text_col].rpartition(" ")
+            if head:
+                values[text_col] = head
+                cont = [""] * len(values)
+                cont[0] = "<CONT>"
+                cont[text_col] = tail
+                self.lines.append(self._row(values))
+                self.lines.append(self._row(cont))
+                return
+        self.lines.append(self._row(values))
+
+
+def make_ags_file(
+    holes: int = 20,
+    specimens: int = 3,
+    stages: int = 3,
+    extra_groups: int = 0,
+    extra_rows: int = 1000,
+    cont_density: float = 0.0,
+    quoted_comma_density: float = 0.0,
+    version: int = 4,
+    seed: int = 0,
+    hole_prefix: str = "BH",
+) -> bytes:
+    """
+    One synthetic AGS file.
+
+    holes / specimens / stages: boreholes, triaxial specimens per hole, result rows
+    per specimen. extra_groups / extra_rows: filler groups and their row count.
+    cont_density: share of text cells continued on a <CONT> line (AGS3 only).
+    quoted_comma_density: share of text cells containing commas and quotes.
+    """
+    if version not in (3, 4):
+        raise ValueError("version must be 3 or 4")
+    rng = random.Random(seed)
+    w = _Writer(version, rng, cont_density, quoted_comma_density)
+    hole_id = "LOCA_ID" if version == 4 else "HOLE_ID"
+    hole_ids = [f"{hole_prefix}{i:04d}" for i in range(holes)]
+
+    w.group("PROJ", ["PROJ_ID", "PROJ_NAME"], ["", ""], ["ID", "X"])
+    w.data([f"P{seed}", f"Synthetic project {seed}, {holes} holes"])
+
+    w.group("LOCA" if version == 4 else "HOLE", [hole_id, f"{'LOCA' if version == 4 else 'HOLE'}_TYPE"],
+            ["", ""], ["ID", "PA"])
+    for h in hole_ids:
+        w.data([h, "CP"])
+
+    samp_head = [hole_id, "SAMP_TOP", "SAMP_REF", "SAMP_TYPE", "SAMP_ID", "SAMP_DESC"]
+    w.group("SAMP", samp_head, ["", "m", "", "", "", ""], ["ID", "2DP", "X", "PA", "ID", "X"])
+    specs = []
+    for h in hole_ids:
+        depths = sorted(rng.sample(range(2, 1200), specimens))
+        for j, d in enumerate(depths):
+            top = f"{d * 0.05:.2f}"
+            specs.append((h, top, str(j + 1), f"{h}-S{j + 1}", rng.choice(TEST_TYPES)))
+    for h, top, ref, sid, _ in specs:
+        w.data([h, top, ref, "U", sid, w.text()], text_col=5)
+
+    gen, res = ("TREG", "TRET") if version == 4 else ("TRIG", "TRIX")
+    key_head = [hole_id, "SAMP_TOP", "SAMP_REF", "SAMP_TYPE", "SAMP_ID", "SPEC_REF", "SPEC_DPTH"]
+    key_units = ["", "m", "", "", "", "", "m"]
+    key_types = ["ID", "2DP", "X", "PA", "ID", "X", "2DP"]
+    w.group(gen, key_head + [f"{gen}_TYPE", f"{gen}_COND"], key_units + ["", ""], key_types + ["PA", "X"])
+    for h, top, ref, sid, ttype in specs:
+        w.data([h, top, ref, "U", sid, "A", top, ttype, w.text()], text_col=8)
+
+    w.group(res, key_head + [f"{res}_TESN", f"{res}_CELL", f"{res}_DEVF", f"{res}_PWPF", f"{res}_REM"],
+            key_units + ["", "kPa", "kPa", "kPa", ""], key_types + ["X", "0DP", "0DP", "0DP", "X"])
+    for h, top, ref, sid, ttype in specs:
+        for stage in range(stages):
+            cell = 50 * (stage + 1) + rng.randrange(0, 50)
+            devf = int(cell * rng.uniform(0.6, 2.0))
+            pwpf = "" if ttype == "UU" else str(int(cell * rng.uniform(0.1, 0.6)))
+            w.data([h, top, ref, "U", sid, "A", top, str(stage + 1), str(cell), str(devf), pwpf, w.text()], text_col=11)
+
+    for g in range(extra_groups):
+        name = f"XG{g + 1:02d}"
+        head = [hole_id, f"{name}_TOP", f"{name}_VAL", f"{name}_UNIT", f"{name}_REM"]
+        w.group(name, head, ["", "m", "", "", ""], ["ID", "2DP", "2DP", "PU", "X"])
+        for r in range(extra_rows):
+            w.data([hole_ids[r % len(hole_ids)] if hole_ids else "", f"{r * 0.1:.2f}",
+                    f"{rng.uniform(0, 100):.2f}", "kPa", w.text()], text_col=4)
+
+    return ("\r\n".join(w.lines) + "\r\n").encode("latin-1")
+
+
+def make_campaign(files: int, seed: int = 0, **kwargs) -> List[tuple]:
+    """[(file name, bytes), ...] for several files with distinct holes and seeds."""
+    return [
+        (f"synthetic_{i:04d}.ags", make_ags_file(seed=seed + i, hole_prefix=f"F{i:03d}BH", **kwargs))
+        for i in range(files)
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write deterministic synthetic AGS files")
+    ap.add_argument("out_dir")
+    ap.add_argument("--files", type=int, default=1)
+    ap.add_argument("--holes", type=int, default=20)
+    ap.add_argument("--specimens", type=int, default=3)
+    ap.add_argument("--stages", type=int, default=3)
+    ap.add_argument("--extra-groups", type=int, default=0)
+    ap.add_argument("--extra-rows", type=int, default=1000)
+    ap.add_argument("--cont-density", type=float, default=0.0)
+    ap.add_argument("--quoted-comma-density", type=float, default=0.0)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    campaign = make_campaign(
+        args.files, seed=args.seed, holes=args.holes, specimens=args.specimens, stages=args.stages,
+        extra_groups=args.extra_groups, extra_rows=args.extra_rows, cont_density=args.cont_density,
+        quoted_comma_density=args.quoted_comma_density, version=args.version,
+    )
+    for name, data in campaign:
+        with open(os.path.join(args.out_dir, name), "wb") as fh:
+            fh.write(data)
+    print(f"Wrote {len(campaign)} file(s), {sum(len(d) for _, d in campaign) / 1e6:.1f} MB, to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Strength-envelope fitting: one batched pass over all groups (fit_envelopes) vs a
+per-group loop of np.polyfit calls, on thousands of HOLE_ID / TEST_TYPE / SOURCE_FILE groups.
+
+Run from the repository root:
+    python benchmarks/bench_envelopes.py --groups 5000 --tests 6
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triaxial_ags.envelopes import ENVELOPE_KEYS, fit_envelopes  # noqa: E402
+
+
+def make_st_table(groups: int, tests: int, seed: int = 0) -> pd.DataFrame:
+    """s–t rows: `tests` tests per group on a noisy Kf line, keys typed as in compute_s_t."""
+    rng = np.random.default_rng(seed)
+    g = np.repeat(np.arange(groups), tests)
+    s = rng.uniform(50, 600, len(g))
+    t = rng.uniform(0, 20, groups)[g] + rng.uniform(0.3, 0.6, groups)[g] * s + rng.normal(0, 5, len(g))
+    return pd.DataFrame({
+        "HOLE_ID": pd.Categorical([f"BH{i // 20:05d}" for i in g]),
+        "TEST_TYPE": np.where(g % 2, "CU", "CD"),
+        "SOURCE_FILE": pd.Categorical([f"file_{(i // 10) % 50:02d}.ags" for i in g]),
+        "s": s,
+        "t": t,
+    })
+
+
+def fit_polyfit_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """The per-group approach: groupby, then np.polyfit and np.corrcoef per group."""
+    rows = []
+    for keys, part in df.groupby(ENVELOPE_KEYS, observed=True, sort=True):
+        part = part.dropna(subset=["s", "t"])
+        if len(part) < 2 or part["s"].nunique() < 2:
+            continue
+        tan_alpha, a = np.polyfit(part["s"], part["t"], 1)
+        r2 = np.corrcoef(part["s"], part["t"])[0, 1] ** 2
+        rows.append((*keys, a, tan_alpha, r2))
+    return pd.DataFrame(rows, columns=ENVELOPE_KEYS + ["a", "tan_alpha", "r2"])
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--groups", type=int, default=5_000)
+    ap.add_argument("--tests", type=int, default=6, help="Tests per group")
+    args = ap.parse_args()
+
+    df = make_st_table(args.groups, args.tests)
+    print(f"s–t table: {len(df):,} tests in {args.groups:,} groups")
+
+    looped, t_loop = timed(fit_polyfit_loop, df)
+    batched, t_batch = timed(fit_envelopes, df)
+
+    # Same lines for every fitted group
+    fitted = batched[batched["tan_alpha"].notna()].reset_index(drop=True)
+    assert len(fitted) == len(looped)
+    for col in ("a", "tan_alpha", "r2"):
+        np.testing.assert_allclose(fitted[col], looped[col], rtol=1e-8, atol=1e-9)
+
+    print(f"{'fit':<22}{'time (s)':>10}")
+    print(f"{'np.polyfit per group':<22}{t_loop:>10.3f}")
+    print(f"{'batched (bincount)':<22}{t_batch:>10.3f}")
+    print(f"speed-up: {t_loop / t_batch:.0f}x")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
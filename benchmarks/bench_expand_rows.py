@@ -0,0 +1,71 @@
+"""
+Timing: vectorized expand_rows vs the previous iterrows loop (the equivalence
+tests, with edge cases, are in tests/test_tables.py).
+
+Run from the repository root:
+    python benchmarks/bench_expand_rows.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.test_tables import expand_rows_legacy  # noqa: E402
+from triaxial_ags.tables import expand_rows  # noqa: E402
+
+
+def make_summary(n_rows: int, multi_fraction: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    """Triaxial-summary-like text frame; a fraction of rows carry " | " multi-values."""
+    rng = np.random.default_rng(seed)
+    holes = np.array([f"BH{i}" for i in range(200)], dtype=object)
+    df = pd.DataFrame({
+        "HOLE_ID": holes[rng.integers(0, len(holes), n_rows)],
+        "SPEC_DEPTH": np.round(rng.uniform(0, 60, n_rows), 2).astype(str).astype(object),
+        "TREG_TYPE": np.where(rng.random(n_rows) < 0.5, "CU", "CD").astype(object),
+        "CELL": rng.integers(50, 800, n_rows).astype(str).astype(object),
+        "DEVF": rng.integers(20, 900, n_rows).astype(str).astype(object),
+        "PWPF": rng.integers(0, 300, n_rows).astype(str).astype(object),
+        "SPEC_DESC": np.full(n_rows, "Firm grey CLAY", dtype=object),
+    })
+    multi = np.flatnonzero(rng.random(n_rows) < multi_fraction)
+    df.loc[multi, "CELL"] = df.loc[multi, "CELL"] + " | " + df.loc[multi, "DEVF"] + " | 400"
+    df.loc[multi[::2], "DEVF"] = df.loc[multi[::2], "DEVF"] + " | 120"
+    df.loc[multi[::3], "PWPF"] = np.nan
+    df.loc[multi[::5], "SPEC_DESC"] = "Firm grey CLAY | with sand"
+    return df
+
+
+def timed(func, df):
+    t0 = time.perf_counter()
+    out = func(df)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--legacy-max-rows", type=int, default=100_000,
+                    help="Skip the (slow) iterrows version above this size")
+    args = ap.parse_args()
+
+    print(f"{'rows':>10}{'out rows':>10}{'iterrows (s)':>14}{'vectorized (s)':>16}{'speedup':>9}")
+    for n in args.sizes:
+        df = make_summary(n)
+        new, t_new = timed(expand_rows, df)
+        if n <= args.legacy_max_rows:
+            old, t_old = timed(expand_rows_legacy, df)
+            pd.testing.assert_frame_equal(new, old)
+            print(f"{n:>10,}{len(new):>10,}{t_old:>14.2f}{t_new:>16.3f}{t_old / t_new:>8.0f}x")
+        else:
+            print(f"{n:>10,}{len(new):>10,}{'-':>14}{t_new:>16.3f}{'-':>9}")
+
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
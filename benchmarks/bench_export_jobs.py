@@ -0,0 +1,78 @@
+"""
+Export builds on the app's script thread vs background export jobs: how long the
+caller is blocked, total wall time for the triaxial and all-groups workbooks
+together, the progress reported while they run, and repeated requests coalesced.
+
+Run from the repository root:
+    python benchmarks/bench_export_jobs.py --files 10 --holes 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ags_synth import make_campaign  # noqa: E402
+from triaxial_ags.excel import build_all_groups_excel, build_triaxial_excel  # noqa: E402
+from triaxial_ags.export_jobs import ExportJobs  # noqa: E402
+from triaxial_ags.parsing import parse_ags_file  # noqa: E402
+from triaxial_ags.tables import combine_groups  # noqa: E402
+from triaxial_ags.triaxial import attach_s_t, compute_s_t, generate_triaxial_table  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=10)
+    ap.add_argument("--holes", type=int, default=200)
+    ap.add_argument("--extra-rows", type=int, default=5_000)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    args = ap.parse_args()
+
+    files = make_campaign(args.files, holes=args.holes, specimens=5, stages=3, extra_groups=3,
+                          extra_rows=args.extra_rows, version=args.version)
+    groups = combine_groups([(name, parse_ags_file(b)) for name, b in files])
+    tri_df = generate_triaxial_table(groups)
+    st_df = compute_s_t(tri_df)
+    tri_st = attach_s_t(tri_df, st_df)
+    print(f"Synthetic campaign: {args.files} AGS{args.version} files, {sum(len(g) for g in groups.values()):,} "
+          f"group rows, {len(st_df):,} tests")
+
+    t0 = time.perf_counter()
+    sync = {"triaxial": build_triaxial_excel(tri_st, st_df), "all_groups": build_all_groups_excel(groups)}
+    t_sync = time.perf_counter() - t0
+
+    jobs = ExportJobs()
+    builds = {
+        "triaxial": (lambda progress: build_triaxial_excel(tri_st, st_df, progress=progress), len(tri_st) + len(st_df), 2),
+        "all_groups": (lambda progress: build_all_groups_excel(groups, progress=progress),
+                       sum(len(g) for g in groups.values()), len(groups)),
+    }
+    t0 = time.perf_counter()
+    submitted = {kind: jobs.submit(kind, 1, build, rows, n) for kind, (build, rows, n) in builds.items()}
+    t_submit = time.perf_counter() - t0
+    # A rerun asking for the same exports gets the running jobs back
+    again = {kind: jobs.submit(kind, 1, build, rows, n) for kind, (build, rows, n) in builds.items()}
+    assert all(again[k] is submitted[k] for k in builds) and jobs.coalesced == len(builds)
+    samples = 0
+    while jobs.running():
+        time.sleep(0.05)
+        samples += 1
+    t_jobs = time.perf_counter() - t0
+
+    for kind, job in submitted.items():
+        assert job.error is None, job.error
+        # Same workbook contents (sizes; the files embed their creation time)
+        assert abs(len(job.result) - len(sync[kind])) < 64, kind
+
+    print(f"{'path':<36}{'blocked (s)':>12}{'wall (s)':>10}")
+    print(f"{'build both on the script thread':<36}{t_sync:>12.3f}{t_sync:>10.3f}")
+    print(f"{'background jobs':<36}{t_submit:>12.4f}{t_jobs:>10.3f}   ({samples} progress polls)")
+    for row in jobs.summary():
+        print(f"  {row['export']:<12} {row['rows']:>9,}/{row['total_rows']:,} rows, "
+              f"{row['groups']}/{row['total_groups']} tables, {row['seconds']:.3f} s, {row['requests']} request(s)")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+s–t filtering: isin masks over the string columns on every widget change vs the
+FilterIndex built once per table, at several table sizes; and TEST_TYPE labelling
+(join_distinct) vs the row-wise apply it replaced.
+
+Run from the repository root:
+    python benchmarks/bench_filter_index.py --rows 1000 100000 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triaxial_ags.filter_index import FilterIndex  # noqa: E402
+from triaxial_ags.triaxial import filter_s_t, join_distinct  # noqa: E402
+
+
+def make_st_table(rows: int, seed: int = 0) -> pd.DataFrame:
+    """s–t rows with thousands of holes, a few test types and tens of source files."""
+    rng = np.random.default_rng(seed)
+    holes = rng.integers(0, max(rows // 50, 1), rows)
+    return pd.DataFrame({
+        "HOLE_ID": pd.Categorical([f"BH{h:05d}" for h in holes]),
+        "TRIT_CONS": rng.choice(["CU", "CD", "UU", None], rows),
+        "TRIT_DRAI": rng.choice(["D", "U", None], rows),
+        "SOURCE_FILE": pd.Categorical([f"file_{(h // 20) % 40:02d}.ags" for h in holes]),
+        "s": rng.uniform(50, 600, rows),
+        "t": rng.uniform(0, 300, rows),
+    })
+
+
+def apply_labels(df: pd.DataFrame, cols) -> pd.Series:
+    """The previous TEST_TYPE labelling: distinct values joined per row with apply."""
+    return df[cols].astype(object).apply(lambda x: " | ".join(x.dropna().astype(str).unique()), axis=1)
+
+
+def timed(func, repeat: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = func()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 500_000])
+    ap.add_argument("--repeat", type=int, default=20, help="Filter changes timed per size")
+    ap.add_argument("--apply-rows", type=int, default=20_000, help="Rows for the apply comparison")
+    args = ap.parse_args()
+
+    print(f"{'rows':>9}{'index build (s)':>17}{'isin (ms)':>11}{'index (ms)':>12}")
+    for rows in args.rows:
+        df = make_st_table(rows)
+        df["TEST_TYPE"] = join_distinct(df, ["TRIT_CONS", "TRIT_DRAI"])
+        holes = list(df["HOLE_ID"].cat.categories[::7])
+        types = ["CU | U", "CD | D", "UU"]
+        sources = list(df["SOURCE_FILE"].cat.categories[:30])
+
+        index, t_build = timed(lambda: FilterIndex(df))
+        by_isin, t_isin = timed(lambda: filter_s_t(df, holes, types, sources), args.repeat)
+        by_index, t_index = timed(lambda: filter_s_t(df, holes, types, sources, index=index), args.repeat)
+        pd.testing.assert_frame_equal(by_isin, by_index)
+        print(f"{rows:>9,}{t_build:>17.3f}{t_isin * 1e3:>11.2f}{t_index * 1e3:>12.2f}")
+
+    df = make_st_table(args.apply_rows)
+    cols = ["TRIT_CONS", "TRIT_DRAI"]
+    old, t_apply = timed(lambda: apply_labels(df, cols))
+    new, t_join = timed(lambda: join_distinct(df, cols))
+    assert (old == new.astype(object)).all()
+    print(f"TEST_TYPE labels on {args.apply_rows:,} rows: apply {t_apply:.3f} s, join_distinct {t_join:.3f} s")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Byte-offset group index (ags_index) on a large synthetic AGS file: index build
+time, listing groups and row counts from the saved index, reading one group
+through the memory map vs parsing the whole file, and parsing by group ranges.
+
+Run from the repository root:
+    python benchmarks/bench_group_index.py --extra-groups 10 --extra-rows 100000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ags_synth import make_ags_file  # noqa: E402
+from triaxial_ags.ags_index import AGSFileIndex, build_group_index  # noqa: E402
+from triaxial_ags.parsing import parse_ags_file  # noqa: E402
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--holes", type=int, default=200)
+    ap.add_argument("--extra-groups", type=int, default=10)
+    ap.add_argument("--extra-rows", type=int, default=100_000)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    data = make_ags_file(holes=args.holes, specimens=5, stages=3, extra_groups=args.extra_groups,
+                         extra_rows=args.extra_rows, cont_density=0.1, quoted_comma_density=0.1,
+                         version=args.version)
+    print(f"Synthetic AGS{args.version} file: {len(data) / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "site.ags")
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+        full, t_full = timed(lambda: parse_ags_file(data))
+        _, t_build = timed(lambda: build_group_index(data))
+        first, t_first = timed(lambda: AGSFileIndex(path))
+        again, t_again = timed(lambda: AGSFileIndex(path))
+        counts, t_counts = timed(again.row_counts)
+        one = "TRIX" if args.version == 3 else "TRET"
+        single, t_single = timed(lambda: again.parse([one]))
+        ranged, t_ranged = timed(lambda: again.parse(workers=args.workers))
+
+        # Counts from the index are the parsed row counts; range parses equal the full parse
+        assert not first.loaded_from_disk and again.loaded_from_disk
+        assert counts == {g: len(df) for g, df in full.items()}, counts
+        pd.testing.assert_frame_equal(single[one], full[one])
+        assert list(ranged) == list(full)
+        for g, df in ranged.items():
+            pd.testing.assert_frame_equal(full[g], df)
+
+    print(f"{'step':<34}{'time (s)':>10}")
+    print(f"{'parse whole file':<34}{t_full:>10.3f}")
+    print(f"{'build index (in memory)':<34}{t_build:>10.3f}")
+    print(f"{'index file (build + save)':<34}{t_first:>10.3f}")
+    print(f"{'index file (load saved)':<34}{t_again:>10.3f}")
+    print(f"{'list groups + row counts':<34}{t_counts:>10.4f}")
+    print(f"{f'parse {one} only (mmap)':<34}{t_single:>10.3f}")
+    print(f"{f'parse by ranges, {args.workers} worker(s)':<34}{t_ranged:>10.3f}")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
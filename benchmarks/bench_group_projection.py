@@ -0,0 +1,67 @@
+"""
+Parse time and peak memory of a whole AGS file vs only the triaxial groups
+(parse_ags_file(groups=...)), on a synthetic file dominated by large other groups.
+
+Run from the repository root:
+    python benchmarks/bench_group_projection.py --extra-groups 10 --extra-rows 50000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ags_synth import make_ags_file  # noqa: E402
+from triaxial_ags.parsing import list_groups, parse_ags_file  # noqa: E402
+from triaxial_ags.triaxial import TRIAXIAL_GROUPS  # noqa: E402
+
+
+def measure(func):
+    t0 = time.perf_counter()
+    out = func()
+    elapsed = time.perf_counter() - t0
+    del out
+    tracemalloc.start()
+    out = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--holes", type=int, default=200)
+    ap.add_argument("--extra-groups", type=int, default=10)
+    ap.add_argument("--extra-rows", type=int, default=50_000)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    args = ap.parse_args()
+
+    data = make_ags_file(holes=args.holes, specimens=5, stages=3, extra_groups=args.extra_groups,
+                         extra_rows=args.extra_rows, cont_density=0.1, quoted_comma_density=0.1,
+                         version=args.version)
+    print(f"Synthetic AGS{args.version} file: {len(data) / 1e6:.1f} MB, "
+          f"{args.extra_groups} filler groups x {args.extra_rows:,} rows")
+
+    full, t_full, m_full = measure(lambda: parse_ags_file(data))
+    part, t_part, m_part = measure(lambda: parse_ags_file(data, groups=TRIAXIAL_GROUPS))
+    names, t_list, m_list = measure(lambda: list_groups(data))
+
+    # The projected groups are exactly the full parse's
+    assert set(part) == set(full) & set(TRIAXIAL_GROUPS)
+    for g, df in part.items():
+        pd.testing.assert_frame_equal(full[g], df)
+    assert names == list(full)
+
+    print(f"{'path':<18}{'groups':>7}{'time (s)':>10}{'peak MB':>10}")
+    print(f"{'all groups':<18}{len(full):>7}{t_full:>10.2f}{m_full / 1e6:>10.1f}")
+    print(f"{'triaxial groups':<18}{len(part):>7}{t_part:>10.2f}{m_part / 1e6:>10.1f}")
+    print(f"{'list_groups':<18}{len(names):>7}{t_list:>10.2f}{m_list / 1e6:>10.1f}")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Cold-start check for the headless core: time `import triaxial_ags` plus the
+processing functions in fresh interpreters, and fail if Streamlit/Plotly get
+pulled in or the median exceeds the budget.
+
+Run from the repository root:
+    python benchmarks/bench_import.py --max-seconds 2.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import triaxial_ags
+t1 = time.perf_counter()
+from triaxial_ags import parse_ags_file, combine_groups, generate_triaxial_table, compute_s_t
+t2 = time.perf_counter()
+heavy = sorted(m for m in ("streamlit", "plotly", "xlsxwriter") if m in sys.modules)
+print(json.dumps({"package": t1 - t0, "core": t2 - t0, "heavy": heavy}))
+"""
+
+
+def probe() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--max-seconds", type=float, default=2.0, help="Budget for the median core import")
+    args = ap.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    package = statistics.median(r["package"] for r in runs)
+    core = statistics.median(r["core"] for r in runs)
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+
+    print(f"import triaxial_ags        : {package * 1000:8.1f} ms (median of {args.runs})")
+    print(f"+ parse/combine/triaxial/st: {core * 1000:8.1f} ms")
+    ok = True
+    if heavy:
+        print(f"FAIL: heavy modules imported: {', '.join(heavy)}")
+        ok = False
+    if core > args.max_seconds:
+        print(f"FAIL: core import above budget ({args.max_seconds:.2f} s)")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Equivalence check and timing: CombinedGroupStore.sync vs combine_groups when one
+file is added to (or removed from) a large upload set.
+
+Run from the repository root:
+    python benchmarks/bench_incremental_combine.py --files 200 --rows 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_columnar_parse import make_tret_file  # noqa: E402
+from triaxial_ags.cache import content_key  # noqa: E402
+from triaxial_ags.parsing import parse_ags_file  # noqa: E402
+from triaxial_ags.tables import CombinedGroupStore, combine_groups  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=200)
+    ap.add_argument("--rows", type=int, default=2000, help="TRET rows per file")
+    args = ap.parse_args()
+
+    parsed = []
+    for i in range(args.files + 1):
+        b = make_tret_file(args.rows, n_holes=20 + i % 7)
+        parsed.append((f"file_{i:04d}.ags", content_key(b + str(i).encode()), parse_ags_file(b)))
+
+    def check(store, files):
+        expected = combine_groups([(fname, gdict) for fname, _, gdict in files])
+        assert store.groups.keys() == expected.keys()
+        for g in expected:
+            pd.testing.assert_frame_equal(store.groups[g], expected[g])
+
+    store = CombinedGroupStore()
+    base = parsed[:-1]
+    store.sync(base)
+
+    steps = [
+        ("add one file", parsed),
+        ("remove last file", base),
+        ("remove first file", base[1:]),
+        ("no change", base[1:]),
+    ]
+    print(f"{'step':<20}{'combine_groups (s)':>20}{'store.sync (s)':>16}{'changed':>9}")
+    for label, files in steps:
+        t0 = time.perf_counter()
+        combine_groups([(fname, gdict) for fname, _, gdict in files])
+        t_full = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        changed = store.sync(files)
+        t_sync = time.perf_counter() - t0
+        check(store, files)
+        print(f"{label:<20}{t_full:>20.3f}{t_sync:>16.3f}{len(changed):>9}")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
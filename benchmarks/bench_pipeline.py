@@ -0,0 +1,184 @@
+"""
+End-to-end benchmark on synthetic AGS files: parse → combine → triaxial table →
+s–t → Excel, reporting time, throughput (MB/s, rows/s) and peak memory per stage.
+Results are written as JSON so runs (commits, machines) can be compared.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py --preset medium --json results/medium.json
+    python benchmarks/bench_pipeline.py --preset medium --compare results/medium.json
+    python benchmarks/bench_pipeline.py --files 20 --holes 200 --version 3 --cont-density 0.2
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ags_synth import make_campaign  # noqa: E402
+from triaxial_ags.excel import build_all_groups_excel, build_triaxial_excel  # noqa: E402
+from triaxial_ags.parsing import parse_ags_file  # noqa: E402
+from triaxial_ags.tables import combine_groups  # noqa: E402
+from triaxial_ags.triaxial import attach_s_t, compute_s_t, generate_triaxial_table  # noqa: E402
+
+PRESETS = {
+    "small": dict(files=5, holes=20, specimens=3, stages=3, extra_groups=2, extra_rows=1_000),
+    "medium": dict(files=20, holes=100, specimens=5, stages=3, extra_groups=5, extra_rows=5_000),
+    "large": dict(files=50, holes=400, specimens=5, stages=3, extra_groups=10, extra_rows=20_000),
+}
+
+
+def _rows(groups: Dict[str, pd.DataFrame]) -> int:
+    return int(sum(len(df) for df in groups.values()))
+
+
+def measure(func: Callable, memory: bool, repeat: int):
+    """(result, best seconds over repeat runs, peak traced MB or None)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def run(params: dict, memory: bool = True, repeat: int = 1, excel: bool = True) -> Tuple[List[dict], int]:
+    """Run every stage on a synthetic campaign; returns (per-stage results, input bytes)."""
+    gen = {k: v for k, v in params.items() if k != "files"}
+    files = make_campaign(params["files"], **gen)
+    in_bytes = sum(len(b) for _, b in files)
+    stages = []
+
+    def record(name, func, n_bytes=None, rows_in=None, rows_out=None, out_bytes=None):
+        result, seconds, peak = measure(func, memory, repeat)
+        r_out = rows_out(result) if rows_out is not None else None
+        rows = rows_in if rows_in is not None else r_out
+        stages.append({
+            "stage": name,
+            "seconds": round(seconds, 4),
+            "mb_per_s": round(n_bytes / 1e6 / seconds, 2) if n_bytes and seconds else None,
+            "rows_in": rows_in,
+            "rows_out": r_out,
+            "rows_per_s": round(rows / seconds, 1) if rows and seconds else None,
+            "output_bytes": out_bytes(result) if out_bytes is not None else None,
+            "peak_mb": round(peak, 1) if peak is not None else None,
+        })
+        return result
+
+    parsed = record(
+        "parse", lambda: [(name, parse_ags_file(b)) for name, b in files], n_bytes=in_bytes,
+        rows_out=lambda res: sum(_rows(g) for _, g in res),
+    )
+    parsed_rows = sum(_rows(g) for _, g in parsed)
+    combined = record("combine", lambda: combine_groups(parsed), rows_in=parsed_rows, rows_out=_rows)
+    combined_rows = _rows(combined)
+    tri_df = record("triaxial", lambda: generate_triaxial_table(combined), rows_in=combined_rows, rows_out=len)
+    st_df = record("s_t", lambda: compute_s_t(tri_df, mode="Effective"), rows_in=len(tri_df), rows_out=len)
+    with_st = record("attach_s_t", lambda: attach_s_t(tri_df, st_df), rows_in=len(tri_df), rows_out=len)
+    if excel:
+        record("excel_groups", lambda: build_all_groups_excel(combined), rows_in=combined_rows, out_bytes=len)
+        record("excel_triaxial", lambda: build_triaxial_excel(with_st, st_df), rows_in=len(with_st), out_bytes=len)
+    return stages, in_bytes
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_table(stages: List[dict], baseline: Dict[str, dict] = None):
+    head = f"{'stage':<16}{'seconds':>9}{'MB/s':>9}{'rows/s':>13}{'peak MB':>9}"
+    print(head + (f"{'vs base':>9}" if baseline else ""))
+    for s in stages:
+        line = (
+            f"{s['stage']:<16}{s['seconds']:>9.3f}"
+            f"{s['mb_per_s'] if s['mb_per_s'] is not None else '-':>9}"
+            f"{s['rows_per_s'] if s['rows_per_s'] is not None else '-':>13}"
+            f"{s['peak_mb'] if s['peak_mb'] is not None else '-':>9}"
+        )
+        if baseline:
+            base = baseline.get(s["stage"])
+            line += f"{s['seconds'] / base['seconds']:>8.2f}x" if base and base["seconds"] else f"{'-':>9}"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name, typ in [("files", int), ("holes", int), ("specimens", int), ("stages", int),
+                      ("extra-groups", int), ("extra-rows", int)]:
+        ap.add_argument(f"--{name}", type=typ, default=None, help="Override the preset")
+    ap.add_argument("--cont-density", type=float, default=0.1, help="Share of text cells on <CONT> lines (AGS3)")
+    ap.add_argument("--quoted-comma-density", type=float, default=0.1)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=1, help="Best-of-N timing")
+    ap.add_argument("--no-memory", action="store_true", help="Skip the (slower) tracemalloc pass")
+    ap.add_argument("--no-excel", action="store_true")
+    ap.add_argument("--json", default=None, help="Write results to this file")
+    ap.add_argument("--compare", default=None, help="Baseline JSON to compare stage times against")
+    args = ap.parse_args()
+
+    params = dict(PRESETS[args.preset])
+    for key in ("files", "holes", "specimens", "stages", "extra_groups", "extra_rows"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    params.update(cont_density=args.cont_density, quoted_comma_density=args.quoted_comma_density,
+                  version=args.version, seed=args.seed)
+
+    stages, in_bytes = run(params, memory=not args.no_memory, repeat=args.repeat, excel=not args.no_excel)
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "params": {"preset": args.preset, **params, "input_mb": round(in_bytes / 1e6, 2), "repeat": args.repeat},
+        "stages": stages,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            base = json.load(fh)
+        if {k: v for k, v in base.get("params", {}).items() if k != "repeat"} != \
+                {k: v for k, v in results["params"].items() if k != "repeat"}:
+            print("note: baseline was run with different parameters")
+        baseline = {s["stage"]: s for s in base["stages"]}
+
+    print(f"input: {params['files']} AGS{params['version']} file(s), {in_bytes / 1e6:.1f} MB")
+    print_table(stages, baseline)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Reopening a project: re-parsing every AGS file vs loading the triaxial groups
+from the SQLite project store (all holes, and a filtered subset by HOLE_ID).
+
+Run from the repository root:
+    python benchmarks/bench_project_store.py --files 20 --holes 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ags_synth import make_campaign  # noqa: E402
+from triaxial_ags.cache import content_key  # noqa: E402
+from triaxial_ags.parsing import parse_ags_file  # noqa: E402
+from triaxial_ags.project_store import ProjectStore  # noqa: E402
+from triaxial_ags.tables import combine_groups  # noqa: E402
+from triaxial_ags.triaxial import TRIAXIAL_GROUPS, generate_triaxial_table  # noqa: E402
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=20)
+    ap.add_argument("--holes", type=int, default=100)
+    ap.add_argument("--extra-rows", type=int, default=5_000)
+    ap.add_argument("--version", type=int, choices=[3, 4], default=4)
+    args = ap.parse_args()
+
+    files = make_campaign(args.files, holes=args.holes, specimens=5, stages=3, extra_groups=3,
+                          extra_rows=args.extra_rows, version=args.version)
+    print(f"Synthetic campaign: {args.files} AGS{args.version} files, "
+          f"{sum(len(b) for _, b in files) / 1e6:.1f} MB")
+
+    def reparse():
+        return generate_triaxial_table(combine_groups([(name, parse_ags_file(b)) for name, b in files]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "project.sqlite")
+        full, t_parse = timed(reparse)
+        parsed = [(name, parse_ags_file(b)) for name, b in files]
+        with ProjectStore(path) as store:
+            _, t_store = timed(lambda: store.add_files(parsed, [content_key(b) for _, b in files]))
+        with ProjectStore(path) as store:
+            loaded, t_load = timed(lambda: generate_triaxial_table(store.load_groups(TRIAXIAL_GROUPS)))
+            holes = store.distinct("TRET" if args.version == 4 else "TRIX", "HOLE_ID")[:5]
+            subset, t_subset = timed(
+                lambda: generate_triaxial_table(store.load_groups(TRIAXIAL_GROUPS, holes=holes))
+            )
+        size_mb = os.path.getsize(path) / 1e6
+
+    # The store gives the same table (dtypes aside), and the subset is its slice
+    pd.testing.assert_frame_equal(full, loaded, check_dtype=False, check_categorical=False)
+    expected = full[full["HOLE_ID"].isin(holes)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(expected, subset.reset_index(drop=True), check_dtype=False, check_categorical=False)
+
+    print(f"{'path':<34}{'rows':>8}{'time (s)':>10}")
+    print(f"{'re-parse all files':<34}{len(full):>8}{t_parse:>10.3f}")
+    print(f"{'store files (once)':<34}{'':>8}{t_store:>10.3f}   ({size_mb:.1f} MB database)")
+    print(f"{'load from store':<34}{len(loaded):>8}{t_load:>10.3f}")
+    print(f"{f'load {len(holes)} holes from store':<34}{len(subset):>8}{t_subset:>10.3f}")
+    print("equivalence: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Build time and browser payload (figure JSON size) of the s–t plot per render mode.
+
+Run from the repository root:
+    python benchmarks/bench_st_plot.py --sizes 10000 100000 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triaxial_ags.plotting import build_st_figure  # noqa: E402
+
+
+def make_s_t(n: int, seed: int = 0) -> pd.DataFrame:
+    """s–t-table-like frame: clustered failure points per test type."""
+    rng = np.random.default_rng(seed)
+    types = rng.choice(["CU", "CD", "UU"], n)
+    s = rng.gamma(4.0, 60.0, n)
+    t = s * np.where(types == "UU", 0.05, 0.5) + rng.normal(0, 15, n) + np.where(types == "UU", 60, 5)
+    return pd.DataFrame({
+        "HOLE_ID": rng.choice([f"BH{i:03d}" for i in range(200)], n),
+        "TEST_TYPE": types,
+        "SPEC_DEPTH": np.round(rng.uniform(0, 60, n), 2),
+        "s": s,
+        "t": t,
+        "SOURCE_FILE": rng.choice([f"file_{i}.ags" for i in range(20)], n),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    ap.add_argument("--svg-max-points", type=int, default=100_000, help="Skip SVG above this size")
+    args = ap.parse_args()
+
+    print(f"{'points':>10}{'mode':>9}{'traces':>8}{'markers':>10}{'build (s)':>11}{'JSON (MB)':>11}")
+    for n in args.sizes:
+        df = make_s_t(n)
+        for render in ("svg", "webgl", "density"):
+            if render == "svg" and n > args.svg_max_points:
+                continue
+            t0 = time.perf_counter()
+            fig = build_st_figure(df, "Effective", color_by="TEST_TYPE", facet_col="SOURCE_FILE" if n < 50_000 else None,
+                                  render=render)
+            payload = len(fig.to_json())
+            elapsed = time.perf_counter() - t0
+            markers = sum(len(tr.x) for tr in fig.data)
+            print(f"{n:>10,}{render:>9}{len(fig.data):>8}{markers:>10,}{elapsed:>11.2f}{payload / 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Size and timing of the triaxial join: TriaxialJoin vs the previous chain of outer
+merges on raw HOLE_ID / SPEC_DEPTH text.
+
+Run from the repository root:
+    python benchmarks/bench_triaxial_join.py --specimens 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triaxial_ags.triaxial import TriaxialJoin, generate_triaxial_table  # noqa: E402
+
+
+def make_campaign(n_specimens: int, stages: int = 3, seed: int = 0):
+    """
+    AGS4-like SAMP / TREG / TRET groups. Depths are written inconsistently
+    ("1.5" vs "1.50"), a few TREG rows are repeated and each specimen has
+    several TRET stages, as in real campaigns.
+    """
+    rng = np.random.default_rng(seed)
+    holes = np.array([f"BH{i:03d}" for i in range(max(1, n_specimens // 20))], dtype=object)
+    hole = holes[rng.integers(0, len(holes), n_specimens)]
+    depth = np.round(rng.uniform(0.5, 60, n_specimens), 2)
+    spec = pd.DataFrame({"LOCA_ID": hole, "SPEC_DPTH": depth}).drop_duplicates(ignore_index=True)
+    n = len(spec)
+    as_text = spec["SPEC_DPTH"].map("{:.2f}".format)
+    as_short = spec["SPEC_DPTH"].map(str)
+
+    samp = pd.DataFrame({"LOCA_ID": spec["LOCA_ID"], "SAMP_TOP": as_text, "SAMP_ID": [f"S{i}" for i in range(n)]})
+    treg = pd.DataFrame({
+        "LOCA_ID": spec["LOCA_ID"], "SPEC_DPTH": as_short,
+        "TREG_TYPE": np.where(rng.random(n) < 0.5, "CU", "CD").astype(object),
+    })
+    treg = pd.concat([treg, treg.sample(frac=0.02, random_state=seed)], ignore_index=True)
+    rep = np.repeat(np.arange(n), stages)
+    tret = pd.DataFrame({
+        "LOCA_ID": spec["LOCA_ID"].to_numpy()[rep], "SPEC_DPTH": as_text.to_numpy()[rep],
+        "TRET_CELL": rng.integers(50, 800, len(rep)).astype(str).astype(object),
+        "TRET_DEVF": rng.integers(20, 900, len(rep)).astype(str).astype(object),
+        "TRET_PWPF": rng.integers(0, 300, len(rep)).astype(str).astype(object),
+    })
+    return {"SAMP": samp, "TREG": treg, "TRET": tret}
+
+
+def legacy_rows(groups) -> int:
+    """Row count of the previous outer-merge chain (raw text keys)."""
+    norm = {g: df.rename(columns={"LOCA_ID": "HOLE_ID", "SPEC_DPTH": "SPEC_DEPTH"}) for g, df in groups.items()}
+    merged = norm["SAMP"]
+    merged = pd.merge(merged, norm["TREG"], on="HOLE_ID", how="outer")  # SAMP has no SPEC_DEPTH
+    merged = pd.merge(merged, norm["TRET"], on=["HOLE_ID", "SPEC_DEPTH"], how="outer")
+    return len(merged)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--specimens", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--legacy-max-specimens", type=int, default=10_000,
+                    help="Skip the (many-to-many) legacy merge above this size")
+    args = ap.parse_args()
+
+    print(f"{'specimens':>10}{'TRET rows':>11}{'legacy rows':>13}{'plan rows':>11}{'plan (s)':>10}{'table (s)':>11}")
+    for n in args.specimens:
+        groups = make_campaign(n)
+        t0 = time.perf_counter()
+        join = TriaxialJoin(groups)
+        report = join.report
+        t_plan = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        table = generate_triaxial_table(groups, join=join)
+        t_table = time.perf_counter() - t0
+        assert len(table) == join.estimated_rows == len(groups["TRET"])
+        assert table["TREG_TYPE"].notna().all() and table["SAMP_ID"].notna().all()
+        legacy = f"{legacy_rows(groups):,}" if n <= args.legacy_max_specimens else "-"
+        print(f"{n:>10,}{len(groups['TRET']):>11,}{legacy:>13}{join.estimated_rows:>11,}{t_plan:>10.3f}{t_table:>11.3f}")
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
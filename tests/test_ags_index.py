@@ -0,0 +1,30 @@
+"""
+Group index: byte ranges and row counts agree with the parser.
+"""
+import pandas as pd
+
+from triaxial_ags.ags_index import build_group_index, group_bytes, row_counts
+from triaxial_ags.parsing import parse_ags_file
+
+AGS4 = b'''"GROUP","PROJ"
+"HEADING","PROJ_ID","PROJ_NAME"
+"UNIT","",""
+"TYPE","ID","X"
+"DATA","P1","Test"
+
+"Group","TRET"
+"Heading","LOCA_ID","SPEC_DPTH","TRET_CELL"
+"Unit","","m","kPa"
+"Type","ID","2DP","0DP"
+"Data","BH1","1.50","100"
+"data","BH2","3.00","200"
+'''
+
+
+def test_index_matches_parser_for_mixed_case_descriptors():
+    index = build_group_index(AGS4)
+    assert row_counts(index) == {"PROJ": 1, "TRET": 2}
+    parsed = parse_ags_file(AGS4)
+    assert {g: len(df) for g, df in parsed.items()} == row_counts(index)
+    # A group read from its byte range parses to the same frame
+    pd.testing.assert_frame_equal(parse_ags_file(group_bytes(AGS4, index, ["tret"]))["TRET"], parsed["TRET"])
@@ -0,0 +1,107 @@
+"""
+Typed columns: kinds from AGS4 TYPE rows and AGS3 headings, and dtypes kept through
+combining and exports.
+"""
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.ags_types import CATEGORY, NUMERIC, TEXT, heading_kind, type_kind
+from triaxial_ags.excel import build_all_groups_excel
+from triaxial_ags.parquet_export import build_groups_parquet_zip
+from triaxial_ags.parsing import parse_ags_file
+from triaxial_ags.tables import combine_groups, concat_frames
+
+AGS4 = b'''"GROUP","TRET"
+"HEADING","LOCA_ID","SPEC_DPTH","TRET_CELL","TRET_TESN","TRET_TYPE","TRET_MC"
+"UNIT","","m","kPa","","","%"
+"TYPE","ID","2DP","0DP","X","PA","U"
+"DATA","BH1","1.50","100","1","CU","20"
+"DATA","BH1","3.00","200","2","CU","<1"
+"DATA","BH2","4.50","300","3","CU","22"
+"DATA","BH2","6.00","400","4","CD",""
+'''
+
+AGS3 = b'''"**TRIX"
+"*HOLE_ID","*SAMP_TOP","*TRIX_TESN","*TRIX_CELL","*TRIX_SPEC_TYPE","*TRIX_REM","*XXXX_VAL","*XXXX_DATE","*XXXX_CODE"
+"<UNITS>","m","","kPa","","","kN","dd/mm/yyyy",""
+"BH1","1.50","1","100","UU","ok","1.2","01/02/2020","A1"
+"BH1","3.00","2","200","UU","","3.4","02/02/2020","A2"
+"BH2","4.50","3","300","UU","","5.6","03/02/2020","A3"
+"BH2","6.00","4","400","CU","","7.8","04/02/2020","A4"
+'''
+
+
+def test_ags4_type_mapping():
+    assert [type_kind(t) for t in ("DP", "2DP", "3SF", "SCI", "U", "MC")] == [NUMERIC] * 6
+    assert [type_kind(t) for t in ("ID", "PA", "PT", "PU")] == [CATEGORY] * 4
+    assert [type_kind(t) for t in ("X", "XN", "DT", "T")] == [TEXT] * 4
+    assert type_kind("") is None
+
+    df = parse_ags_file(AGS4)["TRET"]
+    assert isinstance(df["HOLE_ID"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["TRET_TYPE"].dtype, pd.CategoricalDtype)
+    assert df["SPEC_DEPTH"].dtype == np.float64
+    assert df["TRET_CELL"].tolist() == [100.0, 200.0, 300.0, 400.0]
+    assert not pd.api.types.is_numeric_dtype(df["TRET_TESN"])
+
+
+def test_non_numeric_value_keeps_text():
+    # "<1" in a U (numeric) column: converting would lose it, so the column stays text
+    df = parse_ags_file(AGS4)["TRET"]
+    assert not pd.api.types.is_numeric_dtype(df["TRET_MC"])
+    assert df["TRET_MC"].tolist()[:3] == ["20", "<1", "22"]
+
+
+def test_ags3_fallback_types():
+    # Dictionary, then suffix rules, then units
+    assert heading_kind("HOLE_ID") == CATEGORY
+    assert heading_kind("SAMP_TOP") == NUMERIC
+    assert heading_kind("TRIX_TESN") == TEXT
+    assert heading_kind("TRIX_SPEC_TYPE") == CATEGORY
+    assert heading_kind("XXXX_DPTH") == NUMERIC
+    assert heading_kind("XXXX_REM", "kPa") == TEXT
+    assert heading_kind("XXXX_VAL", "kN") == NUMERIC
+    assert heading_kind("XXXX_DATE", "dd/mm/yyyy") == TEXT
+    assert heading_kind("XXXX_CODE") == TEXT
+
+    df = parse_ags_file(AGS3)["TRIX"]
+    assert isinstance(df["HOLE_ID"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["TRIX_SPEC_TYPE"].dtype, pd.CategoricalDtype)
+    for col in ("SAMP_TOP", "TRIX_CELL", "XXXX_VAL"):
+        assert df[col].dtype == np.float64
+    for col in ("TRIX_TESN", "TRIX_REM", "XXXX_DATE", "XXXX_CODE"):
+        assert not pd.api.types.is_numeric_dtype(df[col])
+
+
+def test_categoricals_survive_concat():
+    a = parse_ags_file(AGS4)["TRET"]
+    b = a.assign(HOLE_ID=pd.Categorical(["BH3"] * len(a)))
+    out = concat_frames([a, b])
+    assert isinstance(out["HOLE_ID"].dtype, pd.CategoricalDtype)
+    assert out["HOLE_ID"].tolist() == ["BH1", "BH1", "BH2", "BH2"] + ["BH3"] * 4
+
+    combined = combine_groups([("a.ags", {"TRET": a}), ("b.ags", {"TRET": b})])["TRET"]
+    for col in ("HOLE_ID", "SOURCE_FILE"):
+        assert isinstance(combined[col].dtype, pd.CategoricalDtype)
+    assert combined["SOURCE_FILE"].value_counts().to_dict() == {"a.ags": 4, "b.ags": 4}
+
+
+def test_typed_exports_round_trip():
+    groups = combine_groups([("site.ags", parse_ags_file(AGS4))])
+    tret = groups["TRET"]
+
+    excel = pd.read_excel(io.BytesIO(build_all_groups_excel(groups)), sheet_name="TRET")
+    assert excel["HOLE_ID"].tolist() == tret["HOLE_ID"].tolist()
+    assert excel["TRET_CELL"].tolist() == tret["TRET_CELL"].tolist()
+    assert excel["SPEC_DEPTH"].tolist() == tret["SPEC_DEPTH"].tolist()
+
+    with zipfile.ZipFile(io.BytesIO(build_groups_parquet_zip(groups))) as zf:
+        parquet = pd.read_parquet(io.BytesIO(zf.read("TRET.parquet")))
+    for col in ("HOLE_ID", "TRET_TYPE", "SOURCE_FILE"):
+        assert isinstance(parquet[col].dtype, pd.CategoricalDtype)
+        assert parquet[col].tolist() == tret[col].tolist()
+    assert parquet["TRET_CELL"].dtype == np.float64
+    assert parquet["TRET_MC"].tolist() == tret["TRET_MC"].tolist()
@@ -0,0 +1,70 @@
+"""
+Strength envelopes: the batched fit against a per-group np.polyfit reference.
+"""
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.envelopes import ENVELOPE_KEYS, fit_envelopes
+
+
+def polyfit_reference(df: pd.DataFrame) -> dict:
+    """{keys: (a, tan_alpha, r2, phi_deg, c)} from np.polyfit per group; None where there is no fit."""
+    ref = {}
+    for keys, part in df.groupby(ENVELOPE_KEYS, observed=True, sort=True):
+        part = part.dropna(subset=["s", "t"])
+        if len(part) < 2 or part["s"].nunique() < 2:
+            ref[keys] = None
+            continue
+        tan_alpha, a = np.polyfit(part["s"], part["t"], 1)
+        r2 = np.corrcoef(part["s"], part["t"])[0, 1] ** 2
+        phi = np.arcsin(tan_alpha) if abs(tan_alpha) < 1 else np.nan
+        ref[keys] = (a, tan_alpha, r2, np.degrees(phi), a / np.cos(phi))
+    return ref
+
+
+def st_table() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    g = np.repeat(np.arange(40), 5)
+    s = rng.uniform(50, 600, len(g))
+    t = rng.uniform(0, 20, 40)[g] + rng.uniform(0.3, 0.6, 40)[g] * s + rng.normal(0, 5, len(g))
+    df = pd.DataFrame({
+        "HOLE_ID": pd.Categorical([f"BH{i // 4:02d}" for i in g]),
+        "TEST_TYPE": np.where(g % 2, "CU", "CD"),
+        "SOURCE_FILE": pd.Categorical([f"file_{i % 3}.ags" for i in g]),
+        "s": s,
+        "t": t,
+    })
+    degenerate = pd.DataFrame({
+        "HOLE_ID": pd.Categorical(["ONE", "FLAT", "FLAT", "FLAT", "STEEP", "STEEP", "NAN", "NAN"]),
+        "TEST_TYPE": "CU",
+        "SOURCE_FILE": pd.Categorical(["x.ags"] * 8),
+        # ONE: a single point; FLAT: no spread in s; STEEP: tanα = 2; NAN: one usable point
+        "s": [100.0, 200.0, 200.0, 200.0, 100.0, 200.0, 100.0, np.nan],
+        "t": [50.0, 80.0, 90.0, 100.0, 10.0, 210.0, 40.0, 60.0],
+    })
+    return pd.concat([df, degenerate], ignore_index=True)
+
+
+def test_fit_matches_polyfit():
+    df = st_table()
+    fits = fit_envelopes(df).set_index(ENVELOPE_KEYS)
+    ref = polyfit_reference(df)
+    assert len(fits) == len(ref)
+    for keys, expected in ref.items():
+        row = fits.loc[keys]
+        got = row[["a", "tan_alpha", "r2", "phi_deg", "c"]].to_numpy(dtype=float)
+        if expected is None:
+            assert np.isnan(got).all(), keys
+        else:
+            np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=str(keys))
+
+
+def test_degenerate_groups():
+    fits = fit_envelopes(st_table()).set_index("HOLE_ID")
+    for hole, n in (("ONE", 1), ("FLAT", 3), ("NAN", 1)):
+        assert fits.loc[hole, "n"] == n
+        assert np.isnan(fits.loc[hole, ["a", "tan_alpha", "phi_deg", "c", "r2"]].to_numpy(dtype=float)).all()
+    # |tanα| >= 1 is a line but not a Mohr–Coulomb envelope
+    steep = fits.loc["STEEP"]
+    assert steep["tan_alpha"] == 2.0 and steep["a"] == -190.0
+    assert np.isnan(steep["phi_deg"]) and np.isnan(steep["c"])
@@ -0,0 +1,38 @@
+"""
+Background export jobs: results, coalescing of duplicate submissions, failures.
+"""
+import threading
+
+from triaxial_ags.export_jobs import DONE, FAILED, ExportJobs
+
+
+def test_duplicate_submissions_share_one_build():
+    release = threading.Event()
+    builds = []
+
+    def build(progress):
+        builds.append(1)
+        release.wait(5)
+        progress(10, 1)
+        return b"xlsx"
+
+    jobs = ExportJobs(max_workers=2)
+    job = jobs.submit("triaxial", 1, build, total_rows=10, total_groups=1)
+    # Looking a job up is not a request
+    assert jobs.get("triaxial", 1) is job and jobs.get("triaxial", 2) is None
+    assert jobs.submit("triaxial", 1, build) is job
+    release.set()
+    assert job.wait(5)
+    assert (job.status, job.result, job.rows, job.fraction) == (DONE, b"xlsx", 10, 1.0)
+    assert len(builds) == 1 and jobs.coalesced == 1 and job.requests == 2
+
+
+def test_new_version_and_failures_start_a_new_job():
+    jobs = ExportJobs(max_workers=1)
+    failed = jobs.submit("all_groups", 1, lambda progress: 1 / 0)
+    failed.wait(5)
+    assert failed.status == FAILED and isinstance(failed.error, ZeroDivisionError)
+    retried = jobs.submit("all_groups", 1, lambda progress: b"ok")
+    newer = jobs.submit("all_groups", 2, lambda progress: b"new")
+    assert retried is not failed and newer is not retried and jobs.coalesced == 0
+    assert newer.wait(5) and jobs.get("all_groups").result == b"new"
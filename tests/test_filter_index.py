@@ -0,0 +1,70 @@
+"""
+s–t filter index: bitmap and code-lookup selections against chained isin masks, and
+TEST_TYPE labels against the row-wise apply they replaced.
+"""
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.filter_index import BITMAP_MAX_VALUES, FilterIndex
+from triaxial_ags.triaxial import join_distinct
+
+
+def make_st_table(rows: int = 3_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    holes = rng.integers(0, 200, rows)
+    hole_ids = np.array([f"BH{h:03d}" for h in holes], dtype=object)
+    hole_ids[rng.random(rows) < 0.05] = None
+    return pd.DataFrame({
+        "HOLE_ID": pd.Categorical(hole_ids),
+        "TRIT_CONS": rng.choice(["CU", "CD", "UU", None], rows),
+        "TRIT_DRAI": rng.choice(["D", "U", None], rows),
+        "SOURCE_FILE": rng.choice(["a.ags", "b.ags", "c.ags", None], rows),
+        "s": rng.uniform(50, 600, rows),
+    })
+
+
+def isin_positions(df: pd.DataFrame, **picked) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for col, chosen in picked.items():
+        if chosen:
+            mask &= df[col].isin(chosen).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def test_selection_matches_isin():
+    df = make_st_table()
+    df["TEST_TYPE"] = join_distinct(df, ["TRIT_CONS", "TRIT_DRAI"])
+    index = FilterIndex(df)
+    # HOLE_ID has too many values for bitmaps and goes through the code lookup
+    assert len(index.values["HOLE_ID"]) > BITMAP_MAX_VALUES
+    assert "HOLE_ID" not in index.bitmaps
+    assert {"TEST_TYPE", "SOURCE_FILE"} <= set(index.bitmaps)
+
+    holes = index.values["HOLE_ID"][::3] + ["BH999"]  # plus a hole not in the table
+    selections = [
+        {"HOLE_ID": holes},
+        {"TEST_TYPE": ["CU | U", "UU", "XX"]},
+        {"SOURCE_FILE": ["a.ags", "c.ags"]},
+        {"SOURCE_FILE": index.values["SOURCE_FILE"]},  # every value, but not the missing rows
+        {"HOLE_ID": holes, "TEST_TYPE": ["CD | D", "CD"], "SOURCE_FILE": ["b.ags"]},
+        {"HOLE_ID": ["BH999"]},
+        {"HOLE_ID": [], "TEST_TYPE": None},
+    ]
+    for picked in selections:
+        expected = isin_positions(df, **picked)
+        rows = index.positions(**picked)
+        if rows is None:
+            assert len(expected) == len(df), picked
+        else:
+            np.testing.assert_array_equal(rows, expected, err_msg=str(picked))
+        pd.testing.assert_frame_equal(index.select(df, **picked), df.iloc[expected])
+
+
+def test_join_distinct_matches_apply():
+    df = make_st_table(2_000)
+    df["TRIT_CELL"] = np.where(np.arange(len(df)) % 4, df["TRIT_CONS"], "CU")  # repeats a value
+    cols = ["TRIT_CONS", "TRIT_DRAI", "TRIT_CELL"]
+    applied = df[cols].astype(object).apply(lambda x: " | ".join(x.dropna().astype(str).unique()), axis=1)
+    labels = join_distinct(df, cols)
+    assert isinstance(labels.dtype, pd.CategoricalDtype)
+    assert labels.astype(object).tolist() == applied.tolist()
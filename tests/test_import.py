@@ -0,0 +1,23 @@
+"""
+Cold start of the headless core: importing the processing functions must not load
+the UI or export libraries (benchmarks/bench_import.py times the same import).
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys
+from triaxial_ags import parse_ags_file, combine_groups, generate_triaxial_table, compute_s_t
+print(json.dumps(sorted(m for m in ("streamlit", "plotly", "xlsxwriter") if m in sys.modules)))
+"""
+
+
+def test_core_import_leaves_out_heavy_modules():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
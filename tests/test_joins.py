@@ -0,0 +1,31 @@
+"""
+Join keys: shared HOLE_ID codes and SPEC_DEPTH matched within the depth tolerance.
+"""
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.joins import MISSING_KEY, depth_keys, hole_codes, quantize_depth, table_keys
+
+
+def test_depth_text_variants_share_a_key():
+    a, b = table_keys(
+        [pd.Series(["BH1", "BH1"]), pd.Series(["BH1", " BH1 "])],
+        [pd.Series(["1.5", "3"]), pd.Series(["1.50", "3.000"])],
+        [2, 2],
+    )
+    assert a.tolist() == b.tolist()
+    assert a[0] != a[1]
+
+
+def test_tolerance_chains_successive_depths():
+    # 1.000 / 1.004 / 1.008 chain (each gap <= 0.005) though the ends are 8 mm apart;
+    # 1.020 is too far; the same depth in another hole gets its own key
+    holes = pd.Series(["BH1", "BH1", "BH1", "BH1", "BH2", "BH1", None])
+    depths = pd.Series([1.000, 1.004, 1.008, 1.020, 1.000, None, 1.000])
+    (codes,) = hole_codes([holes])
+    (keys,) = depth_keys([codes], [quantize_depth(depths, len(depths))], tolerance=0.005)
+    assert keys[0] == keys[1] == keys[2]
+    assert len({keys[0], keys[3], keys[4], keys[5]}) == 4
+    assert keys[6] == MISSING_KEY
+    (strict,) = depth_keys([codes], [quantize_depth(depths, len(depths))], tolerance=0.0)
+    assert len(np.unique(strict[:4])) == 4
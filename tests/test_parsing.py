@@ -0,0 +1,47 @@
+"""
+<CONT> continuation lines in AGS3 and AGS4 files.
+"""
+from triaxial_ags.parsing import parse_ags_file
+
+AGS4 = b'''"GROUP","SAMP"
+"HEADING","LOCA_ID","SAMP_TOP","SAMP_DESC","SAMP_REM"
+"UNIT","","m","",""
+"TYPE","ID","2DP","X","X"
+"<CONT>","","","Orphan",""
+"DATA","BH1","1.50","Clay","wet"
+"<CONT>","","","Clay","wet"
+"<CONT>","","","silty",""
+"<CONT>","","","sandy","soft"
+"<CONT>","","","silty",""
+"DATA","BH2","3.00","Sand",""
+'''
+
+AGS3 = b'''"**SAMP"
+"*HOLE_ID","*SAMP_TOP","*SAMP_DESC","*SAMP_REM"
+"<UNITS>","m","",""
+"<CONT>","","Orphan",""
+"BH1","1.50","Clay","wet"
+"<CONT>","","Clay","wet"
+"<CONT>","","silty",""
+"<CONT>","","sandy","soft"
+"<CONT>","","silty",""
+"BH2","3.00","Sand",""
+'''
+
+
+def check_samp(data: bytes):
+    df = parse_ags_file(data, typed=False)["SAMP"]
+    # The leading <CONT> has no row to continue and is dropped
+    assert df["HOLE_ID"].tolist() == ["BH1", "BH2"]
+    # Repeated values are skipped, further continuation lines joined with " | "
+    assert df["SAMP_DESC"].tolist() == ["Clay | silty | sandy", "Sand"]
+    assert df["SAMP_REM"].tolist() == ["wet | soft", ""]
+    assert df["SAMP_TOP"].tolist() == ["1.50", "3.00"]
+
+
+def test_ags4_cont():
+    check_samp(AGS4)
+
+
+def test_ags3_cont():
+    check_samp(AGS3)
@@ -0,0 +1,23 @@
+"""
+Project store: ranges and filtered loads from the SQLite file.
+"""
+import pandas as pd
+
+from triaxial_ags.project_store import ProjectStore
+
+
+def test_value_range_ignores_text_values(tmp_path):
+    with ProjectStore(str(tmp_path / "project.sqlite")) as store:
+        store.add_file("a.ags", {"TRIX": pd.DataFrame({"HOLE_ID": ["BH1", "BH1"], "SPEC_DEPTH": [1.5, 7.0]})})
+        store.add_file("b.ags", {"TRIX": pd.DataFrame({"HOLE_ID": ["BH2", "BH2"], "SPEC_DEPTH": ["n/a", "3.0"]})})
+        assert store.value_range("TRIX", "SPEC_DEPTH") == (1.5, 7.0)
+        assert store.value_range("TRIX", "HOLE_ID") is None
+        assert store.value_range("TRIX", "MISSING") is None
+
+
+def test_load_group_filters_by_hole(tmp_path):
+    with ProjectStore(str(tmp_path / "project.sqlite")) as store:
+        store.add_file("a.ags", {"TRIX": pd.DataFrame({"HOLE_ID": ["BH1", "BH2"], "SPEC_DEPTH": [1.5, 7.0]})})
+        loaded = store.load_group("TRIX", holes=["BH2"])
+        assert loaded["HOLE_ID"].tolist() == ["BH2"]
+        assert loaded["SOURCE_FILE"].tolist() == ["a.ags"]
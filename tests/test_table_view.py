@@ -0,0 +1,27 @@
+"""
+Paged table view: row order for sorting, including columns that mix numbers and text.
+"""
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.table_view import filter_options, view_order
+
+
+def test_sort_mixed_object_column():
+    # Combining AGS3 (text) and AGS4 (typed) files gives object columns with str and float values
+    df = pd.DataFrame({"XG01_VAL": pd.Series(["b", 2.0, "a", np.nan, 10.0, "1.5"], dtype=object)})
+    assert df["XG01_VAL"].iloc[view_order(df, (), "XG01_VAL")].tolist()[:5] == ["1.5", 2.0, 10.0, "a", "b"]
+    descending = df["XG01_VAL"].iloc[view_order(df, (), "XG01_VAL", ascending=False)].tolist()
+    assert descending[:5] == [10.0, 2.0, "1.5", "b", "a"] and pd.isna(descending[-1])
+
+
+def test_sort_categorical_by_value_blanks_last():
+    df = pd.DataFrame({"HOLE_ID": pd.Categorical(["BH3", None, "BH1", "BH2"])})
+    assert df["HOLE_ID"].iloc[view_order(df, (), "HOLE_ID")].tolist()[:3] == ["BH1", "BH2", "BH3"]
+    assert filter_options(df["HOLE_ID"])["values"] == ["BH1", "BH2", "BH3"]
+
+
+def test_filter_then_sort():
+    df = pd.DataFrame({"SAMP_TOP": [5.0, np.nan, 1.0, 12.0], "HOLE_ID": pd.Categorical(["A", "B", "A", "A"])})
+    order = view_order(df, (("HOLE_ID", "in", ("A",)), ("SAMP_TOP", "between", (0.0, 10.0))), "SAMP_TOP")
+    assert order.tolist() == [2, 0]
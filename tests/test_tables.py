@@ -0,0 +1,160 @@
+"""
+Table helpers: the vectorized expand_rows matches the previous row-by-row
+implementation; drop_singleton_rows follows in-place edits and reuses given fill counts;
+CombinedGroupStore.sync matches combine_groups.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from triaxial_ags import tables
+from triaxial_ags.tables import (
+    CombinedGroupStore, combine_groups, concat_frames, drop_singleton_rows, expand_rows, row_fill_counts,
+)
+
+
+def expand_rows_legacy(df: pd.DataFrame) -> pd.DataFrame:
+    """The previous row-by-row implementation."""
+    expanded_rows = []
+    for _, row in df.iterrows():
+        split_values = {col: (str(row[col]).split(" | ") if pd.notna(row[col]) else [""]) for col in df.columns}
+        max_len = max(len(v) for v in split_values.values()) if split_values else 1
+        for i in range(max_len):
+            new_row = {col: (split_values[col][i] if i < len(split_values[col]) else "") for col in df.columns}
+            expanded_rows.append(new_row)
+    return pd.DataFrame(expanded_rows)
+
+
+def make_summary(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Triaxial-summary-like text frame; about one row in five carries " | " multi-values."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "HOLE_ID": [f"BH{i}" for i in rng.integers(0, 20, n_rows)],
+        "SPEC_DEPTH": np.round(rng.uniform(0, 60, n_rows), 2).astype(str),
+        "CELL": rng.integers(50, 800, n_rows).astype(str),
+        "DEVF": rng.integers(20, 900, n_rows).astype(str),
+        "PWPF": rng.integers(0, 300, n_rows).astype(str),
+    }, dtype=object)
+    multi = np.flatnonzero(rng.random(n_rows) < 0.2)
+    df.loc[multi, "CELL"] = df.loc[multi, "CELL"] + " | " + df.loc[multi, "DEVF"] + " | 400"
+    df.loc[multi[::2], "DEVF"] = df.loc[multi[::2], "DEVF"] + " | 120"
+    df.loc[multi[::3], "PWPF"] = np.nan
+    return df
+
+
+EDGE = pd.DataFrame({
+    "A": ["x | y", None, "a | ", "1"],
+    "B": [np.nan, "p | q | r", "b", 2.5],
+    "C": ["", "", "", ""],
+}, dtype=object)
+
+
+@pytest.mark.parametrize("df", [
+    make_summary(500),
+    EDGE,                      # NaN-only cells, trailing separators, non-text values
+    EDGE.iloc[:0],             # empty frame
+    EDGE[["C"]],               # no multi-values at all
+], ids=["summary", "edge", "empty", "single-values"])
+def test_expand_rows_matches_legacy(df):
+    pd.testing.assert_frame_equal(expand_rows(df), expand_rows_legacy(df))
+
+
+def test_drop_singleton_rows_sees_in_place_edits():
+    df = pd.DataFrame({"A": ["BH1", "BH2"], "B": ["x", "y"]})
+    kept = drop_singleton_rows(df)
+    assert len(kept) == 2 and kept is not df
+
+    df.loc[0, "B"] = ""
+    assert drop_singleton_rows(df)["A"].tolist() == ["BH2"]
+
+
+def test_drop_singleton_rows_with_given_fill_counts():
+    df = pd.DataFrame({"A": ["BH1", "BH2", "BH3"], "B": ["x", " ", None], "C": [1.0, 2.0, np.nan]})
+    counts = row_fill_counts(df)
+    assert counts.tolist() == [3, 2, 1]
+    pd.testing.assert_frame_equal(drop_singleton_rows(df, counts), drop_singleton_rows(df))
+    assert drop_singleton_rows(df, counts)["A"].tolist() == ["BH1", "BH2"]
+
+
+def _group(holes):
+    return {"TRIX": pd.DataFrame({"HOLE_ID": holes, "TRIX_CELL": ["100"] * len(holes)})}
+
+
+def test_fill_counts_pinned_before_a_sync():
+    # An export submitted before a file is added runs after the sync
+    store = CombinedGroupStore()
+    store.sync([("a.ags", "ka", _group(["BH1", "BH2"]))])
+    old_frame = store.groups["TRIX"]
+    queued = store.fill_counts(["TRIX"])
+    store.sync([("a.ags", "ka", _group(["BH1", "BH2"])), ("b.ags", "kb", _group(["BH3"]))])
+
+    assert len(queued()["TRIX"]) == len(old_frame)
+    new_counts = store.fill_counts(["TRIX"])()["TRIX"]
+    assert len(new_counts) == len(store.groups["TRIX"]) == 3
+    pd.testing.assert_frame_equal(drop_singleton_rows(store.groups["TRIX"], new_counts), store.groups["TRIX"])
+
+
+def test_fill_counts_older_job_does_not_replace_newer_counts():
+    store = CombinedGroupStore()
+    store.sync([("a.ags", "ka", _group(["BH1"]))])
+    queued = store.fill_counts(["TRIX"])
+    store.sync([("a.ags", "ka", _group(["BH1"])), ("b.ags", "kb", _group(["BH2", "BH3"]))])
+    newer = store.fill_counts(["TRIX"])()["TRIX"]
+    queued()  # the older job finishes last
+    assert store.fill_counts(["TRIX"])()["TRIX"] is newer
+
+
+def _file(name, key, groups):
+    gdict = {g: pd.DataFrame({"HOLE_ID": holes, f"{g}_REM": [f"{name} {h}" for h in holes]}) for g, holes in groups.items()}
+    return (name, key, gdict)
+
+
+FILE_A = _file("a.ags", "ka", {"TRIX": ["BH1", "BH2"], "SAMP": ["BH1"]})
+FILE_B = _file("b.ags", "kb", {"TRIX": ["BH3"]})
+FILE_C = _file("c.ags", "kc", {"SAMP": ["BH4"], "TRET": ["BH4", "BH5"]})
+FILE_C2 = _file("c.ags", "kc2", {"SAMP": ["BH6"], "TRET": ["BH4", "BH5"]})
+
+
+@pytest.mark.parametrize("steps", [
+    # (upload set, groups expected to change)
+    [([FILE_A], {"TRIX", "SAMP"}), ([FILE_A, FILE_B], {"TRIX"}), ([FILE_A, FILE_B, FILE_C], {"SAMP", "TRET"})],
+    [([FILE_A, FILE_B, FILE_C], {"TRIX", "SAMP", "TRET"}), ([FILE_B, FILE_A, FILE_C], {"TRIX"}),
+     ([FILE_C, FILE_B, FILE_A], {"SAMP"})],
+    [([FILE_A, FILE_B, FILE_C], {"TRIX", "SAMP", "TRET"}), ([FILE_B, FILE_C], {"TRIX", "SAMP"}),
+     ([FILE_B, FILE_C2], {"SAMP", "TRET"}), ([FILE_B], {"SAMP", "TRET"}), ([FILE_B], set())],
+], ids=["add", "reorder", "remove-replace"])
+def test_sync_matches_combine_groups(steps):
+    store = CombinedGroupStore()
+    for files, expected_changed in steps:
+        before = dict(store.group_version(["TRIX", "SAMP", "TRET"]))
+        frames = dict(store.groups)
+        assert store.sync(files) == expected_changed
+        expected = combine_groups([(fname, gdict) for fname, _, gdict in files])
+        assert sorted(store.groups) == sorted(expected)
+        for gname, gdf in expected.items():
+            pd.testing.assert_frame_equal(store.groups[gname], gdf)
+        after = dict(store.group_version(["TRIX", "SAMP", "TRET"]))
+        for gname in after:
+            if gname in expected_changed:
+                assert after[gname] > before[gname], gname
+            else:
+                assert after[gname] == before[gname], gname
+                if gname in frames:
+                    assert store.groups[gname] is frames[gname]
+
+
+def test_sync_append_extends_the_existing_frame(monkeypatch):
+    store = CombinedGroupStore()
+    store.sync([FILE_A])
+    old = store.groups["TRIX"]
+    calls = []
+
+    def spy(parts):
+        calls.append(list(parts))
+        return concat_frames(parts)
+
+    monkeypatch.setattr(tables, "concat_frames", spy)
+    store.sync([FILE_A, FILE_B])
+    # One concat of the combined frame so far and the new file's fragment
+    assert len(calls) == 1 and calls[0][0] is old and len(calls[0]) == 2
+    assert store.groups["TRIX"]["HOLE_ID"].tolist() == ["BH1", "BH2", "BH3"]
@@ -0,0 +1,100 @@
+"""
+Triaxial summary and s–t values from parsed AGS groups.
+"""
+import numpy as np
+
+from triaxial_ags.parsing import parse_ags_file
+from triaxial_ags.tables import combine_groups
+from triaxial_ags.triaxial import TriaxialJoin, compute_s_t, generate_triaxial_table
+
+SPECIMENS = b'''"GROUP","TREG"
+"HEADING","LOCA_ID","SAMP_TOP","SAMP_REF","SAMP_TYPE","SAMP_ID","SPEC_REF","SPEC_DPTH","TREG_TYPE"
+"UNIT","","m","","","","","m",""
+"TYPE","ID","2DP","X","PA","ID","X","2DP","PA"
+"DATA","BH1","1.50","1","U","S1","A","1.50","CU"
+"DATA","BH2","3.00","2","U","S2","A","3.00","CD"
+'''
+
+RESULTS = b'''
+"GROUP","TRET"
+"HEADING","LOCA_ID","SAMP_TOP","SAMP_REF","SAMP_TYPE","SAMP_ID","SPEC_REF","SPEC_DPTH","TRET_TESN","TRET_CELL","TRET_DEVF","TRET_PWPF"
+"UNIT","","m","","","","","m","","kPa","kPa","kPa"
+"TYPE","ID","2DP","X","PA","ID","X","2DP","X","0DP","0DP","0DP"
+"DATA","BH1","1.50","1","U","S1","A","1.50","1","100","200","40"
+"DATA","BH2","3.00","2","U","S2","A","3.00","1","200","300","60"
+'''
+
+
+def st_values(data: bytes):
+    groups = combine_groups([("site.ags", parse_ags_file(data))])
+    return compute_s_t(generate_triaxial_table(groups))
+
+
+def test_s_t_from_results():
+    st_df = st_values(SPECIMENS + RESULTS)
+    assert st_df["t"].tolist() == [100.0, 150.0]
+    assert st_df["s_total"].tolist() == [200.0, 350.0]
+    assert st_df["s_effective"].tolist() == [160.0, 290.0]
+
+
+def test_specimens_without_results():
+    # TREG but no TRET: the specimens are listed with blank results instead of failing
+    st_df = st_values(SPECIMENS)
+    assert len(st_df) == 2
+    for col in ("CELL", "DEVF", "PWPF", "s", "t"):
+        assert np.isnan(st_df[col].to_numpy(dtype=float)).all()
+
+
+SAMPLES = b'''
+"GROUP","SAMP"
+"HEADING","LOCA_ID","SAMP_TOP","SAMP_REF","SAMP_TYPE","SAMP_ID","SAMP_DESC"
+"UNIT","","m","","","",""
+"TYPE","ID","2DP","X","PA","ID","X"
+"DATA","BH1","1.50","1","U","S1","Clay"
+"DATA","BH3","5.00","3","U","S3","Sand"
+'''
+
+CLASSIFICATION = b'''
+"GROUP","CLSS"
+"HEADING","LOCA_ID","SAMP_TOP","SAMP_REF","SAMP_TYPE","SAMP_ID","SPEC_REF","SPEC_DPTH","SPEC_DESC"
+"UNIT","","m","","","","","m",""
+"TYPE","ID","2DP","X","PA","ID","X","2DP","X"
+"DATA","BH1","1.50","1","U","S1","A","1.5","Firm clay"
+"DATA","BH1","1.50","1","U","S1","B","1.50","Stiff clay"
+"DATA","BH4","7.00","4","U","S4","A","7.00","Sand"
+'''
+
+
+def joined(data: bytes, **kwargs):
+    groups = combine_groups([("site.ags", parse_ags_file(data))])
+    return TriaxialJoin(groups, **kwargs).materialize()
+
+
+def test_untested_samples_and_specimens_kept():
+    # SAMP BH3 and CLSS BH4 have no triaxial data but stay in the table, as with outer merges
+    data = SPECIMENS + RESULTS + SAMPLES + CLASSIFICATION
+    tri = joined(data)
+    assert sorted(tri["HOLE_ID"].astype(str)) == ["BH1", "BH2", "BH3", "BH4"]
+    assert tri.loc[tri["HOLE_ID"] == "BH3", "SAMP_DESC"].tolist() == ["Sand"]
+    tri = joined(data, keep_untested=False)
+    assert sorted(tri["HOLE_ID"].astype(str)) == ["BH1", "BH2"]
+
+
+def test_duplicate_describing_rows_merged():
+    # Both CLSS rows for BH1 at 1.5 / 1.50 match the one specimen; neither value is dropped
+    tri = joined(SPECIMENS + RESULTS + CLASSIFICATION)
+    bh1 = tri[tri["HOLE_ID"] == "BH1"]
+    assert len(bh1) == 1
+    assert bh1["SPEC_DESC"].iloc[0] == "Firm clay | Stiff clay"
+    assert float(bh1["DEVF"].iloc[0]) == 200.0
+
+
+def test_depth_text_variants_match():
+    # "1.5" in CLSS and "1.50" in TREG/TRET key the same specimen: no separate CLSS row
+    tri = generate_triaxial_table(
+        combine_groups([("site.ags", parse_ags_file(SPECIMENS + RESULTS + CLASSIFICATION))])
+    )
+    bh1 = tri[tri["HOLE_ID"] == "BH1"]
+    assert bh1["SPEC_DEPTH"].tolist() == [1.5]
+    assert bh1["SPEC_DESC"].tolist() == ["Firm clay"]
+    assert bh1["DEVF"].tolist() == [200.0]
@@ -0,0 +1,61 @@
+"""
+Processing core for the Triaxial Lab Test AGS Processor.
+
+Importable without Streamlit or Plotly; submodules (and pandas) are only loaded
+when one of the names below is first used, e.g.
+
+    from triaxial_ags import parse_ags_file, combine_groups, generate_triaxial_table, compute_s_t
+"""
+import importlib
+
+_EXPORTS = {
+    "analyze_ags_content": "parsing",
+    "iter_ags_records": "parsing",
+    "list_groups": "parsing",
+    "parse_ags_file": "parsing",
+    "parse_files": "parsing",
+    "AGSFileIndex": "ags_index",
+    "build_group_index": "ags_index",
+    "ParseCache": "cache",
+    "CombinedGroupStore": "tables",
+    "combine_groups": "tables",
+    "deduplicate_cells": "tables",
+    "drop_singleton_rows": "tables",
+    "expand_rows": "tables",
+    "TRIAXIAL_GROUPS": "triaxial",
+    "TriaxialJoin": "triaxial",
+    "attach_s_t": "triaxial",
+    "compute_s_t": "triaxial",
+    "filter_s_t": "triaxial",
+    "generate_triaxial_table": "triaxial",
+    "fit_envelopes": "envelopes",
+    "FilterIndex": "filter_index",
+    "Profiler": "instrument",
+    "instrumented": "instrument",
+    "StagePipeline": "pipeline",
+    "ProjectStore": "project_store",
+    "build_st_figure": "plotting",
+    "density_bins": "plotting",
+    "build_all_groups_excel": "excel",
+    "build_group_excel": "excel",
+    "build_triaxial_excel": "excel",
+    "write_groups_excel_streaming": "excel",
+    "build_groups_parquet_zip": "parquet_export",
+    "write_groups_parquet": "parquet_export",
+    "ExportJobs": "export_jobs",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from triaxial_ags.cli import main
+
+sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Byte-offset index of the groups in an AGS file: per GROUP its byte range, data
+row count and headings, from one scan of the raw bytes (data lines are counted,
+never decoded or split).
+
+Every range starts at its GROUP (AGS3: **GROUP) line and ends where the next
+group starts, so the bytes of any set of ranges are valid AGS content on their own:
+
+    index = build_group_index(data)
+    parse_ags_file(group_bytes(data, index, ["TRIX", "TRIG"]))
+
+AGSFileIndex keeps the index of a file on disk in a JSON sidecar and reads single
+groups through a memory map; parse_group_ranges parses groups in parallel.
+"""
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from triaxial_ags.parsing import SPLIT_MIN_BYTES, iter_ags_records, parse_ags_file
+
+# Bump whenever the entry layout or the row counting changes
+INDEX_VERSION = 2
+
+# Line prefixes; each pattern starts with the newline that precedes the line. Descriptors
+# are case-insensitive, as in iter_ags_records.
+_GROUP_LINE = re.compile(rb'\n[ \t]*"?(?:(?i:GROUP)"?[ \t]*,[ \t]*"?([^"\r\n,]*)|\*\*([^"\r\n,]*))')
+_DATA_LINE = re.compile(rb'\n[ \t]*"?(?i:DATA)"?[ \t]*,')
+_AGS3_OTHER_LINE = re.compile(rb'\n[ \t]*"?(?:\*|<UNITS>|<CONT>|&lt;CONT&gt;)')
+_BLANK_LINE = re.compile(rb'\n[ \t\r]*(?=\n)')
+
+# Headings are read from the start of each range, up to this many bytes
+HEADER_BYTES = 64 * 1024
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _group_starts(data: Buffer) -> List[tuple]:
+    """(line start, group name, is AGS3) for every group line."""
+    starts = []
+    first = _GROUP_LINE.match(b"\n" + bytes(data[:512]))
+    if first is not None:
+        starts.append((0, (first.group(1) or first.group(2)).decode("latin-1").strip(), first.group(2) is not None))
+    for m in _GROUP_LINE.finditer(data):
+        name = m.group(1) if m.group(1) is not None else m.group(2)
+        starts.append((m.start() + 1, name.decode("latin-1").strip(), m.group(2) is not None))
+    return starts
+
+
+def _count_rows(data: Buffer, start: int, end: int, ags3: bool) -> int:
+    """Data lines in [start, end): DATA lines (AGS4), or lines other than headings, units, <CONT> and blanks (AGS3)."""
+    pos = max(start - 1, 0)
+    if not ags3:
+        return len(_DATA_LINE.findall(data, pos, end))
+    # mmap has no count(); a copy of one group's bytes is fine
+    newlines = data.count(b"\n", pos, end) if hasattr(data, "count") else bytes(data[pos:end]).count(b"\n")
+    lines = newlines - (1 if data[end - 1:end] == b"\n" else 0)
+    other = len(_AGS3_OTHER_LINE.findall(data, pos, end)) + len(_BLANK_LINE.findall(data, pos, end))
+    return max(lines - other, 0)
+
+
+def _headings(data: Buffer, start: int, end: int) -> List[str]:
+    """HEADING fields of the group starting at start (the last heading line before the data)."""
+    headings: List[str] = []
+    for desc, fields in iter_ags_records(bytes(data[start:min(end, start + HEADER_BYTES)])):
+        if desc == "HEADING":
+            headings = fields
+        elif desc in ("DATA", "<CONT>") or (desc == "GROUP" and headings):
+            break
+    return headings
+
+
+def build_group_index(data: Buffer) -> List[Dict[str, Any]]:
+    """
+    [{"group", "start", "end", "rows", "headings"}, ...] in file order for AGS3/AGS4
+    content (bytes or a memory map). A group that occurs twice gets two entries.
+    """
+    starts = _group_starts(data)
+    entries = []
+    for i, (start, name, ags3) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(data)
+        entries.append({
+            "group": name, "start": start, "end": end,
+            "rows": _count_rows(data, start, end, ags3), "headings": _headings(data, start, end),
+        })
+    return entries
+
+
+def row_counts(index: List[Dict[str, Any]]) -> Dict[str, int]:
+    """{group: data rows} in file order (entries of a repeated group are summed)."""
+    counts: Dict[str, int] = {}
+    for e in index:
+        counts[e["group"]] = counts.get(e["group"], 0) + e["rows"]
+    return counts
+
+
+def select_entries(index: List[Dict[str, Any]], groups: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+    """Entries of the given groups (case-insensitive; all entries for None)."""
+    if groups is None:
+        return list(index)
+    wanted = {g.upper() for g in groups}
+    return [e for e in index if e["group"].upper() in wanted]
+
+
+def group_bytes(data: Buffer, index: List[Dict[str, Any]], groups: Optional[Iterable[str]]) -> bytes:
+    """The byte ranges of the given groups, joined into one AGS document."""
+    parts = []
+    for e in select_entries(index, groups):
+        chunk = bytes(data[e["start"]:e["end"]])
+        parts.append(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+    return b"".join(parts)
+
+
+def split_entries(entries: List[Dict[str, Any]], parts: int) -> List[List[Dict[str, Any]]]:
+    """
+    Entries in at most `parts` batches of similar byte size (largest first, each to
+    the lightest batch); a group is never split, so one huge group bounds the speed-up.
+    """
+    batches: List[List[Dict[str, Any]]] = [[] for _ in range(max(1, min(parts, len(entries))))]
+    sizes = [0] * len(batches)
+    for e in sorted(entries, key=lambda e: e["end"] - e["start"], reverse=True):
+        i = sizes.index(min(sizes))
+        batches[i].append(e)
+        sizes[i] += e["end"] - e["start"]
+    return [sorted(b, key=lambda e: e["start"]) for b in batches if b]
+
+
+def merge_group_dicts(parts: Sequence[Dict[str, pd.DataFrame]], order: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """Per-range parse results as one {group: frame}, in `order` (a group parsed in several ranges is concatenated)."""
+    from triaxial_ags.tables import concat_frames
+
+    frames: Dict[str, List[pd.DataFrame]] = {g: [] for g in order}
+    for part in parts:
+        for g, df in part.items():
+            frames.setdefault(g, []).append(df)
+    return {g: v[0] if len(v) == 1 else concat_frames(v) for g, v in frames.items() if v}
+
+
+def parse_group_ranges(
+    data: Buffer, index: List[Dict[str, Any]], groups: Optional[Iterable[str]] = None, workers: int = 1,
+) -> Dict[str, pd.DataFrame]:
+    """
+    parse_ags_file of the selected groups, reading only their byte ranges; with
+    workers > 1 and enough bytes, batches of groups are parsed in parallel processes.
+    """
+    entries = select_entries(index, groups)
+    order = [e["group"] for e in entries]
+    size = sum(e["end"] - e["start"] for e in entries)
+    if workers <= 1 or len(entries) < 2 or size < SPLIT_MIN_BYTES:
+        return merge_group_dicts([parse_ags_file(group_bytes(data, entries, None))], order)
+    chunks = [group_bytes(data, batch, None) for batch in split_entries(entries, workers)]
+    # spawn: the Streamlit server is multi-threaded, which makes fork unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=ctx) as pool:
+        return merge_group_dicts(list(pool.map(parse_ags_file, chunks)), order)
+
+
+class AGSFileIndex:
+    """
+    Group index of an AGS file on disk, kept in a JSON sidecar (next to the file,
+    or in index_dir) and rebuilt when the file's size or modification time changes.
+    Groups are read through a memory map, so only their own bytes are touched.
+
+        idx = AGSFileIndex("site.ags")
+        idx.row_counts()                       # no parsing
+        groups = idx.parse(["TRIX", "TRIG"], workers=4)
+    """
+
+    def __init__(self, path: str, index_dir: Optional[str] = None):
+        self.path = path
+        if index_dir:
+            tag = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+            self.index_path = os.path.join(index_dir, f"{os.path.basename(path)}.{tag}.agsidx.json")
+        else:
+            self.index_path = path + ".agsidx.json"
+        stat = os.stat(path)
+        self._signature = {"version": INDEX_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        self.loaded_from_disk = False
+        self.entries = self._load()
+        if self.entries is None:
+            with self._mapped() as data:
+                self.entries = build_group_index(data)
+            self._save()
+        else:
+            self.loaded_from_disk = True
+
+    def names(self) -> List[str]:
+        return list(dict.fromkeys(e["group"] for e in self.entries))
+
+    def row_counts(self) -> Dict[str, int]:
+        return row_counts(self.entries)
+
+    def headings(self, group: str) -> List[str]:
+        return next((e["headings"] for e in select_entries(self.entries, [group])), [])
+
+    def read(self, groups: Optional[Iterable[str]] = None) -> bytes:
+        """Bytes of the given groups (a valid AGS document)."""
+        with self._mapped() as data:
+            return group_bytes(data, self.entries, groups)
+
+    def parse(self, groups: Optional[Iterable[str]] = None, workers: int = 1) -> Dict[str, pd.DataFrame]:
+        with self._mapped() as data:
+            return parse_group_ranges(data, self.entries, groups, workers)
+
+    # ---- storage -----------------------------------------------------------------------
+    def _mapped(self):
+        fh = open(self.path, "rb")
+        try:
+            if self._signature["size"] == 0:
+                return _Mapped(fh, b"")
+            return _Mapped(fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+        except Exception:
+            fh.close()
+            raise
+
+    def _load(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(self.index_path, encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if {k: stored.get(k) for k in self._signature} != self._signature:
+            return None
+        return stored.get("groups")
+
+    def _save(self):
+        # Best-effort: a read-only location only costs a rebuild next time
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({**self._signature, "groups": self.entries}, fh)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass
+
+
+class _Mapped:
+    """Context manager holding an open file and its memory map."""
+
+    def __init__(self, fh, data):
+        self.fh = fh
+        self.data = data
+
+    def __enter__(self):
+        return self.data
+
+    def __exit__(self, *exc):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.fh.close()
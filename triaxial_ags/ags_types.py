@@ -0,0 +1,143 @@
+"""
+Column dtypes from AGS metadata: numeric arrays for measured values and
+categoricals for repeated identifiers / pick-list codes.
+
+AGS4 groups carry a TYPE row (2DP, 3SF, SCI, U, MC: numeric; ID, PA, PT, PU:
+codes; X, XN, DT, T, ...: text). AGS3 has no TYPE row, so headings are looked
+up in AGS3_HEADING_TYPES, then by suffix, then by their <UNITS> entry.
+
+Conversion is lossless or skipped: a column becomes numeric only if every
+non-blank value parses (cells merged from <CONT> lines, "<1", "NP" etc. keep the
+column as text), and a categorical only if it has few distinct values (key
+columns in CATEGORY_COLUMNS always are).
+"""
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.parquet_export import parquet_available
+
+NUMERIC = "numeric"
+CATEGORY = "category"
+TEXT = "text"
+
+_NUMERIC_TYPE = re.compile(r"^\d*(DP|SF|SCI)$")
+_NUMERIC_TYPES = {"U", "MC"}
+_CATEGORY_TYPES = {"ID", "PA", "PT", "PU"}
+
+# A code column is stored as a categorical only when it repeats enough to pay off
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Columns that are categorical whatever their TYPE says (after key renaming too):
+# keys and the triaxial test types
+CATEGORY_COLUMNS = {"HOLE_ID", "LOCA_ID", "SOURCE_FILE", "TRIG_TYPE", "TREG_TYPE"}
+
+# AGS3 fallback: AGS4-style types for common headings (AGS3 files have no TYPE row)
+AGS3_HEADING_TYPES = {
+    "HOLE_ID": "ID", "LOCA_ID": "ID", "HOLE_TYPE": "PA", "HOLE_NATE": "2DP", "HOLE_NATN": "2DP",
+    "HOLE_GL": "2DP", "HOLE_FDEP": "2DP",
+    "SAMP_TOP": "2DP", "SAMP_BASE": "2DP", "SAMP_REF": "X", "SAMP_TYPE": "PA", "SAMP_ID": "ID",
+    "SAMP_DIA": "0DP", "SAMP_DESC": "X",
+    "SPEC_REF": "X", "SPEC_DPTH": "2DP", "SPEC_DESC": "X",
+    "CLSS_LL": "0DP", "CLSS_PL": "0DP", "CLSS_PI": "0DP", "CLSS_NMC": "0DP", "CLSS_BDEN": "2DP",
+    "CLSS_DDEN": "2DP", "CLSS_PD": "2DP",
+    "TRIG_TYPE": "PA", "TRIG_COND": "X", "TRIG_REM": "X",
+    "TRIX_TESN": "X", "TRIX_SDIA": "1DP", "TRIX_SLEN": "1DP", "TRIX_MC": "MC", "TRIX_BDEN": "2DP",
+    "TRIX_DDEN": "2DP", "TRIX_CELL": "0DP", "TRIX_PWPI": "0DP", "TRIX_DEVF": "0DP", "TRIX_PWPF": "0DP",
+    "TRIX_STRN": "1DP", "TRIX_CU": "0DP", "TRIX_MODE": "X", "TRIX_REM": "X",
+}
+# Suffix rules for AGS3 headings not listed above
+_AGS3_SUFFIX_TYPES = [
+    ("_TYPE", "PA"), ("_ID", "ID"), ("_TOP", "2DP"), ("_BASE", "2DP"), ("_DPTH", "2DP"),
+    ("_CELL", "0DP"), ("_DEVF", "0DP"), ("_PWPF", "0DP"), ("_PWPI", "0DP"),
+    ("_REM", "X"), ("_DESC", "X"), ("_REF", "X"),
+]
+# Units that mark a value as a measurement (AGS3 fallback of the fallback)
+_TEXT_UNITS = re.compile(r"(yyyy|hh:mm|dd/mm|mm/dd|date|time)", re.IGNORECASE)
+
+
+def type_kind(ags_type: str) -> Optional[str]:
+    """numeric / category / text for an AGS4 TYPE code; None if it is empty."""
+    t = (ags_type or "").strip().upper()
+    if not t:
+        return None
+    if _NUMERIC_TYPE.match(t) or t in _NUMERIC_TYPES:
+        return NUMERIC
+    if t in _CATEGORY_TYPES:
+        return CATEGORY
+    return TEXT
+
+
+def heading_kind(heading: str, unit: str = "") -> str:
+    """Kind of a heading without a TYPE row (AGS3 and untyped AGS4 groups)."""
+    h = heading.upper()
+    if h in CATEGORY_COLUMNS:
+        return CATEGORY
+    ags_type = AGS3_HEADING_TYPES.get(h)
+    if ags_type is None:
+        ags_type = next((t for suffix, t in _AGS3_SUFFIX_TYPES if h.endswith(suffix)), None)
+    if ags_type is not None:
+        return type_kind(ags_type)
+    unit = (unit or "").strip()
+    return NUMERIC if unit and not _TEXT_UNITS.search(unit) else TEXT
+
+
+def column_kinds(headings: List[str], units: Dict[str, str], types: Dict[str, str]) -> Dict[str, str]:
+    """Kind per heading, from the TYPE row where present, otherwise heading_kind."""
+    kinds = {}
+    for h in headings:
+        kind = CATEGORY if h.upper() in CATEGORY_COLUMNS else type_kind(types.get(h, ""))
+        kinds[h] = kind if kind is not None else heading_kind(h, units.get(h, ""))
+    return kinds
+
+
+def to_numeric_column(values: pd.Series) -> Optional[pd.Series]:
+    """float64 version of a text column if every non-blank value parses, else None."""
+    text = values.str.strip()
+    text = text.mask(text == "")
+    if text.isna().all():
+        return pd.Series(np.nan, index=values.index, dtype="float64")
+    try:
+        if parquet_available():
+            # Arrow's string → double cast is several times faster than pandas'
+            num = text.astype("float64[pyarrow]").to_numpy(dtype="float64", na_value=np.nan)
+            return pd.Series(num, index=values.index)
+        return text.astype("float64")
+    except (TypeError, ValueError):  # some value is not a number
+        return None
+
+
+def to_category_column(values: pd.Series, max_unique_ratio: Optional[float] = CATEGORY_MAX_UNIQUE_RATIO) -> Optional[pd.Series]:
+    """Categorical (blank → missing) if the column repeats enough, else None."""
+    codes, uniques = pd.factorize(values.str.strip())
+    blank = np.flatnonzero(uniques == "")
+    if blank.size:
+        b = blank[0]
+        codes = np.where(codes == b, -1, np.where(codes > b, codes - 1, codes))
+        uniques = uniques.delete(b)
+    if max_unique_ratio is not None and len(values) and len(uniques) > max(1, len(values) * max_unique_ratio):
+        return None
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=values.index)
+
+
+def apply_column_kinds(df: pd.DataFrame, kinds: Dict[str, str]) -> pd.DataFrame:
+    """Convert the columns of a freshly parsed (all-text) group according to kinds."""
+    out = {}
+    changed = False
+    for col in df.columns:
+        s = df[col]
+        kind = kinds.get(col, TEXT)
+        converted = None
+        if kind == NUMERIC:
+            converted = to_numeric_column(s)
+        elif kind == CATEGORY:
+            # Key columns are always categorical: they are shared across groups and files
+            converted = to_category_column(s, None if col.upper() in CATEGORY_COLUMNS else CATEGORY_MAX_UNIQUE_RATIO)
+        if converted is not None:
+            out[col] = converted
+            changed = True
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index) if changed else df
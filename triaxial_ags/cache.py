@@ -0,0 +1,211 @@
+"""
+Content-hash keyed cache for parsed AGS files.
+
+Entries are keyed by SHA-256 of the file bytes plus the parser version, held in
+an in-memory LRU tier with a byte budget and, optionally, persisted as one
+Parquet file per group under a local directory.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from triaxial_ags.parquet_export import parquet_available
+from triaxial_ags.parsing import PARSER_VERSION
+
+# Group indexes are small (a few hundred bytes per group); keep this many in memory
+MAX_INDEXES = 4096
+
+ParsedFile = Tuple[Dict[str, str], Dict[str, pd.DataFrame]]  # (diagnostic flags, groups)
+
+
+def content_key(file_bytes: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"ags-parser-{PARSER_VERSION}\0".encode("ascii"))
+    h.update(file_bytes)
+    return h.hexdigest()
+
+
+def projection_key(key: str, groups: Optional[Iterable[str]]) -> str:
+    """Key for a parse of only the given groups (key itself for a full parse)."""
+    if groups is None:
+        return key
+    h = hashlib.sha256(key.encode("ascii"))
+    h.update(("\0groups:" + ",".join(sorted({g.upper() for g in groups}))).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _frame_nbytes(groups: Dict[str, pd.DataFrame]) -> int:
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in groups.values()))
+
+
+def _shallow(entry: ParsedFile) -> ParsedFile:
+    # Callers add columns (e.g. SOURCE_FILE); keep the cached frames untouched
+    flags, groups = entry
+    return dict(flags), {g: df.copy(deep=False) for g, df in groups.items()}
+
+
+class ParseCache:
+    """
+    Two-tier cache of parse results: in-memory LRU (capped at max_bytes) and an
+    optional on-disk tier (Parquet, needs pyarrow) under cache_dir.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir if cache_dir and parquet_available() else None
+        self._lru: "OrderedDict[str, Tuple[ParsedFile, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[str, list]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---- lookups -----------------------------------------------------------------------
+    def get(self, key: str) -> Optional[ParsedFile]:
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return _shallow(hit[0])
+
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return _shallow(entry)
+
+    def put(self, key: str, entry: ParsedFile):
+        with self._lock:
+            self._remember(key, _shallow(entry))
+        self._store(key, entry)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._lru),
+                "memory_bytes": self._bytes,
+            }
+
+    # ---- group indexes -----------------------------------------------------------------
+    def group_index(self, key: str, file_bytes: bytes) -> List[Dict]:
+        """
+        Byte-offset group index of a file (see ags_index.build_group_index): built
+        once per content key, then kept in memory and, with a cache_dir, on disk.
+        """
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = self._load_index(key)
+        if index is None:
+            from triaxial_ags.ags_index import build_group_index
+
+            index = build_group_index(file_bytes)
+            self._store_index(key, index)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > MAX_INDEXES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "index", key[:2], f"{key}.json")
+
+    def _load_index(self, key: str) -> Optional[List[Dict]]:
+        if not self.cache_dir:
+            return None
+        from triaxial_ags.ags_index import INDEX_VERSION
+
+        try:
+            with open(self._index_path(key), encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        # Indexes written by another index version are rebuilt
+        return stored.get("groups") if stored.get("version") == INDEX_VERSION else None
+
+    def _store_index(self, key: str, index: List[Dict]):
+        if not self.cache_dir:
+            return
+        from triaxial_ags.ags_index import INDEX_VERSION
+
+        path = self._index_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as fh:
+                json.dump({"version": INDEX_VERSION, "groups": index}, fh)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    # ---- memory tier -------------------------------------------------------------------
+    def _remember(self, key: str, entry: ParsedFile):
+        nbytes = _frame_nbytes(entry[1])
+        if nbytes > self.max_bytes:
+            return
+        if key in self._lru:
+            self._bytes -= self._lru.pop(key)[1]
+        self._lru[key] = (entry, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and self._lru:
+            _, (_, evicted) = self._lru.popitem(last=False)
+            self._bytes -= evicted
+
+    # ---- disk tier ---------------------------------------------------------------------
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _load(self, key: str) -> Optional[ParsedFile]:
+        if not self.cache_dir:
+            return None
+        path = self._entry_dir(key)
+        try:
+            with open(os.path.join(path, "manifest.json"), encoding="utf-8") as fh:
+                manifest = json.load(fh)
+            groups = {
+                gname: pd.read_parquet(os.path.join(path, fname))
+                for gname, fname in manifest["groups"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return manifest["flags"], groups
+
+    def _store(self, key: str, entry: ParsedFile):
+        if not self.cache_dir:
+            return
+        path = self._entry_dir(key)
+        if os.path.isdir(path):
+            return
+        flags, groups = entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            listing = []
+            for i, (gname, df) in enumerate(groups.items()):
+                fname = f"{i:04d}.parquet"
+                df.to_parquet(os.path.join(tmp, fname), index=False)
+                listing.append([gname, fname])
+            with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as fh:
+                json.dump({"parser_version": PARSER_VERSION, "flags": flags, "groups": listing}, fh)
+            os.replace(tmp, path)
+        except Exception:
+            # The disk tier is best-effort; the memory tier already holds the entry
+            pass
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,192 @@
+"""
+Batch mode: parse a directory or glob of AGS files and write the combined groups
+and the triaxial s–t workbook, without Streamlit.
+
+    python -m triaxial_ags path/to/ags_dir -o out/
+    python -m triaxial_ags "campaign/**/*.ags" -o out/ --mode total --workers 8
+    python -m triaxial_ags big.ags --list-groups
+    python -m triaxial_ags new/*.ags --project site.sqlite -o out/      # parse, store, process
+    python -m triaxial_ags --project site.sqlite --holes BH1 BH2 -o out/  # from the store only
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+from typing import List, Optional
+
+AGS_EXTENSIONS = (".ags", ".txt", ".csv", ".dat", ".ags4")
+
+logger = logging.getLogger("triaxial_ags")
+
+
+def collect_files(inputs: List[str]) -> List[str]:
+    """
+    Expand directories (AGS extensions, non-recursive) and glob patterns into a
+    sorted, de-duplicated list of file paths.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(
+                os.path.join(item, name) for name in os.listdir(item)
+                if name.lower().endswith(AGS_EXTENSIONS) and os.path.isfile(os.path.join(item, name))
+            )
+        elif glob.has_magic(item):
+            paths.extend(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            logger.warning("No such file or directory: %s", item)
+    return sorted(set(paths))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="python -m triaxial_ags",
+        description="Combine AGS3/AGS4 groups and compute triaxial s–t values in batch.",
+    )
+    ap.add_argument("inputs", nargs="*", help="AGS files, directories or glob patterns")
+    ap.add_argument("-o", "--output-dir", default=".", help="Directory for the output workbooks")
+    ap.add_argument("--mode", choices=["effective", "total"], default="effective", help="Stress path for the s column")
+    ap.add_argument("--workers", type=int, default=None, help="Parser worker processes (default: CPU count)")
+    ap.add_argument("--cache-dir", default=None, help="Optional on-disk parse cache directory")
+    ap.add_argument("--streaming-excel", action="store_true",
+                    help="Always use the constant-memory Excel writer (automatic for large groups)")
+    ap.add_argument("--parquet", action="store_true", help="Also write each combined group to OUT/groups_parquet/")
+    ap.add_argument("--depth-tolerance", type=float, default=None,
+                    help="Match specimen/sample depths within this many metres (default: 0.005)")
+    ap.add_argument("--project", default=None,
+                    help="SQLite project store: parsed inputs are added to it; without inputs, the groups are "
+                         "read from it instead of from AGS files")
+    ap.add_argument("--holes", nargs="+", default=None, help="With --project and no inputs: only these HOLE_IDs")
+    ap.add_argument("--sources", nargs="+", default=None,
+                    help="With --project and no inputs: only rows from these source files")
+    ap.add_argument("--depth", nargs=2, type=float, default=None, metavar=("MIN", "MAX"),
+                    help="With --project and no inputs: only specimens with SPEC_DEPTH in this range")
+    ap.add_argument("--list-groups", action="store_true",
+                    help="Print each file's groups, row counts and byte ranges from its group index, without parsing "
+                         "(the index is kept next to the file, or in --cache-dir)")
+    ap.add_argument("--profile", action="store_true",
+                    help="Log per-stage time and rows as structured 'perf {json}' lines")
+    ap.add_argument("--profile-memory", action="store_true", help="With --profile, also trace peak memory per stage")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s %(message)s")
+
+    files = collect_files(args.inputs)
+    if not files and not (args.project and not args.inputs):
+        logger.error("No AGS files found")
+        return 1
+
+    if args.list_groups:
+        if not files:
+            logger.error("--list-groups needs AGS files")
+            return 1
+        return list_file_groups(files, args.cache_dir)
+
+    from triaxial_ags.instrument import Profiler
+
+    profiler = Profiler(memory=args.profile_memory).start() if args.profile else None
+    try:
+        return run(args, files)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.log(logger)
+
+
+def list_file_groups(files: List[str], index_dir: Optional[str] = None) -> int:
+    from triaxial_ags.ags_index import AGSFileIndex
+
+    for path in files:
+        index = AGSFileIndex(path, index_dir=index_dir)
+        print(f"{path} ({'index reused' if index.loaded_from_disk else 'indexed'})")
+        for e in index.entries:
+            print(f"  {e['group']:<8}{e['rows']:>10} rows  bytes {e['start']}-{e['end']}  ({len(e['headings'])} headings)")
+    return 0
+
+
+def run(args: argparse.Namespace, files: List[str]) -> int:
+    # Heavy imports only once there is work to do
+    from triaxial_ags.cache import ParseCache, content_key
+    from triaxial_ags.excel import STREAMING_MIN_ROWS, build_triaxial_excel, write_groups_excel_streaming
+    from triaxial_ags.instrument import stage
+    from triaxial_ags.joins import DEFAULT_DEPTH_TOLERANCE
+    from triaxial_ags.parsing import parse_files
+    from triaxial_ags.tables import combine_groups
+    from triaxial_ags.triaxial import TriaxialJoin, attach_s_t, compute_s_t, generate_triaxial_table
+
+    store = None
+    if args.project:
+        from triaxial_ags.project_store import ProjectStore
+
+        store = ProjectStore(args.project)
+    try:
+        if files:
+            blobs = []
+            with stage("read_files"):
+                for path in files:
+                    with open(path, "rb") as fh:
+                        blobs.append((os.path.basename(path), fh.read()))
+            cache = ParseCache(cache_dir=args.cache_dir) if args.cache_dir else None
+            all_group_dfs, _ = parse_files(blobs, workers=args.workers, cache=cache)
+            logger.info("Parsed %d file(s)", len(files))
+            if store is not None:
+                written = store.add_files(all_group_dfs, [content_key(b) for _, b in blobs])
+                logger.info("Project %s: stored %d new or changed file(s)", args.project, len(written))
+            combined_groups = combine_groups(all_group_dfs)
+        else:
+            combined_groups = store.load_groups(
+                holes=args.holes, sources=args.sources, depth=tuple(args.depth) if args.depth else None
+            )
+            logger.info("Project %s: %d file(s), %d group(s) loaded", args.project, len(store.files()),
+                        len(combined_groups))
+    finally:
+        if store is not None:
+            store.close()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if combined_groups:
+        out = os.path.join(args.output_dir, "ags_groups_combined.xlsx")
+        if args.streaming_excel or any(len(g) > STREAMING_MIN_ROWS for g in combined_groups.values()):
+            write_groups_excel_streaming(combined_groups, out)
+        else:
+            from triaxial_ags.excel import build_all_groups_excel
+
+            with open(out, "wb") as fh:
+                fh.write(build_all_groups_excel(combined_groups, streaming=False))
+        logger.info("Wrote %s (%d groups)", out, len(combined_groups))
+        if args.parquet:
+            from triaxial_ags.parquet_export import write_groups_parquet
+
+            paths = write_groups_parquet(combined_groups, os.path.join(args.output_dir, "groups_parquet"))
+            logger.info("Wrote %d Parquet file(s) to %s", len(paths), os.path.join(args.output_dir, "groups_parquet"))
+
+    tolerance = DEFAULT_DEPTH_TOLERANCE if args.depth_tolerance is None else args.depth_tolerance
+    with stage("TriaxialJoin"):
+        tri_join = TriaxialJoin(combined_groups, depth_tolerance=tolerance)
+    for row in tri_join.report.to_dict("records"):
+        logger.info(
+            "Join %s on %s: %d rows, %d without key, %d duplicate keys, %d/%d keys matched",
+            row["table"], row["key"], row["rows"], row["missing_key"], row["duplicate_keys"],
+            row["matched_keys"], row["matched_keys"] + row["unmatched_keys"],
+        )
+    tri_df = generate_triaxial_table(combined_groups, join=tri_join)
+    if tri_df.empty:
+        logger.info("No triaxial data (TRIX/TRET + TRIG/TREG) detected")
+        return 0
+    st_df = compute_s_t(tri_df, mode=args.mode.capitalize())
+    out = os.path.join(args.output_dir, "triaxial_summary_s_t.xlsx")
+    with open(out, "wb") as fh:
+        fh.write(build_triaxial_excel(attach_s_t(tri_df, st_df), st_df))
+    logger.info("Wrote %s (%d tests)", out, len(st_df))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
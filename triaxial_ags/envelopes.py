@@ -0,0 +1,115 @@
+"""
+Strength envelopes from s–t data: a least-squares line t = a + s·tanα per group
+of tests (by default HOLE_ID / TEST_TYPE / SOURCE_FILE), and the Mohr–Coulomb
+parameters it implies:
+
+    sin φ′ = tanα        c′ = a / cos φ′
+
+All groups are fitted together: per-group sums are accumulated with np.bincount
+over the group codes, so the cost is a few passes over the points whatever the
+number of groups.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.instrument import instrumented
+
+ENVELOPE_KEYS = ["HOLE_ID", "TEST_TYPE", "SOURCE_FILE"]
+
+# Fewer points than this (or all at one s) give no line
+MIN_POINTS = 2
+
+FIT_COLUMNS = ["n", "a", "tan_alpha", "alpha_deg", "phi_deg", "c", "r2", "s_min", "s_max"]
+
+
+@instrumented()
+def fit_envelopes(
+    st_df: pd.DataFrame, by: Optional[Sequence[str]] = None, s_col: str = "s", t_col: str = "t",
+    min_points: int = MIN_POINTS,
+) -> pd.DataFrame:
+    """
+    One row per group: its keys, n (points used), a, tan_alpha and alpha_deg of the
+    t = a + s·tanα fit, phi_deg and c (NaN unless |tanα| < 1), r2, and the s range
+    the line spans. Groups with fewer than min_points points or no spread in s get NaN fits.
+    """
+    keys: List[str] = [c for c in (ENVELOPE_KEYS if by is None else by) if c in st_df.columns]
+    if st_df.empty or s_col not in st_df.columns or t_col not in st_df.columns:
+        return pd.DataFrame(columns=keys + FIT_COLUMNS)
+
+    s = pd.to_numeric(st_df[s_col], errors="coerce").to_numpy(dtype=float)
+    t = pd.to_numeric(st_df[t_col], errors="coerce").to_numpy(dtype=float)
+    valid = np.isfinite(s) & np.isfinite(t)
+    if not valid.any():
+        return pd.DataFrame(columns=keys + FIT_COLUMNS)
+    s, t = s[valid], t[valid]
+
+    if keys:
+        grouped = st_df.loc[valid, keys].groupby(keys, observed=True, sort=True, dropna=False)
+        codes = grouped.ngroup().to_numpy()
+        out = grouped.size().index.to_frame(index=False)
+    else:
+        codes = np.zeros(len(s), dtype=np.intp)
+        out = pd.DataFrame(index=range(1))
+    n_groups = len(out)
+
+    def total(values: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=values, minlength=n_groups)
+
+    # Centred sums (second pass around the group means) keep the fit accurate for large s
+    n = np.bincount(codes, minlength=n_groups).astype(float)
+    s_mean = total(s) / n
+    t_mean = total(t) / n
+    ds = s - s_mean[codes]
+    dt = t - t_mean[codes]
+    sxx, sxy, syy = total(ds * ds), total(ds * dt), total(dt * dt)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fitted = (n >= min_points) & (sxx > 0)
+        tan_alpha = np.where(fitted, sxy / sxx, np.nan)
+        a = t_mean - tan_alpha * s_mean
+        r2 = np.where(fitted & (syy > 0), sxy * sxy / (sxx * syy), np.where(fitted, 1.0, np.nan))
+        # The Kf line maps onto a Mohr–Coulomb envelope only for |tanα| < 1
+        phi = np.where(np.abs(tan_alpha) < 1, np.arcsin(np.clip(tan_alpha, -1, 1)), np.nan)
+        c = a / np.cos(phi)
+
+    s_min = np.full(n_groups, np.inf)
+    s_max = np.full(n_groups, -np.inf)
+    np.minimum.at(s_min, codes, s)
+    np.maximum.at(s_max, codes, s)
+
+    out["n"] = n.astype(int)
+    out["a"] = a
+    out["tan_alpha"] = tan_alpha
+    out["alpha_deg"] = np.degrees(np.arctan(tan_alpha))
+    out["phi_deg"] = np.degrees(phi)
+    out["c"] = c
+    out["r2"] = r2
+    out["s_min"] = s_min
+    out["s_max"] = s_max
+    return out
+
+
+def envelope_segments(fits: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fitted lines as plot points: (s, t) at both ends of each line's s range and a
+    NaN row after each, so one line series draws every line with gaps between them.
+    "fit" is the row of the line in fits.
+    """
+    rows = np.flatnonzero(np.isfinite(fits["tan_alpha"].to_numpy(dtype=float)))
+    ends = fits[["s_min", "s_max"]].to_numpy(dtype=float)[rows]
+    s = np.column_stack([ends, np.full(len(rows), np.nan)]).ravel()
+    line = np.repeat(rows, 3)
+    t = fits["a"].to_numpy(dtype=float)[line] + fits["tan_alpha"].to_numpy(dtype=float)[line] * s
+    return pd.DataFrame({"s": s, "t": t, "fit": line})
+
+
+def envelope_labels(fits: pd.DataFrame) -> List[str]:
+    """One hover label per fit: its keys, c′, φ′ and R²."""
+    keys = [c for c in fits.columns if c not in FIT_COLUMNS]
+    names = [" / ".join(map(str, vals)) for vals in zip(*(fits[k] for k in keys))] if keys else [""] * len(fits)
+    return [
+        f"{name}: c′ = {c:.1f} kPa, φ′ = {phi:.1f}°, R² = {r2:.3f}"
+        for name, c, phi, r2 in zip(names, fits["c"], fits["phi_deg"], fits["r2"])
+    ]
@@ -0,0 +1,315 @@
+"""
+Excel workbook builders (xlsxwriter): all groups, single group, triaxial summary with s–t charts,
+plus a memo so workbooks are only rebuilt when their input frames change.
+"""
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.envelopes import envelope_segments, fit_envelopes
+from triaxial_ags.export_jobs import ProgressCallback
+from triaxial_ags.instrument import instrumented
+from triaxial_ags.tables import drop_singleton_rows
+
+
+EXCEL_MAX_ROWS = 1_048_576  # per sheet, header included
+STREAMING_MIN_ROWS = 100_000  # auto-switch to the constant-memory writer above this group size
+
+
+def sheet_slices(gname: str, n_rows: int, used: Optional[set] = None) -> List[Tuple[str, int, int]]:
+    """
+    Split a group's data rows across numbered sheets (NAME, NAME_2, ...) so no
+    sheet exceeds Excel's row limit. Returns [(sheet_name, start, stop), ...].
+    """
+    used = set() if used is None else used
+    per_sheet = EXCEL_MAX_ROWS - 1
+    n_parts = max(1, math.ceil(n_rows / per_sheet))
+    slices = []
+    for part in range(n_parts):
+        suffix = "" if part == 0 else f"_{part + 1}"
+        # Excel sheet name limit and avoid duplicates
+        name = gname[:31 - len(suffix)] + suffix
+        k = 1
+        while name.lower() in used:
+            k += 1
+            extra = f"~{k}"
+            name = gname[:31 - len(suffix) - len(extra)] + suffix + extra
+        used.add(name.lower())
+        slices.append((name, part * per_sheet, min(n_rows, (part + 1) * per_sheet)))
+    return slices
+
+
+@instrumented()
+def write_groups_excel_streaming(
+    groups: Dict[str, pd.DataFrame], target, chunk_rows: int = 10_000, progress: Optional[ProgressCallback] = None,
+    fill_counts: Optional[Dict[str, np.ndarray]] = None,
+):
+    """
+    Constant-memory workbook (one sheet per group, oversized groups split across
+    numbered sheets). Rows are written incrementally with xlsxwriter's
+    constant_memory mode; target is a path or a binary file object. progress(rows,
+    groups) is called after every chunk of rows and every group written.
+    fill_counts ({group: row_fill_counts(frame)}) saves re-counting known groups.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "nan_inf_to_errors": True, "strings_to_urls": False})
+    header = workbook.add_format({"bold": True})
+    used: set = set()
+    for gname, gdf in sorted(groups.items()):
+        if gdf is None or gdf.empty:
+            continue
+        # Clean rows (no singleton)
+        out = drop_singleton_rows(gdf, (fill_counts or {}).get(gname))
+        cols = [str(c) for c in out.columns]
+        for sheet_name, start, stop in sheet_slices(gname, len(out), used):
+            ws = workbook.add_worksheet(sheet_name)
+            ws.write_row(0, 0, cols, header)
+            r = 1
+            for c0 in range(start, stop, chunk_rows):
+                block = out.iloc[c0:min(stop, c0 + chunk_rows)].astype(object)
+                for row in block.where(block.notna(), None).to_numpy().tolist():
+                    ws.write_row(r, 0, row)
+                    r += 1
+                if progress is not None:
+                    progress(len(block), 0)
+        if progress is not None:
+            progress(0, 1)
+    workbook.close()
+
+
+@instrumented()
+def build_all_groups_excel(
+    groups: Dict[str, pd.DataFrame], streaming: Optional[bool] = None, progress: Optional[ProgressCallback] = None,
+    fill_counts: Optional[Dict[str, np.ndarray]] = None,
+) -> bytes:
+    """
+    Create an Excel workbook where each group is one sheet (oversized groups are
+    split across numbered sheets). streaming=None picks the constant-memory writer
+    automatically for large groups. progress(rows, groups) reports what was written;
+    fill_counts ({group: row_fill_counts(frame)}) saves re-counting known groups.
+    """
+    if streaming is None:
+        streaming = any(gdf is not None and len(gdf) > STREAMING_MIN_ROWS for gdf in groups.values())
+    buffer = io.BytesIO()
+    if streaming:
+        write_groups_excel_streaming(groups, buffer, progress=progress, fill_counts=fill_counts)
+        return buffer.getvalue()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as xw:
+        used: set = set()
+        for gname, gdf in sorted(groups.items()):
+            if gdf is None or gdf.empty:
+                continue
+            # Clean rows (no singleton)
+            out = drop_singleton_rows(gdf, (fill_counts or {}).get(gname))
+            for sheet_name, start, stop in sheet_slices(gname, len(out), used):
+                out.iloc[start:stop].to_excel(xw, index=False, sheet_name=sheet_name)
+                if progress is not None:
+                    progress(stop - start, 0)
+            if progress is not None:
+                progress(0, 1)
+    return buffer.getvalue()
+
+
+def write_envelopes(writer: pd.ExcelWriter, st_df: pd.DataFrame, sheet_name: str = "Envelopes") -> Dict[str, Tuple]:
+    """
+    Fits t = a + s·tanα per HOLE_ID / TEST_TYPE / SOURCE_FILE for effective and total
+    stress and writes the fits (c′, φ′, R², ...) to sheet_name, with the line end points
+    next to them. Returns {s column: (sheet, first row, last row, s col, t col)} of the
+    end points, for chart series.
+    """
+    fits, lines = [], {}
+    for s_col, stress in (("s_effective", "Effective"), ("s_total", "Total")):
+        if s_col in st_df.columns:
+            f = fit_envelopes(st_df, s_col=s_col)
+            if f["tan_alpha"].notna().any():
+                fits.append(f.assign(stress=stress))
+                lines[s_col] = envelope_segments(f)[["s", "t"]]
+    if not fits:
+        return {}
+    table = pd.concat(fits, ignore_index=True)
+    table = table[["stress"] + [c for c in table.columns if c != "stress"]]
+    table.to_excel(writer, index=False, sheet_name=sheet_name)
+
+    # End points of each fitted line, blank-separated (charts draw the blanks as gaps)
+    refs = {}
+    col = len(table.columns) + 1
+    for s_col, seg in lines.items():
+        seg.rename(columns={"s": f"{s_col} (line)", "t": "t (line)"}).to_excel(
+            writer, index=False, sheet_name=sheet_name, startcol=col
+        )
+        refs[s_col] = (sheet_name, 1, len(seg), col, col + 1)
+        col += 3
+    return refs
+
+
+def add_st_charts_to_excel(writer: pd.ExcelWriter, st_df: pd.DataFrame, sheet_name: str = "s_t_Values",
+                           envelope_lines: Optional[Dict[str, Tuple]] = None):
+    """
+    Adds two charts to the workbook:
+      - s'–t (effective): x = s_effective, y = t
+      - s–t (total)    : x = s_total,     y = t
+    Places them on a new sheet 'Charts'. envelope_lines (from write_envelopes) adds
+    the fitted lines to the matching chart.
+    """
+    if st_df is None or st_df.empty:
+        return
+
+    workbook  = writer.book
+    ws_vals   = writer.sheets.get(sheet_name)
+    if ws_vals is None:
+        return
+
+    # Row/col counts in the written sheet
+    nrows = len(st_df)
+    if nrows == 0:
+        return
+
+    # Column indices
+    idx = {c: i for i, c in enumerate(st_df.columns)}
+    if "t" not in idx or ("s_effective" not in idx and "s_total" not in idx):
+        return  # nothing to plot
+
+    # Data starts at row=1 (row 0 is header)
+    r0, r1 = 1, nrows
+
+    # Create Charts worksheet
+    ws_charts = workbook.add_worksheet("Charts")
+
+    def add_scatter(title: str, xcol: str, ycol: str, anchor: str):
+        if xcol not in idx or ycol not in idx:
+            return
+        cx, cy = idx[xcol], idx[ycol]
+
+        chart = workbook.add_chart({'type': 'scatter', 'subtype': 'straight_with_markers'})
+        chart.set_title({'name': title})
+        chart.set_x_axis({'name': 's (kPa)'})
+        chart.set_y_axis({'name': "t = q/2 (kPa)"})
+        chart.set_legend({'none': True})
+
+        # A1 notation ranges for x/y
+        sheet = sheet_name
+        # Excel is col letters; build ranges using XlsxWriter utility
+        # We'll use row/col notation instead (zero-based, inclusive)
+        chart.add_series({
+            'name':       title,
+            'categories': [sheet, r0, cx, r1, cx],  # x-values
+            'values':     [sheet, r0, cy, r1, cy],  # y-values
+            'marker':     {'type': 'circle', 'size': 4},
+        })
+        if envelope_lines and xcol in envelope_lines:
+            env_sheet, e0, e1, es, et = envelope_lines[xcol]
+            chart.add_series({
+                'name':       'Envelope fits',
+                'categories': [env_sheet, e0, es, e1, es],
+                'values':     [env_sheet, e0, et, e1, et],
+                'marker':     {'type': 'none'},
+                'line':       {'color': '#444444', 'dash_type': 'dash', 'width': 1},
+            })
+        chart.set_size({'width': 640, 'height': 420})
+        ws_charts.insert_chart(anchor, chart, {'x_offset': 25, 'y_offset': 10})
+
+    # s'–t (effective)
+    add_scatter("s′–t (Effective stress)", "s_effective", "t", "B2")
+    # s–t (total)
+    add_scatter("s–t (Total stress)",      "s_total",     "t", "B25")
+
+
+@instrumented()
+def build_group_excel(
+    gname: str, gdf: pd.DataFrame, progress: Optional[ProgressCallback] = None,
+    fill_counts: Optional[np.ndarray] = None,
+) -> bytes:
+    """
+    Single-group workbook (per-group download); fill_counts is row_fill_counts(gdf),
+    if already known.
+    """
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        drop_singleton_rows(gdf, fill_counts).to_excel(writer, index=False, sheet_name=gname[:31])
+    if progress is not None:
+        progress(len(gdf), 1)
+    return buffer.getvalue()
+
+
+@instrumented()
+def build_triaxial_excel(
+    tri_df_with_st: pd.DataFrame, st_df: pd.DataFrame, progress: Optional[ProgressCallback] = None,
+) -> bytes:
+    """
+    Triaxial table (with s–t), strength envelope fits + Excel Charts. progress(rows,
+    groups) is called after each of the two tables is written.
+    """
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        # 1) Save the with-s,t summary (more useful than raw-only)
+        tri_df_with_st.to_excel(writer, index=False, sheet_name="Triaxial_Summary")
+        if progress is not None:
+            progress(len(tri_df_with_st), 1)
+
+        # 2) Save the computed s–t values (contains s_total, s_effective, s, t)
+        st_df.to_excel(writer, index=False, sheet_name="s_t_Values")
+        if progress is not None:
+            progress(len(st_df), 1)
+
+        # 3) Strength envelope fits (c′, φ′, R²) per HOLE_ID / TEST_TYPE / SOURCE_FILE
+        envelope_lines = write_envelopes(writer, st_df)
+
+        # 4) Add Excel charts (s′–t and s–t, with the fitted lines) on a 'Charts' sheet
+        add_st_charts_to_excel(writer, st_df, sheet_name="s_t_Values", envelope_lines=envelope_lines)
+    return buffer.getvalue()
+
+
+# --------------------------------------------------------------------------------------
+# On-demand workbook memo
+# --------------------------------------------------------------------------------------
+def frames_digest(frames: Dict[str, pd.DataFrame]) -> str:
+    """
+    Content hash of named frames (columns, dtypes and every value), used to tell
+    whether a workbook built earlier is still current.
+    """
+    h = hashlib.sha256()
+    for name, df in sorted(frames.items()):
+        h.update(f"{name}\0{list(df.columns)}\0{[str(t) for t in df.dtypes]}\0{len(df)}\0".encode("utf-8"))
+        if len(df) and df.shape[1]:
+            h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class WorkbookCache:
+    """
+    LRU memo of built workbooks keyed by (kind, frames digest); a workbook is rebuilt
+    only when its input frames change.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, frames: Dict[str, pd.DataFrame], build: Callable[[], bytes]) -> bytes:
+        key = (kind, frames_digest(frames))
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+        data = build()
+        with self._lock:
+            # Older workbooks of the same kind are stale once the data changed
+            for k in [k for k in self._entries if k[0] == kind]:
+                del self._entries[k]
+            self._entries[key] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
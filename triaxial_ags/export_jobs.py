@@ -0,0 +1,151 @@
+"""
+Background export jobs: downloads (workbooks, Parquet archives) built in a thread
+pool while the app keeps responding, with progress counters and the result kept
+for download once the job is done.
+
+Jobs are keyed by kind (e.g. "triaxial", "group_TRET") and the version of their
+inputs: submitting a kind whose job for that version is running or done returns
+that job instead of building again, and a new version replaces the older job of
+its kind. Builders receive a progress callback, progress(rows, groups), called
+with the rows and groups written since the previous call.
+
+    jobs = ExportJobs()
+    job = jobs.submit("triaxial", token, lambda progress: build_triaxial_excel(tri, st_df, progress=progress),
+                      total_rows=len(tri) + len(st_df), total_groups=2)
+    job.wait()
+    data = job.result
+"""
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Exports built at the same time. Most of the writing holds the GIL, so more
+# workers let several downloads progress together rather than finish sooner.
+EXPORT_WORKERS = 4
+
+RUNNING, DONE, FAILED = "running", "done", "failed"
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportJob:
+    """One export build: rows and groups written so far, then the result bytes or the error."""
+
+    def __init__(self, kind: str, version: Hashable, total_rows: int = 0, total_groups: int = 0):
+        self.kind = kind
+        self.version = version
+        self.total_rows = total_rows
+        self.total_groups = total_groups
+        self.rows = 0
+        self.groups = 0
+        self.requests = 1
+        self.result: Optional[bytes] = None
+        self.error: Optional[Exception] = None
+        self.seconds: Optional[float] = None
+        self._started = time.perf_counter()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def progress(self, rows: int = 0, groups: int = 0):
+        with self._lock:
+            self.rows += rows
+            self.groups += groups
+
+    @property
+    def status(self) -> str:
+        if not self._done.is_set():
+            return RUNNING
+        return FAILED if self.error is not None else DONE
+
+    @property
+    def fraction(self) -> float:
+        """Share of the work done, from rows (or groups) written; 1.0 only once finished."""
+        if self._done.is_set():
+            return 1.0
+        if self.total_rows:
+            return min(self.rows / self.total_rows, 0.99)
+        if self.total_groups:
+            return min(self.groups / self.total_groups, 0.99)
+        return 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self.seconds if self.seconds is not None else time.perf_counter() - self._started
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished (True) or the timeout passed (False)."""
+        return self._done.wait(timeout)
+
+    def _run(self, build: Callable[[ProgressCallback], bytes]):
+        try:
+            self.result = build(self.progress)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.seconds = time.perf_counter() - self._started
+            self._done.set()
+
+
+class ExportJobs:
+    """
+    The latest job of each kind. Safe to share between threads; pass an executor to
+    run the jobs of several registries (e.g. one per app session) on one pool.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_workers: int = EXPORT_WORKERS):
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def submit(
+        self, kind: str, version: Hashable, build: Callable[[ProgressCallback], bytes],
+        total_rows: int = 0, total_groups: int = 0,
+    ) -> ExportJob:
+        """
+        Start build(progress) in the pool, unless the job of this kind and version is
+        already running or done, in which case that job is returned. A failed job is
+        started again.
+        """
+        with self._lock:
+            job = self._jobs.get(kind)
+            if job is not None and job.version == version and job.status != FAILED:
+                job.requests += 1
+                self.coalesced += 1
+                return job
+            job = ExportJob(kind, version, total_rows, total_groups)
+            self._jobs[kind] = job
+        self._executor.submit(job._run, build)
+        return job
+
+    def get(self, kind: str, version: Optional[Hashable] = None) -> Optional[ExportJob]:
+        """The job of a kind (None if there is none, or it is for another version)."""
+        with self._lock:
+            job = self._jobs.get(kind)
+        if job is None or (version is not None and job.version != version):
+            return None
+        return job
+
+    def discard(self, kind: str):
+        """Forget the job of a kind; a running build finishes but its result is dropped."""
+        with self._lock:
+            self._jobs.pop(kind, None)
+
+    def running(self) -> List[ExportJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.status == RUNNING]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per job: kind, status, progress, requests served and seconds."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            {
+                "export": job.kind, "status": job.status, "rows": job.rows, "total_rows": job.total_rows,
+                "groups": job.groups, "total_groups": job.total_groups, "requests": job.requests,
+                "mb": round(len(job.result) / 1e6, 2) if job.result is not None else None,
+                "seconds": round(job.elapsed, 3),
+            }
+            for job in jobs
+        ]
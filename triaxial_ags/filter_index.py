@@ -0,0 +1,87 @@
+"""
+Filter index for the s–t table, built once per dataset: per filter column, the
+sorted distinct values (the widget options), integer codes per row and, for
+columns with few values, one packed row bitmap per value.
+
+A selection is then an OR of the picked values' bitmaps per column and an AND
+across columns, on packed bits (n/8 bytes per operation); columns with many
+values (HOLE_ID in a large campaign) use a lookup of their codes instead, so
+the index stays small whatever the number of holes.
+
+    index = FilterIndex(st_df)
+    index.values["TEST_TYPE"]                      # ['CD', 'CU', 'UU']
+    fdf = index.select(st_df, HOLE_ID=["BH1", "BH2"], TEST_TYPE=["CU"])
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ("HOLE_ID", "TEST_TYPE", "SOURCE_FILE")
+
+# Columns with at most this many distinct values get per-value bitmaps
+BITMAP_MAX_VALUES = 64
+
+
+class FilterIndex:
+    """Codes, sorted values and per-value bitmaps of the filter columns of one table."""
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str] = FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.values: Dict[str, List[Any]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.bitmaps: Dict[str, np.ndarray] = {}
+        self._lookup: Dict[str, Dict[Any, int]] = {}
+        self._has_missing: Dict[str, bool] = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            # Codes in sorted value order; missing values get -1
+            codes, uniques = pd.factorize(df[col].astype(object), sort=True)
+            self.codes[col] = codes.astype(np.int32)
+            self.values[col] = list(uniques)
+            self._lookup[col] = {v: i for i, v in enumerate(self.values[col])}
+            self._has_missing[col] = bool((codes < 0).any())
+            if len(uniques) <= BITMAP_MAX_VALUES:
+                # Row k of the matrix is the packed bitmap of value k
+                bitmaps = np.zeros((len(uniques), (self.n_rows + 7) // 8), dtype=np.uint8)
+                for k in range(len(uniques)):
+                    bitmaps[k] = np.packbits(codes == k)
+                self.bitmaps[col] = bitmaps
+
+    def mask(self, **picked: Optional[Iterable[Any]]) -> Optional[np.ndarray]:
+        """
+        Packed bitmap of the rows whose column values are among the picked ones, for
+        every column given; an empty or None selection does not filter (None is returned
+        when nothing filters). Values not in the table match no rows.
+        """
+        result = None
+        for col, chosen in picked.items():
+            if not chosen or col not in self.codes:
+                continue
+            lookup = self._lookup[col]
+            wanted = sorted({lookup[v] for v in chosen if v in lookup})
+            if len(wanted) == len(self.values[col]) and not self._has_missing[col]:
+                continue  # every value picked
+            if col in self.bitmaps:
+                bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+                for k in wanted:
+                    bits |= self.bitmaps[col][k]
+            else:
+                keep = np.zeros(len(self.values[col]) + 1, dtype=bool)
+                keep[wanted] = True  # codes of -1 index the last slot, which stays False
+                bits = np.packbits(keep[self.codes[col]])
+            result = bits if result is None else result & bits
+        return result
+
+    def positions(self, **picked: Optional[Iterable[Any]]) -> Optional[np.ndarray]:
+        """Row positions matching the selection (None when nothing filters)."""
+        bits = self.mask(**picked)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def select(self, df: pd.DataFrame, **picked: Optional[Iterable[Any]]) -> pd.DataFrame:
+        """The rows of df (the indexed table) matching the selection."""
+        rows = self.positions(**picked)
+        return df if rows is None else df.iloc[rows]
@@ -0,0 +1,190 @@
+"""
+Lightweight per-stage instrumentation: wall time, rows in/out and (optionally)
+peak traced memory for the processing functions.
+
+Functions decorated with @instrumented, and blocks wrapped in `with stage(...)`,
+record into the Profiler that is active in the current context; with none
+active they cost one context-variable lookup.
+
+    with Profiler(memory=True) as prof:
+        groups = combine_groups(parse_files(files)[0])
+        tri_df = generate_triaxial_table(groups)
+    prof.log(logger)            # one JSON line per stage
+    pd.DataFrame(prof.summary())
+"""
+import functools
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+_ACTIVE: ContextVar[Optional["Profiler"]] = ContextVar("triaxial_ags_profiler", default=None)
+
+# Set while tracemalloc was started by a Profiler (and not by the host program)
+_PROFILER_TRACING = False
+
+
+def count_rows(obj: Any) -> Optional[int]:
+    """
+    Rows held by a stage input/output: a frame, {name: frame}, [(name, frames), ...],
+    or the first countable item of a tuple. None when there is nothing to count.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if isinstance(obj, dict):
+        frames = [v for v in obj.values() if isinstance(v, pd.DataFrame)]
+        return sum(len(f) for f in frames) if frames else None
+    if isinstance(obj, tuple) and obj:
+        if len(obj) == 2 and isinstance(obj[0], str):
+            return count_rows(obj[1])
+        return next((c for c in map(count_rows, obj) if c is not None), None)
+    if isinstance(obj, list) and obj and isinstance(obj[0], (tuple, pd.DataFrame, dict)):
+        counts = [count_rows(item) for item in obj]
+        return sum(c for c in counts if c is not None) if any(c is not None for c in counts) else None
+    return None
+
+
+class Profiler:
+    """
+    Collects one record per stage call: stage, parent, depth, seconds, rows_in,
+    rows_out and, with memory=True, peak_mb (peak traced allocation above the
+    level at stage entry; tracing slows Python-heavy stages down noticeably).
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._token = None
+        self._owns_tracing = False
+
+    # ---- activation ----------------------------------------------------------------
+    def start(self) -> "Profiler":
+        global _PROFILER_TRACING
+        self._token = _ACTIVE.set(self)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _PROFILER_TRACING = True
+        elif not self.memory and _PROFILER_TRACING and tracemalloc.is_tracing():
+            # Left running by an earlier profiler that was never stopped
+            tracemalloc.stop()
+            _PROFILER_TRACING = False
+        self._owns_tracing = self.memory and _PROFILER_TRACING
+        return self
+
+    def stop(self):
+        global _PROFILER_TRACING
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            _PROFILER_TRACING = False
+        self._owns_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- recording -----------------------------------------------------------------
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block; set rec["rows_out"] on the yielded record if known."""
+        parent = self._stack[-1] if self._stack else None
+        rec: Dict[str, Any] = {
+            "stage": name, "parent": parent["stage"] if parent else None, "depth": len(self._stack),
+            "seconds": None, "rows_in": rows_in, "rows_out": None, "peak_mb": None,
+        }
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent["_peak"] = max(parent["_peak"], peak)
+            tracemalloc.reset_peak()
+            rec["_base"], rec["_peak"] = current, current
+        self._stack.append(rec)
+        self.records.append(rec)
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+            self._stack.pop()
+            if tracing and tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], rec["_peak"])
+                rec["peak_mb"] = (peak - rec["_base"]) / 1e6
+                if parent is not None:
+                    parent["_peak"] = max(parent["_peak"], peak)
+            rec.pop("_base", None)
+            rec.pop("_peak", None)
+
+    # ---- reporting -----------------------------------------------------------------
+    def summary(self) -> List[Dict[str, Any]]:
+        """Records aggregated per (depth, parent, stage) in first-call order, with a call count."""
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for r in self.records:
+            key = (r["depth"], r["parent"], r["stage"])
+            agg = rows.get(key)
+            if agg is None:
+                rows[key] = agg = {
+                    "stage": r["stage"], "parent": r["parent"], "depth": r["depth"], "calls": 0, "seconds": 0.0,
+                    "rows_in": None, "rows_out": None, "peak_mb": None,
+                }
+            agg["calls"] += 1
+            agg["seconds"] += r["seconds"] or 0.0
+            for col in ("rows_in", "rows_out"):
+                if r[col] is not None:
+                    agg[col] = (agg[col] or 0) + r[col]
+            if r["peak_mb"] is not None:
+                agg["peak_mb"] = max(agg["peak_mb"] or 0.0, r["peak_mb"])
+        for agg in rows.values():
+            agg["seconds"] = round(agg["seconds"], 4)
+            if agg["peak_mb"] is not None:
+                agg["peak_mb"] = round(agg["peak_mb"], 2)
+        return list(rows.values())
+
+    def log(self, logger: logging.Logger, level: int = logging.INFO):
+        """One structured line per aggregated stage: `perf {"stage": ..., "seconds": ...}`."""
+        for agg in self.summary():
+            logger.log(level, "perf %s", json.dumps(agg))
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Profiler.stage on the active profiler; a no-op (yielding a scratch dict) without one."""
+    prof = _ACTIVE.get()
+    if prof is None:
+        yield {}
+        return
+    with prof.stage(name, rows_in) as rec:
+        yield rec
+
+
+def instrumented(name: Optional[str] = None):
+    """
+    Decorator: record each call as a stage (rows_in from the first argument,
+    rows_out from the result) when a Profiler is active.
+    """
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            prof = _ACTIVE.get()
+            if prof is None:
+                return func(*args, **kwargs)
+            with prof.stage(label, rows_in=count_rows(args[0]) if args else None) as rec:
+                result = func(*args, **kwargs)
+                rec["rows_out"] = count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorate
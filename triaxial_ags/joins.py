@@ -0,0 +1,113 @@
+"""
+Join keys for AGS tables: HOLE_ID as shared categorical codes and SPEC_DEPTH as
+quantized numbers matched within a depth tolerance.
+
+All tables of one join are keyed together, so "1.5" and "1.50" (or 1.499 and 1.5
+within tolerance) in the same hole get the same integer key.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DEPTH_TOLERANCE = 0.005  # m
+DEPTH_QUANTUM = 0.001  # m; depths are compared as integer multiples of this
+
+MISSING_KEY = -1
+
+
+def hole_codes(holes: List[Optional[pd.Series]]) -> List[np.ndarray]:
+    """
+    Categorical codes of HOLE_ID over one shared category set (stripped text;
+    -1 where missing or blank).
+    """
+    cleaned = []
+    for s in holes:
+        if s is None:
+            cleaned.append(None)
+            continue
+        t = s.astype("string").str.strip()
+        cleaned.append(t.mask(t == ""))
+    present = [c for c in cleaned if c is not None]
+    cats = pd.Index(pd.concat(present, ignore_index=True).dropna().unique()) if present else pd.Index([])
+    return [
+        np.asarray(pd.Categorical(c, categories=cats).codes, dtype=np.int64) if c is not None else None
+        for c in cleaned
+    ]
+
+
+def quantize_depth(depth: Optional[pd.Series], n: int, quantum: float = DEPTH_QUANTUM) -> np.ndarray:
+    """Depth as float multiples of quantum (NaN where missing or not numeric)."""
+    if depth is None:
+        return np.full(n, np.nan)
+    return np.round(pd.to_numeric(depth, errors="coerce").to_numpy(dtype=float, na_value=np.nan) / quantum)
+
+
+def depth_keys(
+    codes: List[np.ndarray],
+    depths_q: List[np.ndarray],
+    tolerance: float = DEFAULT_DEPTH_TOLERANCE,
+    quantum: float = DEPTH_QUANTUM,
+) -> List[np.ndarray]:
+    """
+    One int64 key per row for (hole, depth) across several tables.
+    Within a hole, sorted distinct depths whose successive gaps are <= tolerance
+    share a key. Rows with a hole but no depth get a per-hole key (so they still
+    match each other); rows without a hole get MISSING_KEY.
+    """
+    tol_q = int(round(tolerance / quantum))
+    valid = [(c >= 0) & ~np.isnan(q) for c, q in zip(codes, depths_q)]
+    all_q = np.concatenate([q[v] for q, v in zip(depths_q, valid)]) if codes else np.array([])
+
+    if all_q.size:
+        qmin = int(all_q.min())
+        span = int(all_q.max()) - qmin + 1
+        combined = [c[v].astype(np.int64) * span + (q[v].astype(np.int64) - qmin) for c, q, v in zip(codes, depths_q, valid)]
+        uniq = np.unique(np.concatenate(combined))
+        hole = uniq // span
+        depth = uniq % span
+        new_cluster = np.ones(len(uniq), dtype=bool)
+        new_cluster[1:] = (hole[1:] != hole[:-1]) | (np.diff(depth) > tol_q)
+        cluster = np.cumsum(new_cluster) - 1
+        n_clusters = int(cluster[-1]) + 1
+    else:
+        combined = [np.empty(0, dtype=np.int64) for _ in codes]
+        uniq, cluster, n_clusters = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0
+
+    keys = []
+    for c, v, comb in zip(codes, valid, combined):
+        k = np.full(len(c), MISSING_KEY, dtype=np.int64)
+        k[v] = cluster[np.searchsorted(uniq, comb)]
+        hole_only = (c >= 0) & ~v
+        k[hole_only] = n_clusters + c[hole_only]
+        keys.append(k)
+    return keys
+
+
+def table_keys(
+    holes: List[Optional[pd.Series]],
+    depths: List[Optional[pd.Series]],
+    lengths: List[int],
+    tolerance: float = DEFAULT_DEPTH_TOLERANCE,
+) -> List[np.ndarray]:
+    """hole_codes + quantize_depth + depth_keys for several tables at once."""
+    codes = [
+        c if c is not None else np.full(n, MISSING_KEY, dtype=np.int64)
+        for c, n in zip(hole_codes(holes), lengths)
+    ]
+    depths_q = [quantize_depth(d, n) for d, n in zip(depths, lengths)]
+    return depth_keys(codes, depths_q, tolerance)
+
+
+def key_stats(keys: np.ndarray, other_keys: np.ndarray) -> dict:
+    """Join-quality counts for one table's keys against the keys it is joined to."""
+    present = keys[keys != MISSING_KEY]
+    uniq = np.unique(present)
+    matched = np.isin(uniq, other_keys)
+    return {
+        "rows": int(len(keys)),
+        "missing_key": int(len(keys) - len(present)),
+        "duplicate_keys": int(len(present) - len(uniq)),
+        "matched_keys": int(matched.sum()),
+        "unmatched_keys": int((~matched).sum()),
+    }
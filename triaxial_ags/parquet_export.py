@@ -0,0 +1,67 @@
+"""
+Parquet export of combined groups (one file per group), for downstream analytics.
+Requires pyarrow.
+"""
+import io
+import os
+import re
+import zipfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from triaxial_ags.export_jobs import ProgressCallback
+from triaxial_ags.instrument import instrumented
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _file_stem(gname: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", gname) or "_"
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    # Object columns can mix text with other scalars; store them as text
+    obj = [c for c in df.columns if df[c].dtype == object]
+    return df.astype({c: "string" for c in obj}) if obj else df
+
+
+@instrumented()
+def write_groups_parquet(groups: Dict[str, pd.DataFrame], out_dir: str) -> List[str]:
+    """
+    Write each non-empty group to out_dir/<GROUP>.parquet; returns the written paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for gname, gdf in sorted(groups.items()):
+        if gdf is None or gdf.empty:
+            continue
+        path = os.path.join(out_dir, f"{_file_stem(gname)}.parquet")
+        _arrow_safe(gdf).to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@instrumented()
+def build_groups_parquet_zip(groups: Dict[str, pd.DataFrame], progress: Optional[ProgressCallback] = None) -> bytes:
+    """
+    Zip archive with one <GROUP>.parquet per non-empty group (for a single download);
+    progress(rows, groups) is called after each group.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for gname, gdf in sorted(groups.items()):
+            if gdf is None or gdf.empty:
+                continue
+            part = io.BytesIO()
+            _arrow_safe(gdf).to_parquet(part, index=False)
+            zf.writestr(f"{_file_stem(gname)}.parquet", part.getvalue())
+            if progress is not None:
+                progress(len(gdf), 1)
+    return buffer.getvalue()
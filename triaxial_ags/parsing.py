@@ -0,0 +1,439 @@
+"""
+AGS3/AGS4 parsing: single-pass tokenizer, columnar group builders and
+multi-file (optionally process-parallel) parsing.
+"""
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import zip_longest
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from triaxial_ags.ags_types import apply_column_kinds, column_kinds
+from triaxial_ags.instrument import instrumented
+
+
+def analyze_ags_content(file_bytes: bytes) -> Dict[str, str]:
+    
+    results = {"AGS3": "No", "AGS4": "No", 'Contains "LOCA"': "No", "Contains **HOLE": "No"}
+    try:
+        content = file_bytes.decode("latin-1", errors="ignore")
+        lines = content.splitlines()
+        for line in lines:
+            s = line.strip()
+            if s.startswith('"GROUP"') or s.startswith("GROUP"):
+                results["AGS4"] = "Yes"
+                if '"GROUP","LOCA"' in s or "GROUP,LOCA" in s:
+                    results['Contains "LOCA"'] = "Yes"
+                break
+            if s.startswith('"**') or s.startswith("**"):
+                results["AGS3"] = "Yes"
+                if "**HOLE" in s:
+                    results["Contains **HOLE"] = "Yes"
+                break
+    except Exception:
+        pass
+    return results
+
+
+# Bump whenever parse_ags_file output changes; it is part of the parse cache key
+PARSER_VERSION = "3"
+
+_AGS4_DESCRIPTORS = {"GROUP", "HEADING", "UNIT", "TYPE", "DATA"}
+_CONT_TOKENS = {"<CONT>", "&lt;CONT&gt;"}
+
+
+def _split_quoted_csv(line: str) -> List[str]:
+    s = line.strip()
+    # Normalize quotes
+    if s.startswith('"') and s.endswith('"') and '","' in s:
+        parts = s.split('","')
+        if '""' in s:
+            parts = [p.replace('""', '"') for p in parts]
+        parts[0] = parts[0].lstrip('"')
+        parts[-1] = parts[-1].rstrip('"')
+        return parts
+    # Fallback split (mixed quoted/unquoted fields) - the csv module is a single linear pass
+    return [p.strip() for p in next(csv.reader([s]), [""])]
+
+
+def _iter_text_lines(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """
+    Yield stripped, non-empty lines from raw bytes or a binary stream.
+    Decoding is incremental, so the full text is never held in memory.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    text = io.TextIOWrapper(source, encoding="latin-1", errors="ignore", newline=None)
+    try:
+        for line in text:
+            s = line.strip()
+            if s:
+                yield s
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _may_start_group(line: str) -> bool:
+    """Cheap pre-check (no field splitting) for an AGS4 GROUP or AGS3 **GROUP line."""
+    head = line[:7].lstrip('"')
+    return head.startswith("**") or head[:5].upper() == "GROUP"
+
+
+def iter_ags_records(
+    source: Union[bytes, BinaryIO], groups: Optional[Iterable[str]] = None
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Single-pass tokenizer for AGS3 and AGS4 content.
+    Yields (descriptor, fields) with descriptor in GROUP / HEADING / UNIT / TYPE / DATA / <CONT>.
+    AGS3 lines are mapped onto the AGS4 descriptors; DATA, UNIT and <CONT> fields are
+    aligned with the HEADING fields of the current group in both formats.
+
+    With groups (names, case-insensitive), the lines of other groups are skipped
+    without being split into fields; their GROUP records are still yielded.
+    """
+    wanted = None if groups is None else {g.upper() for g in groups}
+    skipping = False
+    ags3 = False
+    ags3_width = 0
+    for s in _iter_text_lines(source):
+        if skipping and not _may_start_group(s):
+            continue
+        parts = _split_quoted_csv(s)
+        first = parts[0]
+
+        # AGS4: leading descriptor like GROUP, HEADING, UNIT, TYPE, DATA
+        desc = first.upper()
+        if desc in _AGS4_DESCRIPTORS:
+            if desc == "GROUP":
+                ags3 = False
+                skipping = wanted is not None and (parts[1] if len(parts) > 1 else "").upper() not in wanted
+            elif skipping:
+                continue
+            yield desc, parts[1:]
+            continue
+        if skipping and not first.startswith("**"):
+            continue
+
+        # <CONT> (plain or HTML-escaped); in AGS3 it takes the place of the first field
+        if first in _CONT_TOKENS:
+            yield "<CONT>", ([""] + parts[1:]) if ags3 else parts[1:]
+            continue
+
+        # AGS3: **GROUP, *HEADING, <UNITS>, data lines
+        if first.startswith("**"):
+            ags3 = True
+            ags3_width = 0
+            skipping = wanted is not None and first[2:].upper() not in wanted
+            yield "GROUP", [first[2:]]
+        elif first.startswith("*"):
+            headings = [p.lstrip("*") for p in parts]
+            ags3_width = len(headings)
+            yield "HEADING", headings
+        elif first == "<UNITS>":
+            yield "UNIT", [""] + parts[1:]
+        elif ags3 and len(parts) >= ags3_width:
+            yield "DATA", parts
+
+
+def _cont_pieces(cell: str) -> set:
+    """The values merged into a cell (split on " | ", stripped)."""
+    return {p.strip() for p in cell.split(" | ") if p}
+
+
+class _ColumnarGroup:
+    """
+    Growable per-heading column buffers for one AGS group.
+    Rows are staged in a small block and transposed into the columns in bulk,
+    so no per-row dict is ever built.
+    """
+
+    BLOCK_ROWS = 512
+
+    def __init__(self):
+        self.columns: Dict[str, List[Optional[str]]] = {}
+        self.n_rows = 0
+        self._headings: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._block: List[List[Optional[str]]] = []
+        # <CONT> values of the last row, per heading index: (pieces, seen values);
+        # joined into the cell once the row is finished
+        self._cont: Dict[int, tuple] = {}
+        self.units: Dict[str, str] = {}
+        self.types: Dict[str, str] = {}
+
+    def set_meta(self, desc: str, fields: List[str]):
+        """Record the UNIT / TYPE row of the current headings."""
+        target = self.units if desc == "UNIT" else self.types
+        target.update(zip(self._headings, fields))
+
+    def set_headings(self, headings: List[str]):
+        self._finish_cont()
+        self._flush()
+        self._headings = list(headings)
+        # Last occurrence wins for repeated headings (as dict(zip(...)) did)
+        self._slots = {h: i for i, h in enumerate(self._headings)}
+        for h in self._slots:
+            if h not in self.columns:
+                self.columns[h] = [None] * self.n_rows
+
+    def append(self, fields: List[str]):
+        # Short/long rows are padded/truncated to the headings when the block is flushed
+        self._finish_cont()
+        self._block.append(fields)
+        if len(self._block) >= self.BLOCK_ROWS:
+            self._flush()
+
+    def get_last(self, idx: int) -> Optional[str]:
+        if self._block:
+            row = self._block[-1]
+            return row[idx] if idx < len(row) else None
+        return self.columns[self._headings[idx]][-1]
+
+    def continue_last(self, idx: int, value: str):
+        """
+        Add a <CONT> value to cell idx of the last row (" | "-separated, skipping a
+        value the cell already holds); buffered, so a cell with many continuation
+        lines costs linear rather than quadratic time.
+        """
+        buf = self._cont.get(idx)
+        if buf is None:
+            prev = self.get_last(idx)
+            buf = self._cont[idx] = ([prev] if prev else [], _cont_pieces(prev) if prev else set())
+        pieces, seen = buf
+        if value not in seen:
+            pieces.append(value)
+            seen.update(_cont_pieces(value))
+
+    def _finish_cont(self):
+        for idx, (pieces, _) in self._cont.items():
+            self.set_last(idx, " | ".join(pieces))
+        self._cont = {}
+
+    def set_last(self, idx: int, value: str):
+        if self._block:
+            row = self._block[-1]
+            if idx >= len(row):
+                row.extend([None] * (idx + 1 - len(row)))
+            row[idx] = value
+        else:
+            self.columns[self._headings[idx]][-1] = value
+
+    def has_rows(self) -> bool:
+        return bool(self._block) or self.n_rows > 0
+
+    def _flush(self):
+        if not self._block:
+            return
+        n = len(self._block)
+        transposed = list(zip_longest(*self._block))
+        for h, col in self.columns.items():
+            i = self._slots.get(h)
+            col.extend(transposed[i] if i is not None and i < len(transposed) else [None] * n)
+        self.n_rows += n
+        self._block = []
+
+    def to_frame(self, typed: bool = True) -> pd.DataFrame:
+        self._finish_cont()
+        self._flush()
+        if not self.columns:
+            return pd.DataFrame()
+        df = pd.DataFrame(self.columns)
+        if typed:
+            df = apply_column_kinds(df, column_kinds(list(self.columns), self.units, self.types))
+        return df
+
+
+def list_groups(source: Union[bytes, BinaryIO]) -> List[str]:
+    """Names of the groups in AGS content, in file order, from a fast scan that skips their rows."""
+    names = (fields[0] for desc, fields in iter_ags_records(source, groups=()) if desc == "GROUP" and fields)
+    return list(dict.fromkeys(names))
+
+
+@instrumented()
+def parse_ags_file(
+    source: Union[bytes, BinaryIO], typed: bool = True, groups: Optional[Iterable[str]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Parse AGS3/AGS4 content (raw bytes or a binary stream) into {group_name: DataFrame}.
+    With typed=True, columns are converted using the UNIT/TYPE rows (see ags_types):
+    float64 for numeric values, categoricals for repeated codes, text otherwise.
+    With groups, only those groups are built; the rows of all others are skipped.
+    """
+    wanted = None if groups is None else {g.upper() for g in groups}
+    group_data: Dict[str, _ColumnarGroup] = {}
+    current = None
+    headings: List[str] = []
+
+    for desc, fields in iter_ags_records(source, wanted):
+        if desc == "GROUP":
+            gname = fields[0] if fields else None
+            if gname is not None and (wanted is None or gname.upper() in wanted):
+                current = group_data.setdefault(gname, _ColumnarGroup())
+            else:
+                current = None
+            headings = []
+        elif desc == "HEADING":
+            headings = fields
+            if current is not None:
+                current.set_headings(headings)
+        elif current is None or not headings:
+            continue
+        elif desc == "DATA":
+            current.append(fields)
+        elif desc == "<CONT>":
+            # Append continuation values to previous data row
+            if current.has_rows():
+                for idx, val in enumerate(fields):
+                    if idx < len(headings) and val:
+                        current.continue_last(idx, val)
+        elif desc in ("UNIT", "TYPE"):
+            current.set_meta(desc, fields)
+
+    # Convert each group to a DataFrame straight from its column buffers
+    group_dfs = {g: cols.to_frame(typed) for g, cols in group_data.items()}
+
+    # Normalization: common AGS spelling differences and keys
+    for g, df in group_dfs.items():
+        if df.empty:
+            continue
+        # normalize column names
+        renamed = {}
+        for c in df.columns:
+            cc = c
+            if cc.upper() == "SPEC_DPTH" or cc.upper() == "SPEC_DEPTH":
+                cc = "SPEC_DEPTH"
+            if cc.upper() == "LOCA_ID" or cc.upper() == "HOLE_ID":
+                cc = "HOLE_ID"
+            renamed[c] = cc
+        df = df.rename(columns=renamed)
+        group_dfs[g] = df
+
+    return group_dfs
+
+
+# --------------------------------------------------------------------------------------
+# Multi-file parsing
+# --------------------------------------------------------------------------------------
+# Below these sizes a process pool costs more to start (and to pickle frames back) than it saves
+PARALLEL_MIN_FILES = 4
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+# A single file is split by group ranges only when it is large enough to pay for
+# starting the worker processes (each imports pandas) and sending the frames back
+SPLIT_MIN_BYTES = 32 * 1024 * 1024
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def _parse_one(
+    file_bytes: bytes, groups: Optional[Tuple[str, ...]] = None
+) -> Tuple[Dict[str, str], Dict[str, pd.DataFrame]]:
+    return analyze_ags_content(file_bytes), parse_ags_file(file_bytes, groups=groups)
+
+
+def _parse_many(
+    blobs: List[bytes], workers: int, groups: Optional[Tuple[str, ...]] = None
+) -> List[Tuple[Dict[str, str], Dict[str, pd.DataFrame]]]:
+    workers = min(workers, len(blobs))
+    if workers <= 1 or len(blobs) < PARALLEL_MIN_FILES or sum(len(b) for b in blobs) < PARALLEL_MIN_BYTES:
+        return [_parse_one(b, groups) for b in blobs]
+    # spawn: the Streamlit server is multi-threaded, which makes fork unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(partial(_parse_one, groups=groups), blobs))
+
+
+def _parse_split(
+    blobs: List[bytes], workers: int, indexes: List[Optional[list]]
+) -> List[Tuple[Dict[str, str], Dict[str, pd.DataFrame]]]:
+    """_parse_many with large files cut into batches of whole groups by their byte ranges."""
+    from triaxial_ags.ags_index import build_group_index, group_bytes, merge_group_dicts, split_entries
+
+    share = max(1, workers // len(blobs))
+    chunks: List[bytes] = []
+    owners: List[int] = []
+    orders: List[List[str]] = []
+    for n, (blob, index) in enumerate(zip(blobs, indexes)):
+        if len(blob) < SPLIT_MIN_BYTES or share == 1:
+            chunks.append(blob)
+            owners.append(n)
+            orders.append([])
+            continue
+        index = index if index is not None else build_group_index(blob)
+        orders.append([e["group"] for e in index])
+        for batch in split_entries(index, share):
+            chunks.append(group_bytes(blob, batch, None))
+            owners.append(n)
+    parts: List[List[Dict[str, pd.DataFrame]]] = [[] for _ in blobs]
+    for n, (_, gdict) in zip(owners, _parse_many(chunks, workers)):
+        parts[n].append(gdict)
+    return [
+        (analyze_ags_content(blob), merge_group_dicts(p, order) if order else p[0])
+        for blob, p, order in zip(blobs, parts, orders)
+    ]
+
+
+@instrumented()
+def parse_files(
+    files: Sequence[Tuple[str, bytes]],
+    workers: Optional[int] = None,
+    cache=None,
+    keys: Optional[Sequence[str]] = None,
+    groups: Optional[Iterable[str]] = None,
+) -> Tuple[List[Tuple[str, Dict[str, pd.DataFrame]]], List[Tuple[str, Dict[str, str]]]]:
+    """
+    Parse several AGS files, concurrently across processes when the batch is large enough.
+    With a ParseCache, files whose content was parsed before are not parsed again
+    (pass keys, from cache.content_key, if the caller has already hashed the files).
+    With groups, only those groups are parsed (see parse_ags_file); such partial
+    results are cached separately from full ones, and with a cache only the groups'
+    byte ranges are read, via each file's persisted group index (see ags_index).
+    With fewer files than workers, large files are parsed in parallel by group ranges.
+    Returns ([(fname, gdict), ...], [(fname, flags), ...]) in input order,
+    ready for combine_groups and the diagnostics table.
+    """
+    workers = default_workers() if workers is None else max(1, workers)
+    groups = tuple(sorted({g.upper() for g in groups})) if groups is not None else None
+
+    results: List[Optional[Tuple[Dict[str, str], Dict[str, pd.DataFrame]]]] = [None] * len(files)
+    parse_keys = None
+    if cache is not None:
+        from triaxial_ags.cache import content_key, projection_key
+
+        if keys is None:
+            keys = [content_key(b) for _, b in files]
+        parse_keys = [projection_key(k, groups) for k in keys]
+        for i in range(len(files)):
+            results[i] = cache.get(parse_keys[i])
+
+    todo = [i for i, r in enumerate(results) if r is None]
+    blobs = [files[i][1] for i in todo]
+    if groups is not None and cache is not None:
+        # Only the byte ranges of the selected groups, found through the file's group index
+        from triaxial_ags.ags_index import group_bytes
+
+        parsed_list = _parse_many(
+            [group_bytes(b, cache.group_index(keys[i], b), groups) for i, b in zip(todo, blobs)], workers, groups
+        )
+        parsed_list = [(analyze_ags_content(b), gdict) for b, (_, gdict) in zip(blobs, parsed_list)]
+    elif groups is None and 0 < len(todo) < workers and any(len(b) >= SPLIT_MIN_BYTES for b in blobs):
+        # Fewer files than workers: spread the groups of large files across processes
+        indexes = [cache.group_index(keys[i], b) if cache is not None else None for i, b in zip(todo, blobs)]
+        parsed_list = _parse_split(blobs, workers, indexes)
+    else:
+        parsed_list = _parse_many(blobs, workers, groups)
+    for i, parsed in zip(todo, parsed_list):
+        if cache is not None:
+            cache.put(parse_keys[i], parsed)
+        results[i] = parsed
+
+    all_group_dfs = [(fname, gdict) for (fname, _), (_, gdict) in zip(files, results)]
+    diagnostics = [(fname, flags) for (fname, _), (flags, _) in zip(files, results)]
+    return all_group_dfs, diagnostics
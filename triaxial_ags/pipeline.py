@@ -0,0 +1,71 @@
+"""
+Memoized processing stages: parse → combine → triaxial → s–t → filter → envelopes → plot.
+
+Each stage result is kept together with the inputs it was computed from; running a
+stage again with the same inputs returns the kept result. Inputs are hashable
+values (options, content keys) plus the tokens of upstream stages, so a change
+only recomputes the stages downstream of it.
+
+    pipe = StagePipeline()
+    tri = pipe.run("triaxial", lambda: generate_triaxial_table(groups), versions, tolerance)
+    st_df = pipe.run("s_t", lambda: compute_s_t(tri, mode), pipe.token("triaxial"), mode)
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from triaxial_ags.instrument import count_rows, stage as instrument_stage
+
+# Display order; stages not listed here are shown after these
+STAGES = ("parse", "combine", "triaxial", "s_t", "filter_index", "filter", "envelopes", "plot")
+
+
+class StagePipeline:
+    """
+    One memo slot per (stage, slot): the last inputs and result. Stages that hold
+    several independent results (e.g. one workbook per group) pass a slot name.
+    """
+
+    def __init__(self):
+        self._memo: Dict[Tuple[str, Optional[Hashable]], Tuple[Hashable, Any, int]] = {}
+        self._tokens: Dict[str, int] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def run(self, stage: str, compute: Callable[[], Any], *inputs: Hashable, slot: Optional[Hashable] = None) -> Any:
+        """
+        Result of compute() for these inputs, computed only if they differ from the last
+        run; recomputations are recorded as stages of the active Profiler, if any.
+        """
+        key = (stage, slot)
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None and hit[0] == inputs:
+                self.hits[stage] = self.hits.get(stage, 0) + 1
+                self._tokens[stage] = hit[2]
+                return hit[1]
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+        with instrument_stage(stage) as rec:
+            value = compute()
+            rec["rows_out"] = count_rows(value)
+        with self._lock:
+            self._clock += 1
+            self._memo[key] = (inputs, value, self._clock)
+            self._tokens[stage] = self._clock
+        return value
+
+    def token(self, stage: str) -> int:
+        """
+        Identifies the result most recently returned by a stage (0 if it never ran);
+        pass it as an input of the stages that consume that result.
+        """
+        return self._tokens.get(stage, 0)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Hit/miss counts per stage since the pipeline was created."""
+        names = list(STAGES) + sorted((set(self.hits) | set(self.misses)) - set(STAGES))
+        return [
+            {"stage": s, "hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)}
+            for s in names if s in self.hits or s in self.misses
+        ]
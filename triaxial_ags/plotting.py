@@ -0,0 +1,195 @@
+"""
+s–t scatter figures (Plotly) that stay responsive for large test sets: SVG for
+small sets, WebGL above WEBGL_MIN_POINTS, and server-side 2D density bins above
+DENSITY_MIN_POINTS, so only one marker per occupied bin reaches the browser.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from triaxial_ags.envelopes import envelope_labels, envelope_segments
+from triaxial_ags.instrument import instrumented
+
+WEBGL_MIN_POINTS = 5_000
+DENSITY_MIN_POINTS = 50_000
+DEFAULT_BINS = 150
+
+RENDER_MODES = ("auto", "svg", "webgl", "density")
+
+HOVER_COLUMNS = ["HOLE_ID", "TEST_TYPE", "SPEC_DEPTH", "CELL", "PWPF", "DEVF", "s_total", "s_effective", "SOURCE_FILE"]
+
+Range = Tuple[float, float]
+
+
+def choose_render_mode(n_points: int, render: str = "auto") -> str:
+    """'svg', 'webgl' or 'density' for n_points; an explicit render mode wins over 'auto'."""
+    if render != "auto":
+        return render
+    if n_points >= DENSITY_MIN_POINTS:
+        return "density"
+    return "webgl" if n_points >= WEBGL_MIN_POINTS else "svg"
+
+
+def select_region(df: pd.DataFrame, x_range: Optional[Range] = None, y_range: Optional[Range] = None,
+                  x: str = "s", y: str = "t") -> pd.DataFrame:
+    """Rows whose (x, y) lie inside the given ranges (inclusive); None leaves an axis open."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, rng in ((x, x_range), (y, y_range)):
+        if rng is not None:
+            v = df[col].to_numpy(dtype=float, na_value=np.nan)
+            mask &= (v >= rng[0]) & (v <= rng[1])
+    return df[mask]
+
+
+def density_bins(
+    df: pd.DataFrame,
+    x: str = "s",
+    y: str = "t",
+    bins: int = DEFAULT_BINS,
+    by: Sequence[str] = (),
+    x_range: Optional[Range] = None,
+    y_range: Optional[Range] = None,
+) -> pd.DataFrame:
+    """
+    Count points per cell of a bins × bins grid, separately for each combination
+    of the by columns (colour / facet). Returns one row per occupied cell with the
+    cell centre in x / y, the by values and "count".
+    """
+    by = [c for c in dict.fromkeys(by) if c in df.columns]
+    xv = df[x].to_numpy(dtype=float, na_value=np.nan)
+    yv = df[y].to_numpy(dtype=float, na_value=np.nan)
+    ok = ~np.isnan(xv) & ~np.isnan(yv)
+    if not ok.any():
+        return pd.DataFrame(columns=[x, y, *by, "count"])
+
+    edges = []
+    for v, rng in ((xv[ok], x_range), (yv[ok], y_range)):
+        lo, hi = rng if rng is not None else (float(v.min()), float(v.max()))
+        if hi <= lo:
+            hi = lo + 1.0
+        edges.append((lo, (hi - lo) / bins))
+    (x0, wx), (y0, wy) = edges
+    ix = np.clip(((xv[ok] - x0) // wx).astype(np.int64), 0, bins - 1)
+    iy = np.clip(((yv[ok] - y0) // wy).astype(np.int64), 0, bins - 1)
+
+    rows = np.flatnonzero(ok)
+    groups = (
+        df.iloc[rows].groupby(by, sort=False, dropna=False, observed=True).ngroup().to_numpy(dtype=np.int64)
+        if by else np.zeros(len(rows), dtype=np.int64)
+    )
+    cell = (groups * bins + ix) * bins + iy
+    _, first, counts = np.unique(cell, return_index=True, return_counts=True)
+
+    out = pd.DataFrame({
+        x: x0 + (ix[first] + 0.5) * wx,
+        y: y0 + (iy[first] + 0.5) * wy,
+    })
+    for c in by:
+        out[c] = df[c].iloc[rows[first]].to_numpy()
+    out["count"] = counts
+    return out
+
+
+@instrumented()
+def build_st_figure(
+    fdf: pd.DataFrame,
+    mode: str,
+    color_by: Optional[str] = None,
+    facet_col: Optional[str] = None,
+    show_labels: bool = False,
+    render: str = "auto",
+    bins: int = DEFAULT_BINS,
+    x_range: Optional[Range] = None,
+    y_range: Optional[Range] = None,
+    envelopes: Optional[pd.DataFrame] = None,
+):
+    """
+    s–t scatter of the filtered s–t table. Colour and facet columns are kept in
+    every render mode; in density mode each marker is one occupied bin, sized by
+    its point count. x_range / y_range restrict the plot to a region (drill-down).
+    envelopes (fit_envelopes output) are drawn as fitted lines, in their facet.
+    """
+    if x_range is not None or y_range is not None:
+        fdf = select_region(fdf, x_range, y_range)
+    color = color_by if color_by in fdf.columns else None
+    facet = facet_col if facet_col in fdf.columns else None
+    symbol = "TEST_TYPE" if "TEST_TYPE" in fdf.columns else None
+    labels = {"s": "s (kPa)", "t": "t = q/2 (kPa)", "count": "tests"}
+    render = choose_render_mode(len(fdf), render)
+    # A fixed facet order, so fitted lines can be placed in the right facet
+    facet_values = sorted(fdf[facet].dropna().astype(str).unique()) if facet else []
+    orders = {facet: facet_values} if facet else None
+
+    if render == "density":
+        binned = density_bins(fdf, bins=bins, by=[c for c in (color, facet) if c], x_range=x_range, y_range=y_range)
+        fig = px.scatter(
+            binned,
+            x="s",
+            y="t",
+            color=color,
+            facet_col=facet,
+            size="count",
+            hover_data=["count"],
+            category_orders=orders,
+            title=f"s–t density ({mode} stress, {len(fdf):,} tests in {len(binned):,} bins)",
+            labels=labels,
+            template="simple_white",
+            render_mode="webgl",
+        )
+    else:
+        hover_cols: List[str] = [c for c in HOVER_COLUMNS if c in fdf.columns]
+        fig = px.scatter(
+            fdf,
+            x="s",
+            y="t",
+            color=color,
+            facet_col=facet,
+            symbol=symbol,
+            hover_data=hover_cols,
+            category_orders=orders,
+            text="HOLE_ID" if show_labels and "HOLE_ID" in fdf.columns else None,
+            title=f"s–t Plot ({mode} stress)",
+            labels=labels,
+            template="simple_white",
+            render_mode=render,
+        )
+        if show_labels and "HOLE_ID" in fdf.columns:
+            # Per-trace labels, so they stay aligned with their points when coloured or faceted
+            fig.update_traces(textposition="top center", mode="markers+text")
+
+    if envelopes is not None and len(envelopes):
+        add_envelope_lines(fig, envelopes, facet, facet_values, webgl=render != "svg")
+    fig.update_layout(legend_title_text=color if color else "Legend")
+    return fig
+
+
+def add_envelope_lines(fig, envelopes: pd.DataFrame, facet: Optional[str] = None,
+                       facet_values: Sequence[str] = (), webgl: bool = False):
+    """
+    The fitted t = a + s·tanα lines as one dashed trace per facet (lines separated
+    by gaps), with c′, φ′ and R² on hover.
+    """
+    trace_type = go.Scattergl if webgl else go.Scatter
+    panels = [(None, envelopes)]
+    if facet and facet in envelopes.columns:
+        keys = envelopes[facet].astype(str)
+        panels = [(i + 1, envelopes[(keys == v).to_numpy()]) for i, v in enumerate(facet_values)]
+    for col, fits in panels:
+        seg = envelope_segments(fits)
+        if seg.empty:
+            continue
+        text = np.asarray(envelope_labels(fits), dtype=object)[seg["fit"].to_numpy()]
+        trace = trace_type(
+            x=seg["s"], y=seg["t"], mode="lines", name="Envelope fits", legendgroup="envelopes",
+            showlegend=col in (None, 1), text=text, hovertemplate="%{text}<extra></extra>",
+            line={"color": "#444", "dash": "dash", "width": 1},
+        )
+        if col is not None:
+            fig.add_trace(trace, row=1, col=col)
+        elif facet:
+            fig.add_trace(trace, row="all", col="all")
+        else:
+            fig.add_trace(trace)
@@ -0,0 +1,241 @@
+"""
+Project store: parsed AGS groups kept in a local SQLite database (stdlib sqlite3),
+one table per group, so a project can be reopened and queried without reading
+its AGS files again.
+
+Rows carry their SOURCE_FILE; adding a file again replaces its rows (unchanged
+files, by content key, are skipped). HOLE_ID, SPEC_DEPTH and SOURCE_FILE are
+indexed, and load_groups filters on them in SQL:
+
+    with ProjectStore("site.sqlite") as store:
+        store.add_files(parse_files(files)[0])
+        groups = store.load_groups(TRIAXIAL_GROUPS, holes=["BH1", "BH2"], depth=(0, 20))
+        tri_df = generate_triaxial_table(groups)
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from triaxial_ags.ags_types import CATEGORY, NUMERIC, TEXT
+from triaxial_ags.instrument import instrumented
+from triaxial_ags.tables import drop_singleton_rows
+
+INDEXED_COLUMNS = ("HOLE_ID", "SPEC_DEPTH", "SOURCE_FILE")
+
+# Rows per executemany batch when appending a group
+INSERT_BATCH_ROWS = 50_000
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_kind(s: pd.Series) -> str:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return CATEGORY
+    if is_numeric_dtype(s.dtype) and not is_bool_dtype(s.dtype):
+        return NUMERIC
+    return TEXT
+
+
+class ProjectStore:
+    """
+    SQLite file with one table per AGS group plus two bookkeeping tables: _files
+    (source file → content key) and _columns (group columns in order, with the
+    kind used to restore dtypes on load). Safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS _files (source_file TEXT PRIMARY KEY, content_key TEXT, added TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS _columns (group_name TEXT, column_name TEXT, kind TEXT, position INTEGER,"
+                " PRIMARY KEY (group_name, column_name))"
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ProjectStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- contents ----------------------------------------------------------------------
+    def files(self) -> Dict[str, str]:
+        """{source file: content key} of the stored files."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT source_file, content_key FROM _files ORDER BY source_file"))
+
+    def groups(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT group_name FROM _columns ORDER BY group_name")]
+
+    def row_counts(self) -> Dict[str, int]:
+        names = self.groups()
+        with self._lock:
+            return {g: self._conn.execute(f"SELECT COUNT(*) FROM {_quote(g)}").fetchone()[0] for g in names}
+
+    def distinct(self, group: str, column: str) -> list:
+        """Sorted distinct non-null values of a column (uses its index where there is one)."""
+        if column not in self._columns(group):
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {_quote(column)} FROM {_quote(group)} WHERE {_quote(column)} IS NOT NULL"
+                f" ORDER BY 1"
+            )
+            return [r[0] for r in rows]
+
+    def value_range(self, group: str, column: str) -> Optional[Tuple[float, float]]:
+        """
+        (min, max) of the numeric values of a column, or None if the group has none
+        (text values, e.g. "n/a" in a column that is otherwise numeric, are ignored).
+        """
+        if column not in self._columns(group):
+            return None
+        col = _quote(column)
+        with self._lock:
+            low, high = self._conn.execute(
+                f"SELECT MIN({col}), MAX({col}) FROM {_quote(group)} WHERE typeof({col}) IN ('real', 'integer')"
+            ).fetchone()
+        return None if low is None else (float(low), float(high))
+
+    # ---- writing -----------------------------------------------------------------------
+    @instrumented("store_add_files")
+    def add_files(
+        self, parsed: Sequence[Tuple[str, Dict[str, pd.DataFrame]]], keys: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """
+        Store [(file name, {group: frame}), ...] (parse_files output); a file already
+        stored is replaced, or skipped if its content key is unchanged. Returns the
+        names of the files written.
+        """
+        stored = self.files()
+        written = []
+        for i, (fname, gdict) in enumerate(parsed):
+            key = keys[i] if keys is not None else None
+            if key is not None and stored.get(fname) == key:
+                continue
+            self.add_file(fname, gdict, key)
+            written.append(fname)
+        return written
+
+    def add_file(self, fname: str, gdict: Dict[str, pd.DataFrame], key: Optional[str] = None):
+        """Replace the rows of one source file with its parsed groups, in one transaction."""
+        with self._lock, self._conn:
+            self._delete_file(fname)
+            for gname, df in gdict.items():
+                if df is not None and not df.empty:
+                    self._append(gname, df.assign(SOURCE_FILE=fname))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO _files VALUES (?, ?, ?)", (fname, key, time.strftime("%Y-%m-%dT%H:%M:%S"))
+            )
+
+    def remove_file(self, fname: str):
+        with self._lock, self._conn:
+            self._delete_file(fname)
+
+    def _delete_file(self, fname: str):
+        for (gname,) in self._conn.execute("SELECT DISTINCT group_name FROM _columns").fetchall():
+            self._conn.execute(f"DELETE FROM {_quote(gname)} WHERE SOURCE_FILE = ?", (fname,))
+        self._conn.execute("DELETE FROM _files WHERE source_file = ?", (fname,))
+
+    def _append(self, gname: str, df: pd.DataFrame):
+        table = _quote(gname)
+        known = {
+            name: kind for name, kind in
+            self._conn.execute("SELECT column_name, kind FROM _columns WHERE group_name = ?", (gname,))
+        }
+        if not known:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (SOURCE_FILE TEXT)")
+            known["SOURCE_FILE"] = CATEGORY
+            self._conn.execute("INSERT INTO _columns VALUES (?, 'SOURCE_FILE', ?, 0)", (gname, CATEGORY))
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{gname}_SOURCE_FILE')} ON {table} (SOURCE_FILE)")
+        df = df.loc[:, ~df.columns.duplicated()]
+        for col in df.columns:
+            if col in known:
+                # A column that was numeric but now holds text is read back as text
+                if known[col] == NUMERIC and _column_kind(df[col]) != NUMERIC:
+                    self._conn.execute(
+                        "UPDATE _columns SET kind = ? WHERE group_name = ? AND column_name = ?", (TEXT, gname, col)
+                    )
+                continue
+            kind = _column_kind(df[col])
+            sql_type = "REAL" if kind == NUMERIC else "TEXT"
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(col)} {sql_type}")
+            self._conn.execute("INSERT INTO _columns VALUES (?, ?, ?, ?)", (gname, col, kind, len(known)))
+            known[col] = kind
+            if col in INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{gname}_{col}')} ON {table} ({_quote(col)})")
+
+        cols = list(df.columns)
+        insert = f"INSERT INTO {table} ({', '.join(map(_quote, cols))}) VALUES ({', '.join('?' * len(cols))})"
+        # Object arrays with None for missing values (stored as NULL)
+        values = [df[c].astype(object).where(df[c].notna(), None).to_numpy() for c in cols]
+        for start in range(0, len(df), INSERT_BATCH_ROWS):
+            chunk = [v[start:start + INSERT_BATCH_ROWS].tolist() for v in values]
+            self._conn.executemany(insert, zip(*chunk))
+
+    # ---- reading -----------------------------------------------------------------------
+    def _columns(self, group: str) -> Dict[str, str]:
+        with self._lock:
+            return {
+                name: kind for name, kind in self._conn.execute(
+                    "SELECT column_name, kind FROM _columns WHERE group_name = ? ORDER BY position", (group,)
+                )
+            }
+
+    @instrumented("store_load_group")
+    def load_group(
+        self, group: str, holes: Optional[Iterable[str]] = None, sources: Optional[Iterable[str]] = None,
+        depth: Optional[Tuple[float, float]] = None,
+    ) -> pd.DataFrame:
+        """
+        Rows of one group in insertion order, filtered in SQL on the indexed columns the
+        group has (a filter on a column the group lacks is ignored). Columns come back
+        in their stored order and kinds, with SOURCE_FILE last as in combine_groups.
+        """
+        kinds = self._columns(group)
+        if not kinds:
+            return pd.DataFrame()
+        where, params = [], []
+        for col, values in (("HOLE_ID", holes), ("SOURCE_FILE", sources)):
+            if values is not None and col in kinds:
+                values = list(values)
+                where.append(f"{_quote(col)} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(values)
+        if depth is not None and "SPEC_DEPTH" in kinds:
+            where.append('"SPEC_DEPTH" BETWEEN ? AND ?')
+            params.extend(depth)
+        order = [c for c in kinds if c != "SOURCE_FILE"] + ["SOURCE_FILE"]
+        sql = f"SELECT {', '.join(map(_quote, order))} FROM {_quote(group)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            df = pd.read_sql_query(sql + " ORDER BY rowid", self._conn, params=params)
+        for col, kind in kinds.items():
+            if kind == CATEGORY:
+                df[col] = df[col].astype("category")
+            elif kind == NUMERIC:
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+        return drop_singleton_rows(df)
+
+    def load_groups(self, groups: Optional[Iterable[str]] = None, **filters) -> Dict[str, pd.DataFrame]:
+        """{group: frame} like combine_groups returns, for the given groups (default: all)."""
+        stored = self.groups()
+        names = stored if groups is None else [g for g in groups if g in stored]
+        out = {g: self.load_group(g, **filters) for g in names}
+        return {g: df for g, df in out.items() if not df.empty}
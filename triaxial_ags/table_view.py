@@ -0,0 +1,110 @@
+"""
+Server-side paging for large tables: column filters and sorting are evaluated on
+the DataFrame, and only a window of rows is handed to the frontend.
+
+Filters are hashable (column, op, value) triples, so the matching row order can
+be memoized per table and reused while only the window moves:
+
+    order = view_order(df, (("HOLE_ID", "in", ("BH1", "BH2")), ("SAMP_TOP", "between", (0.0, 10.0))),
+                       sort_by="SAMP_TOP")
+    window = view_window(df, order, start=0, rows=200)
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+# Rows shown before the reader moves the row-range slider, and the most sent at once
+DEFAULT_WINDOW_ROWS = 200
+MAX_WINDOW_ROWS = 2000
+
+# A filter: (column, op, value) with op "in" (tuple of values), "between"
+# ((low, high), inclusive) or "contains" (case-insensitive substring)
+Filter = Tuple[str, str, Any]
+
+
+def filter_kind(s: pd.Series) -> str:
+    """Which filter a column gets: "between" (numeric), "in" (categorical) or "contains" (text)."""
+    if is_numeric_dtype(s.dtype) and not is_bool_dtype(s.dtype):
+        return "between"
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return "in"
+    return "contains"
+
+
+def filter_mask(df: pd.DataFrame, filters: Sequence[Filter]) -> Optional[np.ndarray]:
+    """Boolean mask of the rows matching every filter (None when nothing is filtered)."""
+    mask = None
+    for col, op, value in filters:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if op == "in":
+            m = s.isin(list(value)).to_numpy()
+        elif op == "between":
+            low, high = value
+            m = s.between(low, high).to_numpy(dtype=bool, na_value=False)
+        elif op == "contains":
+            if not value:
+                continue
+            m = s.astype("string").str.contains(value, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+        else:
+            raise ValueError(f"Unknown filter op: {op!r}")
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def view_order(
+    df: pd.DataFrame, filters: Sequence[Filter] = (), sort_by: Optional[str] = None, ascending: bool = True,
+) -> np.ndarray:
+    """Positions of the matching rows in display order (stable sort, blanks last)."""
+    mask = filter_mask(df, filters)
+    positions = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+    if sort_by is not None and sort_by in df.columns and len(positions) > 1:
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            # Categories are in order of first appearance; sort them by value
+            cats = pd.Series(keys.cat.categories)
+            keys = keys.cat.set_categories(cats.iloc[_value_order(cats)])
+        elif keys.dtype == object:
+            # Columns combined from typed and untyped files mix numbers and text
+            keys = _mixed_keys(keys)
+        if isinstance(keys, pd.DataFrame):
+            ordered = keys.sort_values(list(keys.columns), ascending=ascending, kind="stable", na_position="last")
+        else:
+            ordered = keys.sort_values(ascending=ascending, kind="stable", na_position="last")
+        positions = positions[ordered.index]
+    return positions
+
+
+def _mixed_keys(values: pd.Series) -> pd.DataFrame:
+    """Sort keys for an object column: numeric value first (text that is not a number after numbers), then text."""
+    return pd.DataFrame({"number": pd.to_numeric(values, errors="coerce"), "text": values.astype("string")})
+
+
+def _value_order(values: pd.Series) -> np.ndarray:
+    """Positions of values in sorted order, numbers before text when they are mixed."""
+    if values.dtype != object:
+        return np.argsort(values.to_numpy(), kind="stable")
+    return _mixed_keys(values).sort_values(["number", "text"], kind="stable", na_position="last").index.to_numpy()
+
+
+def view_window(df: pd.DataFrame, order: np.ndarray, start: int = 0, rows: int = DEFAULT_WINDOW_ROWS) -> pd.DataFrame:
+    """Rows order[start:start + rows] of df (at most MAX_WINDOW_ROWS), keeping their original index."""
+    start = max(0, start)
+    return df.iloc[order[start:start + min(rows, MAX_WINDOW_ROWS)]]
+
+
+def filter_options(s: pd.Series) -> Dict[str, Any]:
+    """What a filter widget needs: the values of a categorical, or the range of a numeric column."""
+    kind = filter_kind(s)
+    if kind == "in":
+        codes = s.cat.codes.to_numpy()
+        used = pd.Series(s.cat.categories[np.unique(codes[codes >= 0])])
+        return {"kind": kind, "values": used.iloc[_value_order(used)].tolist()}
+    if kind == "between":
+        valid = s.dropna()
+        return {"kind": kind, "min": float(valid.min()) if len(valid) else 0.0,
+                "max": float(valid.max()) if len(valid) else 0.0}
+    return {"kind": kind}
@@ -0,0 +1,343 @@
+"""
+Table clean-up helpers (singleton rows, multi-value cells) and cross-file group merging.
+"""
+import threading
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from triaxial_ags.instrument import instrumented
+
+
+def _filled_mask(s: pd.Series) -> np.ndarray:
+    """True where a value is non-null and not an empty/whitespace-only string."""
+    mask = s.notna().to_numpy(dtype=bool)
+    if s.dtype == object or pd.api.types.is_string_dtype(s.dtype):
+        try:
+            blank = s.str.strip().eq("").to_numpy(dtype=bool, na_value=False)
+        except AttributeError:  # object column without any strings
+            return mask
+        mask = mask & ~blank
+    return mask
+
+
+def row_fill_counts(df: pd.DataFrame) -> np.ndarray:
+    """
+    Number of non-empty/non-null values per row. Callers that clean the same frame
+    more than once (e.g. several exports of a group) compute it once and pass it
+    to drop_singleton_rows.
+    """
+    counts = np.zeros(len(df), dtype=np.int64)
+    for j in range(df.shape[1]):
+        counts += _filled_mask(df.iloc[:, j])
+    return counts
+
+
+@instrumented()
+def drop_singleton_rows(df: pd.DataFrame, fill_counts: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Remove rows that have <=1 non-empty/non-null values across all columns.
+    This prevents rows with only HOLE_ID populated from slipping in.
+    fill_counts is row_fill_counts(df), if the caller already has it.
+    """
+    if df.empty:
+        return df
+    counts = row_fill_counts(df) if fill_counts is None else fill_counts
+    return df.loc[counts > 1].reset_index(drop=True)
+
+
+def deduplicate_cell(cell):
+    if pd.isna(cell):
+        return cell
+    parts = [p.strip() for p in str(cell).split(" | ")]
+    unique_parts = []
+    for p in parts:
+        if p and p not in unique_parts:
+            unique_parts.append(p)
+    return " | ".join(unique_parts)
+
+
+def _is_typed(s: pd.Series) -> bool:
+    """Numeric or categorical column without " | " values, which the text clean-up can pass through."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return not any(" | " in str(c) for c in s.cat.categories)
+    return pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+
+
+@instrumented()
+def deduplicate_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column-wise deduplicate_cell: cells are stripped as text, and only cells that
+    contain " | " are split and de-duplicated (order preserved). Numeric and
+    categorical columns are kept as they are.
+    """
+    out = {}
+    for j in range(df.shape[1]):
+        s = df.iloc[:, j]
+        if _is_typed(s):
+            out[j] = s.array
+            continue
+        na = s.isna().to_numpy()
+        if na.all():
+            out[j] = s.to_numpy(dtype=object)
+            continue
+        text_s = s.astype(str)
+        has_sep = text_s.str.contains(" | ", regex=False).to_numpy(dtype=bool) & ~na
+        vals = text_s.str.strip().to_numpy(dtype=object)
+        vals[na] = s.to_numpy(dtype=object)[na]
+        if has_sep.any():
+            rows = np.flatnonzero(has_sep)
+            vals[rows] = [
+                " | ".join(dict.fromkeys(p for p in (x.strip() for x in t.split(" | ")) if p))
+                for t in text_s.to_numpy(dtype=object)[rows]
+            ]
+        out[j] = vals
+    result = pd.DataFrame(out, index=df.index)
+    result.columns = df.columns
+    return result
+
+
+@instrumented()
+def expand_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    If any cell contains " | " concatenated values, expand into multiple rows.
+    Column-wise: each row becomes as many rows as its longest split cell; shorter
+    cells are padded with "" and values are zipped positionally. Text columns come
+    out as text; numeric and categorical columns keep their dtype (padded with NaN).
+    """
+    n = len(df)
+    if n == 0:
+        return pd.DataFrame()
+    if df.shape[1] == 0:
+        return pd.DataFrame(index=pd.RangeIndex(n))
+
+    texts = []
+    split_parts = []  # per column: (row positions, lists of parts, part counts) or None
+    row_len = np.ones(n, dtype=np.int64)
+    for j in range(df.shape[1]):
+        s = df.iloc[:, j]
+        if _is_typed(s):
+            texts.append(s)
+            split_parts.append(None)
+            continue
+        na = s.isna().to_numpy()
+        text_s = s.astype(str)
+        has_sep = text_s.str.contains(" | ", regex=False).to_numpy(dtype=bool) & ~na
+        text = text_s.to_numpy(dtype=object)
+        text[na] = ""
+        texts.append(text)
+
+        if not has_sep.any():
+            split_parts.append(None)
+            continue
+        rows = np.flatnonzero(has_sep)
+        parts = [t.split(" | ") for t in text[rows]]
+        counts = np.fromiter((len(p) for p in parts), dtype=np.int64, count=len(parts))
+        row_len[rows] = np.maximum(row_len[rows], counts)
+        split_parts.append((rows, parts, counts))
+
+    starts = np.cumsum(row_len) - row_len
+    total = int(row_len.sum())
+
+    out = {}
+    for j, (text, split) in enumerate(zip(texts, split_parts)):
+        if isinstance(text, pd.Series):
+            out[j] = text.array if total == n else _pad_typed(text, starts, total)
+            continue
+        if total == n:
+            out[j] = text
+            continue
+        col = np.full(total, "", dtype=object)
+        col[starts] = text
+        if split is not None:
+            rows, parts, counts = split
+            offsets = np.repeat(starts[rows], counts) + (
+                np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+            )
+            col[offsets] = list(chain.from_iterable(parts))
+        out[j] = col
+
+    result = pd.DataFrame(out)
+    result.columns = df.columns
+    return result
+
+
+def _pad_typed(s: pd.Series, starts: np.ndarray, total: int):
+    """A typed column spread over expanded rows: values at starts, missing elsewhere."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = np.full(total, -1, dtype=s.cat.codes.dtype)
+        codes[starts] = s.cat.codes.to_numpy()
+        return pd.Categorical.from_codes(codes, dtype=s.dtype)
+    col = np.full(total, np.nan)
+    col[starts] = s.to_numpy(dtype=float, na_value=np.nan)
+    return col
+
+
+# --------------------------------------------------------------------------------------
+# Merge multi-file groups
+# --------------------------------------------------------------------------------------
+@instrumented()
+def combine_groups(all_group_dfs: List[Tuple[str, Dict[str, pd.DataFrame]]]) -> Dict[str, pd.DataFrame]:
+    """
+    Combine groups across files. Adds SOURCE_FILE column.
+    Returns {group_name: combined_df}
+    """
+    combined: Dict[str, List[pd.DataFrame]] = {}
+    for fname, gdict in all_group_dfs:
+        for gname, df in gdict.items():
+            if df is None or df.empty:
+                continue
+            combined.setdefault(gname, []).append(with_source_file(df, fname))
+    return {g: drop_singleton_rows(concat_frames(dfs)) for g, dfs in combined.items()}
+
+
+def with_source_file(df: pd.DataFrame, fname: str) -> pd.DataFrame:
+    """df with a categorical SOURCE_FILE column (one category, so one byte per row)."""
+    source = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[fname])
+    return df.assign(SOURCE_FILE=source)
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat(frames, ignore_index=True), keeping categorical columns categorical:
+    their categories are unioned across frames (pandas would otherwise fall back to
+    text for differing categories), including values of frames where the column is text.
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    cat_cols = list(dict.fromkeys(
+        c for f in frames for c, t in f.dtypes.items() if isinstance(t, pd.CategoricalDtype)
+    ))
+    if not cat_cols:
+        return pd.concat(frames, ignore_index=True)
+    order = list(dict.fromkeys(c for f in frames for c in f.columns))
+    rest = [f.drop(columns=[c for c in cat_cols if c in f.columns]) for f in frames]
+    out = pd.concat(rest, ignore_index=True)
+    for c in cat_cols:
+        empty = next(f[c].cat.categories[:0] for f in frames if isinstance(f.dtypes.get(c), pd.CategoricalDtype))
+        parts = []
+        for f in frames:
+            if c not in f.columns:
+                parts.append(pd.Categorical.from_codes(np.full(len(f), -1, dtype=np.int8), categories=empty))
+            elif isinstance(f[c].dtype, pd.CategoricalDtype):
+                parts.append(f[c].array)
+            else:
+                parts.append(pd.Categorical(f[c]))
+        try:
+            out[c] = union_categoricals(parts, ignore_order=True)
+        except TypeError:  # categories of different kinds (e.g. text and numbers)
+            out[c] = pd.Series(np.concatenate([np.asarray(p, dtype=object) for p in parts])).astype("category")
+    return out[order]
+
+
+FragmentKey = Tuple[str, str]  # (file name, content key)
+
+
+class CombinedGroupStore:
+    """
+    combine_groups kept up to date across upload changes. Each file contributes
+    per-group fragments (SOURCE_FILE added, singleton rows dropped) keyed by its
+    name and content hash; on sync only groups whose fragment list changed are
+    re-concatenated, and unchanged groups keep the same frame object.
+
+    group_version() gives a token per group that changes whenever the combined
+    frame does, for caching downstream tables. Versions come from one clock and
+    only increase.
+    """
+
+    def __init__(self):
+        self._fragments: Dict[FragmentKey, Dict[str, pd.DataFrame]] = {}
+        self._members: Dict[str, List[FragmentKey]] = {}
+        self._groups: Dict[str, pd.DataFrame] = {}
+        self._versions: Dict[str, int] = {}
+        self._clock = 0
+        self._fill_counts: Dict[str, Tuple[int, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.changed: Set[str] = set()
+
+    @property
+    def groups(self) -> Dict[str, pd.DataFrame]:
+        return self._groups
+
+    def group_version(self, gnames: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """(group, version) for the given groups; absent groups are reported as version 0."""
+        return tuple((g, self._versions.get(g, 0)) for g in gnames)
+
+    def fill_counts(self, gnames: Iterable[str]) -> Callable[[], Dict[str, np.ndarray]]:
+        """
+        Row fill counts of the given groups as they are now: the frames and their
+        versions are taken when this is called, and the counts when the returned
+        function is (e.g. later, in a background export). Counts are memoized per
+        group version, so a sync in between never pairs a frame with another
+        version's counts.
+        """
+        pinned = [(g, self._groups[g], self._versions.get(g, 0)) for g in gnames if g in self._groups]
+
+        def counts() -> Dict[str, np.ndarray]:
+            out = {}
+            for gname, gdf, version in pinned:
+                with self._lock:
+                    hit = self._fill_counts.get(gname)
+                if hit is None or hit[0] != version:
+                    hit = (version, row_fill_counts(gdf))
+                    with self._lock:
+                        current = self._fill_counts.get(gname)
+                        # A job for an older version must not replace newer counts
+                        if current is None or current[0] < version:
+                            self._fill_counts[gname] = hit
+                out[gname] = hit[1]
+            return out
+
+        return counts
+
+    def sync(self, files: Sequence[Tuple[str, str, Dict[str, pd.DataFrame]]]) -> Set[str]:
+        """
+        Bring the store in line with the current upload set, [(fname, content key,
+        gdict), ...] in upload order. Returns (and keeps in .changed) the names of
+        groups whose combined frame was rebuilt, added or removed.
+        """
+        current = [(fname, key) for fname, key, _ in files]
+        for (fname, key), (_, _, gdict) in zip(current, files):
+            # A file's group set can grow or shrink (groups parsed on demand); its
+            # fragments for groups it already had are kept
+            old = self._fragments.get((fname, key), {})
+            self._fragments[(fname, key)] = {
+                gname: old[gname] if gname in old else drop_singleton_rows(with_source_file(df, fname))
+                for gname, df in gdict.items()
+                if df is not None and not df.empty
+            }
+        live = set(current)
+        for fk in [fk for fk in self._fragments if fk not in live]:
+            del self._fragments[fk]
+
+        members: Dict[str, List[FragmentKey]] = {}
+        for fk in dict.fromkeys(current):
+            for gname in self._fragments[fk]:
+                members.setdefault(gname, []).append(fk)
+
+        changed = {g for g in self._members if g not in members}
+        groups: Dict[str, pd.DataFrame] = {}
+        for gname, keys in members.items():
+            old = self._members.get(gname)
+            if old == keys:
+                groups[gname] = self._groups[gname]
+                continue
+            if old and keys[:len(old)] == old:
+                # Files appended: extend the existing frame
+                parts = [self._groups[gname]] + [self._fragments[fk][gname] for fk in keys[len(old):]]
+            else:
+                parts = [self._fragments[fk][gname] for fk in keys]
+            groups[gname] = concat_frames(parts)
+            changed.add(gname)
+
+        for gname in changed:
+            self._clock += 1
+            self._versions[gname] = self._clock
+        self._members = members
+        self._groups = groups
+        self.changed = changed
+        return changed
@@ -0,0 +1,378 @@
+"""
+Triaxial summary table and s–t stress path parameters.
+"""
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from triaxial_ags.filter_index import FilterIndex
+from triaxial_ags.instrument import instrumented
+from triaxial_ags.joins import DEFAULT_DEPTH_TOLERANCE, MISSING_KEY, key_stats, table_keys
+from triaxial_ags.tables import concat_frames, deduplicate_cells, drop_singleton_rows, expand_rows
+
+logger = logging.getLogger(__name__)
+
+
+def coalesce_columns(df: pd.DataFrame, candidates: List[str], new_name: str):
+    """
+    Create/rename a single column 'new_name' from the existing candidates, taking
+    the first non-empty value per row (e.g. TRIX_CELL for AGS3 rows, TRET_CELL for AGS4).
+    """
+    present = [c for c in candidates if c in df.columns]
+    if present:
+        out = df[present[0]]
+        for c in present[1:]:
+            out = _fill_blanks(out, df[c])
+        df[new_name] = out
+        return
+    # ensure column exists
+    if new_name not in df.columns:
+        df[new_name] = np.nan
+
+
+def _fill_blanks(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Values of a, with null/blank entries taken from b."""
+    blank = a.isna()
+    if a.dtype == object or pd.api.types.is_string_dtype(a.dtype):
+        blank |= a.astype("string").str.strip().eq("").fillna(True)
+    if not blank.any():
+        return a
+    if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+        # b may hold values outside a's categories
+        filled = a.astype(object).where(~blank, b.astype(object))
+        return filled.astype("category") if isinstance(a.dtype, pd.CategoricalDtype) else filled
+    return a.where(~blank, b)
+
+
+def join_distinct(df: pd.DataFrame, cols: List[str], sep: str = " | ") -> pd.Series:
+    """
+    Per row, the distinct non-null values of cols (as text, in column order) joined
+    by sep, as a categorical. Each distinct combination of values is joined once
+    and mapped back to the rows by its code, so there is no row-wise apply.
+    """
+    # One integer per row encoding the value code of every column (0 = missing)
+    factorized = [pd.factorize(df[c]) for c in cols]
+    combined = np.zeros(len(df), dtype=np.int64)
+    for codes, uniques in factorized:
+        combined = combined * (len(uniques) + 1) + (codes + 1)
+    combos, inverse = np.unique(combined, return_inverse=True)
+
+    labels = []
+    for combo in combos.tolist():
+        values = []
+        for codes, uniques in reversed(factorized):
+            combo, code = divmod(combo, len(uniques) + 1)
+            if code:
+                values.append(str(uniques[code - 1]))
+        labels.append(sep.join(dict.fromkeys(reversed(values))))
+    categories, label_codes = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+    return pd.Series(pd.Categorical.from_codes(label_codes[inverse], categories=categories), index=df.index)
+
+
+def to_numeric_safe(df: pd.DataFrame, cols: List[str]):
+    for c in cols:
+        if c in df.columns and not pd.api.types.is_float_dtype(df[c].dtype):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+# Final column subset (add useful identifiers if present)
+TRIAXIAL_COLUMNS = [
+    "HOLE_ID", "SAMP_ID", "SAMP_REF", "SAMP_TOP",
+    "SPEC_REF", "SPEC_DEPTH", "SAMP_DESC", "SPEC_DESC", "GEOL_STAT",
+    "TRIG_TYPE", "TREG_TYPE",  # test types
+    "CELL", "DEVF", "PWPF", "SOURCE_FILE"
+]
+
+# Result columns (from TRIX/TRET); always present in the joined table, NaN without results
+RESULT_COLUMNS = ["CELL", "DEVF", "PWPF"]
+
+# Groups generate_triaxial_table reads; its output only changes when one of these does
+TRIAXIAL_GROUPS = ("SAMP", "CLSS", "TRIG", "TREG", "TRIX", "TRET")
+
+# Specimen-level tables joined on (HOLE_ID, SPEC_DEPTH): TRIG/TREG define triaxial
+# specimens (outer); CLSS, like SAMP, adds untested rows only with keep_untested
+SPECIMEN_TABLES = [("TRIG", "outer"), ("TREG", "outer"), ("CLSS", "untested")]
+
+
+def _prepare(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    # Normalize key column spelling
+    rename_map = {c: "SPEC_DEPTH" for c in df.columns if c.upper() in {"SPEC_DPTH", "SPEC_DEPTH"}}
+    rename_map.update({c: "HOLE_ID" for c in df.columns if c.upper() in {"LOCA_ID", "HOLE_ID"}})
+    df = df.rename(columns=rename_map)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if "HOLE_ID" not in df.columns:
+        df["HOLE_ID"] = np.nan
+    return df
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+
+
+def _joined_values(values: pd.Series):
+    """The non-blank values of duplicate rows: the value itself if there is one, else joined by " | "."""
+    kept = [v for v in values if pd.notna(v) and str(v).strip() != ""]
+    distinct = list(dict.fromkeys(kept))
+    if not distinct:
+        return np.nan
+    return distinct[0] if len(distinct) == 1 else " | ".join(map(str, distinct))
+
+
+def _one_row_per_key(dim: pd.DataFrame, key_col: str) -> pd.DataFrame:
+    """
+    A describing table reduced to one row per key: the values of rows sharing a key
+    are merged into " | " cells (de-duplicated with deduplicate_cells), as chained
+    outer merges kept them, so no value is dropped.
+    """
+    dim = dim[dim[key_col] != MISSING_KEY]
+    dup = dim[key_col].duplicated(keep=False).to_numpy()
+    if not dup.any():
+        return dim
+    cols = [c for c in dim.columns if c != key_col]
+    merged = dim[dup].astype({c: object for c in cols}).groupby(key_col, sort=False)[cols].agg(_joined_values)
+    merged = deduplicate_cells(merged.reset_index())
+    return pd.concat([dim[~dup].astype({c: object for c in cols}), merged], ignore_index=True)
+
+
+class TriaxialJoin:
+    """
+    Join plan for the triaxial summary. Keys are normalized once for all tables
+    (categorical HOLE_ID, quantized SPEC_DEPTH / SAMP_TOP matched within
+    depth_tolerance); describing tables are reduced to one row per key (the values
+    of duplicate rows merged into " | " cells), so joins are many-to-one and the
+    output size is known before anything is materialized.
+
+    - results: TRIX (AGS3) + TRET (AGS4) rows, every row kept
+    - TRIG / TREG: test type per specimen; specimens without results are added as rows
+    - CLSS: per specimen attributes; specimens without a test are added as rows
+    - SAMP: per sample (HOLE_ID, SAMP_TOP) attributes; samples without a specimen are
+      added as rows
+
+    keep_untested=True keeps the CLSS and SAMP rows without triaxial data, as the
+    outer merges of the original summary did; False limits the table to tested
+    specimens.
+    """
+
+    def __init__(
+        self, groups: Dict[str, pd.DataFrame], depth_tolerance: float = DEFAULT_DEPTH_TOLERANCE,
+        keep_untested: bool = True,
+    ):
+        self.depth_tolerance = depth_tolerance
+        self.keep_untested = keep_untested
+
+        # Results: TRIX + TRET with unified CELL / DEVF / PWPF
+        results = [_prepare(groups.get(g)) for g in ("TRIX", "TRET")]
+        results = [r for r in results if not r.empty]
+        facts = concat_frames(results) if results else pd.DataFrame()
+        if not facts.empty:
+            coalesce_columns(facts, ["TRIX_CELL", "TRET_CELL"], "CELL")     # σ3 total cell pressure during shear
+            coalesce_columns(facts, ["TRIX_DEVF", "TRET_DEVF"], "DEVF")     # deviator at failure (q)
+            coalesce_columns(facts, ["TRIX_PWPF", "TRET_PWPF"], "PWPF")     # porewater u at failure
+            facts = facts[[c for c in TRIAXIAL_COLUMNS if c in facts.columns]]
+        self.facts = facts
+
+        specimen = {g: (_prepare(groups.get(g)), how) for g, how in SPECIMEN_TABLES}
+        self.specimen = {g: v for g, v in specimen.items() if not v[0].empty}
+        self.samp = _prepare(groups.get("SAMP"))
+
+        # Specimen keys, shared by results and specimen tables
+        tables = [self.facts] + [t for t, _ in self.specimen.values()]
+        keys = table_keys(
+            [t.get("HOLE_ID") for t in tables], [t.get("SPEC_DEPTH") for t in tables],
+            [len(t) for t in tables], depth_tolerance,
+        )
+        self.fact_keys = keys[0]
+        self.specimen_keys = dict(zip(self.specimen, keys[1:]))
+
+        # Specimens present only in outer tables (TRIG/TREG, and CLSS with keep_untested)
+        # become extra rows
+        fact_key_set = np.unique(self.fact_keys)
+        extra = []
+        for g, (t, how) in self.specimen.items():
+            k = self.specimen_keys[g]
+            if how == "untested" and not keep_untested:
+                continue
+            sel = (k != MISSING_KEY) & ~np.isin(k, fact_key_set)
+            cols = [c for c in ("HOLE_ID", "SPEC_DEPTH", "SAMP_TOP", "SOURCE_FILE") if c in t.columns]
+            extra.append(t.loc[sel, cols].assign(_SK=k[sel]))
+        extra = concat_frames(extra).drop_duplicates("_SK") if extra else pd.DataFrame(columns=["_SK"])
+        self.extra = extra
+
+        # Sample keys: SAMP (HOLE_ID, SAMP_TOP) against the spine's SAMP_TOP, or its
+        # SPEC_DEPTH where the results carry no SAMP_TOP
+        spine_holes = pd.concat([_column(self.facts, "HOLE_ID"), _column(extra, "HOLE_ID")], ignore_index=True)
+        spine_tops = pd.concat(
+            [_fill_blanks(_column(t, "SAMP_TOP"), _column(t, "SPEC_DEPTH")) for t in (self.facts, extra)],
+            ignore_index=True,
+        )
+        if self.samp.empty:
+            self.spine_samp_keys = np.full(len(spine_holes), MISSING_KEY, dtype=np.int64)
+            self.samp_keys = np.empty(0, dtype=np.int64)
+        else:
+            self.spine_samp_keys, self.samp_keys = table_keys(
+                [spine_holes, self.samp.get("HOLE_ID")], [spine_tops, self.samp.get("SAMP_TOP")],
+                [len(spine_holes), len(self.samp)], depth_tolerance,
+            )
+
+        # Samples no specimen row refers to become extra rows (keep_untested)
+        self.extra_samples = pd.DataFrame(columns=["_SMK"])
+        if keep_untested and not self.samp.empty:
+            sel = (self.samp_keys != MISSING_KEY) & ~np.isin(self.samp_keys, self.spine_samp_keys)
+            cols = [c for c in ("HOLE_ID", "SAMP_TOP", "SOURCE_FILE") if c in self.samp.columns]
+            self.extra_samples = (
+                self.samp.loc[sel, cols].assign(_SMK=self.samp_keys[sel]).drop_duplicates("_SMK")
+            )
+
+    @property
+    def estimated_rows(self) -> int:
+        """Rows of the joined table before multi-value expansion."""
+        return len(self.facts) + len(self.extra) + len(self.extra_samples)
+
+    @property
+    def report(self) -> pd.DataFrame:
+        """
+        Join quality per table: rows, rows without a usable key, duplicate keys
+        (repeated rows per key; in describing tables their values are merged into
+        " | " cells), and distinct keys matched / unmatched against the triaxial rows.
+        """
+        spine_keys = np.concatenate([self.fact_keys, self.extra["_SK"].to_numpy(dtype=np.int64)])
+        other = np.concatenate([self.fact_keys] + list(self.specimen_keys.values())) if self.specimen_keys else self.fact_keys
+        rows = [{"table": "TRIX/TRET", "key": "HOLE_ID + SPEC_DEPTH", **key_stats(self.fact_keys, other)}]
+        for g, k in self.specimen_keys.items():
+            rows.append({"table": g, "key": "HOLE_ID + SPEC_DEPTH", **key_stats(k, spine_keys)})
+        if not self.samp.empty:
+            rows.append({"table": "SAMP", "key": "HOLE_ID + SAMP_TOP", **key_stats(self.samp_keys, self.spine_samp_keys)})
+        report = pd.DataFrame(rows)
+        report.attrs["estimated_rows"] = self.estimated_rows
+        return report
+
+    @instrumented("TriaxialJoin.materialize")
+    def materialize(self) -> pd.DataFrame:
+        """
+        The joined table (TRIAXIAL_COLUMNS that are present, and the RESULT_COLUMNS
+        in any case), one row per result row, extra specimen or extra sample.
+        """
+        if self.facts.empty and not self.specimen and self.extra_samples.empty:
+            return pd.DataFrame()
+        spine = concat_frames([self.facts.assign(_SK=self.fact_keys), self.extra])
+        spine["_SMK"] = self.spine_samp_keys
+        if not self.extra_samples.empty:
+            samples = self.extra_samples.assign(_SK=MISSING_KEY)
+            spine = concat_frames([spine, samples]) if len(spine) else samples
+
+        describing = [(t, self.specimen_keys[g], "_SK") for g, (t, _) in self.specimen.items()]
+        if not self.samp.empty:
+            describing.append((self.samp, self.samp_keys, "_SMK"))
+        for table, keys, key_col in describing:
+            cols = [c for c in TRIAXIAL_COLUMNS if c in table.columns and c not in ("HOLE_ID", "SPEC_DEPTH")]
+            dim = _one_row_per_key(table[cols].assign(**{key_col: keys}), key_col)
+            spine = spine.merge(dim, on=key_col, how="left", suffixes=("", "__dim"), validate="many_to_one")
+            for c in cols:
+                if f"{c}__dim" in spine.columns:
+                    spine[c] = _fill_blanks(spine[c], spine.pop(f"{c}__dim"))
+
+        return spine.reindex(columns=[c for c in TRIAXIAL_COLUMNS if c in spine.columns or c in RESULT_COLUMNS])
+
+
+@instrumented()
+def generate_triaxial_table(
+    groups: Dict[str, pd.DataFrame],
+    depth_tolerance: float = DEFAULT_DEPTH_TOLERANCE,
+    join: Optional[TriaxialJoin] = None,
+) -> pd.DataFrame:
+    """
+    Build a single triaxial summary table from available AGS groups:
+    - SAMP / CLSS (optional)
+    - TRIG (total stress general) or TREG (effective stress general)
+    - TRIX (AGS3 results) or TRET (AGS4 results)
+    Pass a TriaxialJoin to reuse a plan whose report was already inspected.
+    """
+    join = join if join is not None else TriaxialJoin(groups, depth_tolerance)
+    final_df = join.materialize()
+    if final_df.empty:
+        return final_df
+
+    # Deduplicate cell text and expand rows if any " | "
+    final_df = deduplicate_cells(final_df)
+    expanded_df = expand_rows(final_df)
+
+    # Drop rows that are effectively empty (<=1 non-null)
+    expanded_df = drop_singleton_rows(expanded_df)
+
+    # Numeric cast for core fields
+    to_numeric_safe(expanded_df, ["SPEC_DEPTH", "CELL", "DEVF", "PWPF"])
+
+    return expanded_df
+
+
+@instrumented()
+def compute_s_t(tri_df: pd.DataFrame, mode: str = "Effective") -> pd.DataFrame:
+    df = tri_df.copy()
+    # Coalesce a single 'TEST_TYPE' helper
+    test_type_cols = [c for c in ("TREG_TYPE", "TRIG_TYPE") if c in df.columns]
+    if test_type_cols:
+        df["TEST_TYPE"] = join_distinct(df, test_type_cols)
+    else:
+        df["TEST_TYPE"] = "Unknown"
+
+    # Specimens without TRIX/TRET results have no result columns; their s and t are NaN
+    for c in RESULT_COLUMNS:
+        if c not in df.columns:
+            df[c] = np.nan
+    to_numeric_safe(df, RESULT_COLUMNS)
+    df["t"] = df["DEVF"] / 2.0
+    df["s_total"] = df["CELL"] + df["t"]
+    df["s_effective"] = (df["CELL"] - df["PWPF"]) + (df["DEVF"] / 2) if "PWPF" in df.columns else np.nan
+
+    if mode.lower().startswith("eff"):
+        df["s"] = df["s_effective"]
+    else:
+        df["s"] = df["s_total"]
+
+    if mode.lower().startswith("eff") and "PWPF" in df.columns:
+        missing_pwp = df["PWPF"].isna().sum()
+        if missing_pwp > 0:
+            logger.warning(
+                "%d test(s) missing pore pressure data - effective stress calculations may be incomplete", missing_pwp
+            )
+
+    # Keep key columns for plotting
+    keep = ["HOLE_ID", "SPEC_DEPTH", "TEST_TYPE", "CELL", "PWPF", "DEVF", "s_total", "s_effective", "s", "t", "SOURCE_FILE"]
+    keep = [c for c in keep if c in df.columns]
+    return df[keep].copy()
+
+
+@instrumented()
+def attach_s_t(tri_df: pd.DataFrame, st_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge s,t into the Triaxial summary grid (avoid accidental many-to-many merges).
+    """
+    merge_keys = [c for c in ["HOLE_ID", "SPEC_DEPTH", "CELL", "PWPF", "DEVF"] if c in tri_df.columns]
+    cols_from_st = [c for c in ["HOLE_ID","SPEC_DEPTH","CELL","PWPF","DEVF","s_total","s_effective","s","t","TEST_TYPE","SOURCE_FILE"] if c in st_df.columns]
+    return pd.merge(tri_df, st_df[cols_from_st], on=merge_keys, how="left")
+
+
+@instrumented()
+def filter_s_t(
+    st_df: pd.DataFrame,
+    holes: Optional[List[str]] = None,
+    test_types: Optional[List[str]] = None,
+    sources: Optional[List[str]] = None,
+    index: Optional[FilterIndex] = None,
+) -> pd.DataFrame:
+    """
+    Rows of the s–t table matching the selected HOLE_ID / TEST_TYPE / SOURCE_FILE
+    values; an empty or missing selection does not filter. With a FilterIndex built
+    from st_df (see filter_index), the selection is a bitmap intersection.
+    """
+    if index is not None:
+        return index.select(st_df, HOLE_ID=holes, TEST_TYPE=test_types, SOURCE_FILE=sources)
+    mask = pd.Series(True, index=st_df.index)
+    for col, picked in (("HOLE_ID", holes), ("TEST_TYPE", test_types), ("SOURCE_FILE", sources)):
+        if picked and col in st_df.columns:
+            mask &= st_df[col].isin(picked)
+    return st_df[mask]